@@ -0,0 +1,336 @@
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from project_indexes import ProjectIndex, date_ordinal, parse_number
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy اختیاریه؛ بدونش همون محاسبه‌ها با پایتون خالص انجام می‌شن
+    np = None
+
+# شماره روز برای پروژه‌هایی که تاریخ پایانشون نامعتبره
+NO_DATE = -1
+# شناسه کارفرمای ردیف خالی (ردیف پروژه حذف‌شده که هنوز پروژه دیگه‌ای جاش ننشسته)
+NO_CLIENT = -1
+# ظرفیت اولیه آرایه‌های NumPy؛ بعدش هر بار دو برابر می‌شه
+_MIN_CAPACITY = 1024
+
+
+def financial_values(project, ordinals=None):
+    """(روز پایان، درآمد، هزینه) یه پروژه با همون قواعد گزارش‌های مالی
+
+    تاریخ نامعتبر NO_DATE می‌شه؛ درآمد نامعتبر صفر حساب می‌شه و هزینه فقط
+    وقتی جمع زده می‌شه که درآمد معتبر باشه. ordinals (اختیاری) کش متن تاریخ ->
+    شماره روزه تا در ورود گروهی هر تاریخ فقط یه بار parse بشه.
+    """
+    text = project.get('end_date')
+    if ordinals is None:
+        end = date_ordinal(text)
+    else:
+        end = ordinals.get(text, NO_DATE - 1)
+        if end == NO_DATE - 1:
+            end = ordinals[text] = date_ordinal(text)
+    income = parse_number(project.get('income', 0))
+    cost = parse_number(project.get('cost', 0)) if income is not None else None
+    return NO_DATE if end is None else end, income or 0.0, cost or 0.0
+
+
+def _totals(count, income, cost):
+    return {'count': count, 'income': income, 'cost': cost, 'profit': income - cost}
+
+
+def _add_to(table, key, count, income, cost):
+    """(تعداد، درآمد، هزینه) رو به ردیف key جدول اضافه می‌کنم؛ ردیف خالی حذف می‌شه"""
+    row = table.get(key)
+    if row is None:
+        row = table[key] = [0, 0.0, 0.0]
+    row[0] += count
+    row[1] += income
+    row[2] += cost
+    if row[0] <= 0:
+        # ردیف خالی رو حذف می‌کنم تا خطای جمع و تفریق اعشاری نمونه
+        del table[key]
+
+
+class ColumnarView(ProjectIndex):
+    """نمای ستونی پروژه‌ها برای جمع‌های مالی: تاریخ پایان، درآمد، هزینه و شناسه کارفرما
+
+    با هر افزودن/ویرایش/حذف فقط ردیف همون پروژه عوض می‌شه؛ ردیف پروژه
+    حذف‌شده خالی می‌مونه تا پروژه بعدی جاش بشینه، پس بعد از تغییر چیزی از
+    نو parse نمی‌شه. کارفرماها با شناسه عددی کد می‌شن و جمع هر کارفرما و
+    جمع‌های روزانه (daily) هم همراه ستون‌ها به‌روز نگه داشته می‌شن. با NumPy
+    ستون‌ها آرایه‌ان و گروه‌بندی یه بازه با ماسک و bincount انجام می‌شه؛
+    بدون NumPy لیست و حلقه.
+    """
+
+    def __init__(self, vectorized=None):
+        # vectorized=False حتی با وجود NumPy مسیر پایتون خالص رو انتخاب می‌کنه
+        self.vectorized = np is not None if vectorized is None else bool(vectorized and np is not None)
+        self.daily = DailyPrefixSums()
+        self.clear()
+
+    def clear(self):
+        self.clients = []
+        self._client_ids = {}
+        # شناسه کارفرما -> [تعداد، درآمد، هزینه]
+        self._client_totals = {}
+        # نام پروژه -> شماره ردیف، و ردیف‌های خالی
+        self._rows = {}
+        self._free = []
+        self.size = 0
+        self.daily.clear()
+        if self.vectorized:
+            self.end = np.empty(0, dtype=np.int64)
+            self.income = np.empty(0, dtype=np.float64)
+            self.cost = np.empty(0, dtype=np.float64)
+            self.client = np.empty(0, dtype=np.int64)
+        else:
+            self.end, self.income, self.cost, self.client = [], [], [], []
+
+    def _client_id(self, client):
+        client_id = self._client_ids.get(client)
+        if client_id is None:
+            client_id = self._client_ids[client] = len(self.clients)
+            self.clients.append(client)
+        return client_id
+
+    def _count(self, values, sign):
+        end, income, cost, client_id = values
+        _add_to(self._client_totals, client_id, sign, sign * income, sign * cost)
+        self.daily.add(end, sign, sign * income, sign * cost)
+
+    def _reserve(self, count):
+        """ظرفیت آرایه‌ها رو (با دو برابر کردن) برای count ردیف دیگه آماده می‌کنم"""
+        size = self.size + count
+        capacity = len(self.end)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, _MIN_CAPACITY)
+        for column in ('end', 'income', 'cost', 'client'):
+            old = getattr(self, column)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, column, new)
+
+    def _set(self, row, values):
+        end, income, cost, client_id = values
+        self.end[row] = end
+        self.income[row] = income
+        self.cost[row] = cost
+        self.client[row] = client_id
+
+    def _new_row(self):
+        if self._free:
+            return self._free.pop()
+        row = self.size
+        if self.vectorized:
+            self._reserve(1)
+        else:
+            self.end.append(NO_DATE)
+            self.income.append(0.0)
+            self.cost.append(0.0)
+            self.client.append(NO_CLIENT)
+        self.size += 1
+        return row
+
+    def add(self, project):
+        values = financial_values(project) + (self._client_id(project.get('client', '')),)
+        row = self._new_row()
+        self._rows[project['name']] = row
+        self._set(row, values)
+        self._count(values, 1)
+
+    def add_many(self, projects):
+        """ورود گروهی: ردیف‌ها یک‌جا به انتهای ستون‌ها اضافه می‌شن"""
+        if not projects:
+            return
+        ordinals = {}
+        ends, incomes, costs, clients = [], [], [], []
+        for project in projects:
+            end, income, cost = financial_values(project, ordinals)
+            ends.append(end)
+            incomes.append(income)
+            costs.append(cost)
+            clients.append(self._client_id(project.get('client', '')))
+        start = self.size
+        for offset, project in enumerate(projects):
+            self._rows[project['name']] = start + offset
+        if not self.vectorized:
+            self.size += len(projects)
+            self.end.extend(ends)
+            self.income.extend(incomes)
+            self.cost.extend(costs)
+            self.client.extend(clients)
+            for client_id, (count, row_income, row_cost) in _sum_rows(clients, incomes, costs).items():
+                _add_to(self._client_totals, client_id, count, row_income, row_cost)
+            for day, (count, row_income, row_cost) in _sum_rows(ends, incomes, costs).items():
+                self.daily.add(day, count, row_income, row_cost)
+            return
+        self._reserve(len(projects))
+        self.size += len(projects)
+        end = self.end[start:self.size]
+        income = self.income[start:self.size]
+        cost = self.cost[start:self.size]
+        client = self.client[start:self.size]
+        end[:] = ends
+        income[:] = incomes
+        cost[:] = costs
+        client[:] = clients
+        # جمع کارفرماها و روزها هم با bincount، نه یکی‌یکی
+        for client_id, count, row_income, row_cost in _group_sums(client, income, cost):
+            _add_to(self._client_totals, client_id, count, row_income, row_cost)
+        valid = end != NO_DATE
+        days, inverse = np.unique(end[valid], return_inverse=True)
+        for day, count, row_income, row_cost in _group_sums(inverse, income[valid], cost[valid], days):
+            self.daily.add(day, count, row_income, row_cost)
+
+    def rebuild(self, projects):
+        self.clear()
+        self.add_many(projects)
+
+    def remove(self, project):
+        row = self._rows.pop(project['name'], None)
+        if row is None:
+            return
+        values = (int(self.end[row]), float(self.income[row]), float(self.cost[row]), int(self.client[row]))
+        self._count(values, -1)
+        self._set(row, (NO_DATE, 0.0, 0.0, NO_CLIENT))
+        self._free.append(row)
+
+    def client_totals(self):
+        """جمع مالی همه پروژه‌ها به تفکیک کارفرما، از جمع‌های به‌روز نگه‌داشته‌شده"""
+        return {self.clients[client_id]: _totals(*row) for client_id, row in self._client_totals.items()}
+
+    def snapshot(self, first=None, last=None):
+        """ستون‌های پروژه‌هایی که در [first, last] پایان می‌یابند، کپی‌شده برای گروه‌بندی بیرون از قفل
+
+        با NumPy ردیف‌های بازه همین‌جا با ماسک جدا می‌شن (که خودش کپیه)؛ بدون
+        NumPy ستون‌ها کپی می‌شن و فیلتر موقع گروه‌بندی انجام می‌شه. پروژه بدون
+        تاریخ پایان معتبر در هیچ بازه‌ای نیست.
+        """
+        first = None if first is None else date_ordinal(first)
+        last = None if last is None else date_ordinal(last)
+        if not self.vectorized:
+            size = self.size
+            return ColumnSnapshot(self.end[:size], self.income[:size], self.cost[:size],
+                                  self.client[:size], list(self.clients), first, last)
+        end = self.end[:self.size]
+        if first is None and last is None:
+            mask = self.client[:self.size] != NO_CLIENT
+        else:
+            # ردیف خالی و تاریخ نامعتبر هر دو NO_DATE دارن و شماره روز واقعی از ۱ شروع می‌شه
+            mask = end >= (1 if first is None else first)
+            if last is not None:
+                mask &= end <= last
+        rows = np.flatnonzero(mask)
+        return ColumnSnapshot(None, self.income[rows], self.cost[rows], self.client[rows],
+                              list(self.clients), None, None)
+
+
+def _sum_rows(keys, incomes, costs):
+    """کلید -> [تعداد، جمع درآمد، جمع هزینه] با پایتون خالص"""
+    groups = {}
+    for key, income, cost in zip(keys, incomes, costs):
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [1, income, cost]
+        else:
+            group[0] += 1
+            group[1] += income
+            group[2] += cost
+    return groups
+
+
+def _group_sums(keys, income, cost, labels=None):
+    """(کلید، تعداد، جمع درآمد، جمع هزینه) برای هر کلید عددی با bincount
+
+    labels (اختیاری) کلید واقعی هر شماره‌ست (مثلاً روزها بعد از np.unique).
+    """
+    length = len(labels) if labels is not None else 0
+    counts = np.bincount(keys, minlength=length)
+    incomes = np.bincount(keys, weights=income, minlength=length)
+    costs = np.bincount(keys, weights=cost, minlength=length)
+    for key in np.flatnonzero(counts):
+        label = key if labels is None else labels[key]
+        yield int(label), int(counts[key]), float(incomes[key]), float(costs[key])
+
+
+class ColumnSnapshot:
+    """ستون‌های کپی‌شده یه ColumnarView که دیگه با تغییر پروژه‌ها عوض نمی‌شن
+
+    end برابر None یعنی ردیف‌ها از قبل فیلتر شدن (مسیر NumPy).
+    """
+
+    def __init__(self, end, income, cost, client, clients, first, last):
+        self.end = end
+        self.income = income
+        self.cost = cost
+        self.client = client
+        self.clients = clients
+        self.first = first
+        self.last = last
+
+    def group_by_client(self):
+        """جمع مالی به تفکیک کارفرما: {کارفرما: {'count', 'income', 'cost', 'profit'}}"""
+        if self.end is None:
+            return {self.clients[client_id]: _totals(count, income, cost)
+                    for client_id, count, income, cost in _group_sums(self.client, self.income, self.cost)}
+        bounded = self.first is not None or self.last is not None
+        # ردیف خالی و تاریخ نامعتبر هر دو NO_DATE دارن و شماره روز واقعی از ۱ شروع می‌شه
+        first = 1 if self.first is None else self.first
+        last = self.last
+        groups = {}
+        for end, income, cost, client_id in zip(self.end, self.income, self.cost, self.client):
+            if client_id == NO_CLIENT or bounded and (end < first or last is not None and end > last):
+                continue
+            group = groups.get(client_id)
+            if group is None:
+                groups[client_id] = [1, income, cost]
+            else:
+                group[0] += 1
+                group[1] += income
+                group[2] += cost
+        return {self.clients[client_id]: _totals(*group) for client_id, group in groups.items()}
+
+
+class DailyPrefixSums:
+    """جمع تجمعی تعداد، درآمد و هزینه روز به روز (بر اساس تاریخ پایان)
+
+    ColumnarView با هر تغییر فقط جمع روز پایان همون پروژه رو عوض می‌کنه.
+    جمع‌های تجمعی بعد از تغییر، در اولین درخواست از روی روزها (نه پروژه‌ها)
+    دوباره ساخته می‌شن و بعدش جمع هر بازه [first, last] با دو جستجوی دودویی
+    به دست میاد.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # روز -> [تعداد، درآمد، هزینه]
+        self._days = {}
+        self._prefix = None
+
+    def add(self, day, count, income, cost):
+        if day == NO_DATE:
+            return
+        _add_to(self._days, day, count, income, cost)
+        self._prefix = None
+
+    def _ensure_prefix(self):
+        if self._prefix is None:
+            days = sorted(self._days)
+            rows = [self._days[day] for day in days]
+            self._prefix = (
+                days,
+                [0] + list(accumulate(row[0] for row in rows)),
+                [0.0] + list(accumulate(row[1] for row in rows)),
+                [0.0] + list(accumulate(row[2] for row in rows)),
+            )
+        return self._prefix
+
+    def summary(self, first, last):
+        """تعداد، درآمد، هزینه و سود پروژه‌هایی که در [first, last] پایان می‌یابند"""
+        days, count, income, cost = self._ensure_prefix()
+        lo = bisect_left(days, date_ordinal(first))
+        hi = max(bisect_right(days, date_ordinal(last)), lo)
+        return _totals(count[hi] - count[lo], income[hi] - income[lo], cost[hi] - cost[lo])
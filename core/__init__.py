@@ -0,0 +1,9 @@
+# لایه سرویس بدون رابط کاربری: پروژه‌ها، شرکت‌ها، احراز هویت و گزارش‌ها.
+# رابط Tk و کارهای دسته‌ای هر دو از همین‌ها استفاده می‌کنن و tkinter اینجا import نمی‌شه.
+from core.auth import AuthService
+from core.companies import CompanyService
+from core.errors import ValidationError
+from core.projects import ProjectService
+from core.reports import ReportService
+
+__all__ = ['AuthService', 'CompanyService', 'ProjectService', 'ReportService', 'ValidationError']
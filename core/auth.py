@@ -0,0 +1,183 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from core.errors import ValidationError
+from persistence import DeferredFlush
+from storage import get_storage
+
+# بعد از این تعداد تلاش ناموفق، حساب برای LOCK_MINUTES دقیقه قفل می‌شه
+MAX_FAILED_ATTEMPTS = 3
+LOCK_MINUTES = 5
+
+
+class AuthService:
+    """کاربران، ورود، ثبت‌نام و قفل حساب‌ها، بدون وابستگی به Tk
+
+    تغییرهای قفل حساب‌ها و کاربران جدید با تأخیر (یا با flush) یک‌جا ذخیره می‌شن.
+    """
+
+    def __init__(self, storage=None):
+        self.storage = storage or get_storage()
+        self.users = self.load_users()
+        self.account_locks = self.load_account_locks()
+        # تغییرهای ذخیره‌نشده؛ با تأخیر یا با flush یک‌جا ذخیره می‌شن
+        self._lock = threading.RLock()
+        self._persisted_locks = set(self.account_locks)
+        self._pending_lock_upserts = set()
+        self._pending_lock_deletes = set()
+        self._pending_users = set()
+        self._deferred = DeferredFlush(self._write_pending, lock=self._lock)
+
+    def load_users(self):
+        """کاربران رو از ذخیره‌ساز می‌خونم"""
+        return self.storage.load_users()
+
+    def save_users(self):
+        """کاربران رو در ذخیره‌ساز ذخیره می‌کنم"""
+        self.storage.save_users(self.users)
+
+    def load_account_locks(self):
+        """اطلاعات قفل حساب‌ها رو از ذخیره‌ساز می‌خونم"""
+        return self.storage.load_account_locks()
+
+    def save_account_locks(self):
+        """اطلاعات قفل حساب‌ها رو در ذخیره‌ساز ذخیره می‌کنم"""
+        self.storage.save_account_locks(self.account_locks)
+
+    def _lock_changed(self, username):
+        """تغییر رکورد قفل یه کاربر رو برای ذخیره علامت می‌زنم"""
+        if username in self.account_locks:
+            self._pending_lock_deletes.discard(username)
+            self._pending_lock_upserts.add(username)
+        elif username in self._persisted_locks:
+            self._pending_lock_upserts.discard(username)
+            self._pending_lock_deletes.add(username)
+        else:
+            # رکوردی که هیچ‌وقت ذخیره نشده بود حذف شده؛ نوشتنی لازم نیست
+            self._pending_lock_upserts.discard(username)
+            return
+        self._deferred.mark_dirty()
+
+    def _write_pending(self):
+        """تغییرهای جمع‌شده کاربران و قفل‌ها رو ذخیره می‌کنم"""
+        if self._pending_lock_upserts or self._pending_lock_deletes:
+            self.storage.apply_account_lock_changes(
+                self.account_locks,
+                sorted(self._pending_lock_upserts),
+                sorted(self._pending_lock_deletes)
+            )
+            self._persisted_locks |= self._pending_lock_upserts
+            self._persisted_locks -= self._pending_lock_deletes
+            self._pending_lock_upserts = set()
+            self._pending_lock_deletes = set()
+        for username in sorted(self._pending_users):
+            self.storage.upsert_user(username, self.users)
+        self._pending_users = set()
+
+    def flush(self):
+        """تغییرهای ذخیره‌نشده رو همین الان ذخیره می‌کنم"""
+        with self._lock:
+            self._deferred.flush()
+            self.storage.flush()
+
+    def hash_password(self, password):
+        """رمز عبور رو هش می‌کنم"""
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def is_account_locked(self, username):
+        """چک می‌کنم که حساب قفل شده باشه یا نه"""
+        if username not in self.account_locks:
+            return False, None
+
+        lock_info = self.account_locks[username]
+
+        if lock_info.get('lock_time') is None:
+            return False, None
+
+        lock_time = datetime.fromisoformat(lock_info['lock_time'])
+        unlock_time = lock_time + timedelta(minutes=LOCK_MINUTES)
+
+        if datetime.now() < unlock_time:
+            remaining = unlock_time - datetime.now()
+            minutes = int(remaining.total_seconds() // 60)
+            seconds = int(remaining.total_seconds() % 60)
+            return True, f"{minutes:02d}:{seconds:02d}"
+
+        with self._lock:
+            del self.account_locks[username]
+            self._lock_changed(username)
+        return False, None
+
+    def record_failed_login(self, username):
+        """تلاش ناموفق ورود رو ثبت می‌کنم"""
+        with self._lock:
+            if username not in self.account_locks:
+                self.account_locks[username] = {
+                    'failed_attempts': 1,
+                    'lock_time': None
+                }
+            else:
+                self.account_locks[username]['failed_attempts'] += 1
+
+            if self.account_locks[username]['failed_attempts'] >= MAX_FAILED_ATTEMPTS:
+                self.account_locks[username]['lock_time'] = datetime.now().isoformat()
+                self._lock_changed(username)
+
+    def reset_failed_attempts(self, username):
+        """تلاش‌های ناموفق رو پاک می‌کنم"""
+        with self._lock:
+            if username in self.account_locks:
+                del self.account_locks[username]
+                self._lock_changed(username)
+
+    def login(self, username, password):
+        """ورود کاربر؛ در صورت موفقیت نام کاربری برمی‌گرده وگرنه ValidationError
+
+        رمز اشتباه یه تلاش ناموفق ثبت می‌کنه و بعد از MAX_FAILED_ATTEMPTS بار حساب قفل می‌شه.
+        """
+        username = (username or '').strip()
+        if not username or not password:
+            raise ValidationError("لطفاً تمام فیلدها را پر کنید")
+
+        is_locked, remaining_time = self.is_account_locked(username)
+        if is_locked:
+            raise ValidationError(f"حساب قفل شده است. زمان باقی‌مانده: {remaining_time}")
+
+        if username not in self.users:
+            raise ValidationError("کاربری با این نام یافت نشد")
+
+        if self.users[username]['password'] != self.hash_password(password):
+            self.record_failed_login(username)
+            remaining_attempts = MAX_FAILED_ATTEMPTS - self.account_locks[username]['failed_attempts']
+            if remaining_attempts > 0:
+                raise ValidationError(f"رمز عبور اشتباه. {remaining_attempts} تلاش باقی‌مانده")
+            raise ValidationError(f"حساب شما به مدت {LOCK_MINUTES} دقیقه قفل شد")
+
+        self.reset_failed_attempts(username)
+        return username
+
+    def register(self, username, password, confirm_password=None):
+        """کاربر جدید ثبت می‌کنم؛ confirm_password (اگه داده بشه) باید با رمز یکی باشه"""
+        username = (username or '').strip()
+        if not username or not password or confirm_password == '':
+            raise ValidationError("لطفاً تمام فیلدها را پر کنید")
+
+        if len(username) < 3:
+            raise ValidationError("نام کاربری باید حداقل 3 کاراکتر باشد")
+
+        if len(password) < 6:
+            raise ValidationError("رمز عبور باید حداقل 6 کاراکتر باشد")
+
+        if confirm_password is not None and password != confirm_password:
+            raise ValidationError("رمز عبور و تکرار آن یکسان نیستند")
+
+        with self._lock:
+            if username in self.users:
+                raise ValidationError("این نام کاربری قبلاً ثبت شده است")
+            self.users[username] = {
+                'password': self.hash_password(password),
+                'created_at': datetime.now().isoformat()
+            }
+            self._pending_users.add(username)
+            self._deferred.mark_dirty()
+        return username
@@ -0,0 +1,61 @@
+from datetime import datetime
+from core.errors import ValidationError
+from storage import get_storage
+
+
+class CompanyService:
+    """شرکت‌ها و کارفرماها: بارگذاری، ثبت و ورود گروهی، بدون وابستگی به Tk"""
+
+    def __init__(self, storage=None):
+        self.storage = storage or get_storage()
+        self.companies = []
+        self._names = None
+        self.load()
+
+    def load(self):
+        """شرکت‌ها رو از ذخیره‌ساز می‌خونم"""
+        self.companies = self.storage.load_companies()
+        self._names = None
+        return self.companies
+
+    def names(self):
+        """لیست مرتب نام شرکت‌ها؛ تا ثبت شرکت جدید یا بارگذاری مجدد کش می‌مونه"""
+        if self._names is None:
+            self._names = sorted(company['name'] for company in self.companies)
+        return self._names
+
+    def has_company(self, name):
+        return any(company['name'] == name for company in self.companies)
+
+    def add(self, name, phone='', address=''):
+        """یه شرکت جدید ثبت می‌کنم و برش می‌گردونم"""
+        name = (name or '').strip()
+        if not name:
+            raise ValidationError("لطفاً نام شرکت را وارد کنید")
+        if self.has_company(name):
+            raise ValidationError("شرکتی با این نام قبلاً ثبت شده است")
+        company = {
+            'name': name,
+            'phone': (phone or '').strip(),
+            'address': (address or '').strip(),
+            'created_at': datetime.now().isoformat()
+        }
+        self.companies.append(company)
+        self._names = None
+        self.storage.upsert_company(company, self.companies)
+        return company
+
+    def save(self):
+        """کل شرکت‌ها رو در ذخیره‌ساز ذخیره می‌کنم"""
+        self.storage.save_companies(self.companies)
+
+    def validate_import(self, importer, path):
+        """اعتبارسنجی فایل ورودی شرکت‌ها با لیست به‌روز شرکت‌ها"""
+        self.load()
+        return importer.validate_companies(path, self.companies)
+
+    def commit_import(self, importer, result):
+        """شرکت‌های سالم فایل ورودی رو با یه بار نوشتن ذخیره می‌کنم"""
+        count = importer.commit_companies(result, self.companies, self.storage)
+        self._names = None
+        return count
@@ -0,0 +1,2 @@
+class ValidationError(ValueError):
+    """ورودی نامعتبر؛ متن خطا همون پیامیه که به کاربر نشون داده می‌شه"""
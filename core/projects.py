@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+from core.errors import ValidationError
+from project_import import BulkImporter
+from project_store import PAGE_SIZE, ProjectPager, ProjectStore
+
+# فیلدهایی که فرم‌های ثبت و ویرایش پروژه می‌فرستن
+PROJECT_FIELDS = ('name', 'client', 'start_date', 'end_date', 'income', 'cost', 'team', 'description')
+
+
+def clean_project(fields):
+    """فیلدهای ورودی یه پروژه رو تمیز و اعتبارسنجی می‌کنم (همون قواعد فرم ثبت)
+
+    فیلدهای اجباری: نام، کارفرما و تاریخ شروع و پایان؛ درآمد و هزینه باید عدد باشن.
+    خروجی دیکشنری فیلدهای تمیزشده‌ست؛ ورودی نامعتبر ValidationError می‌ده.
+    """
+    project = {field: '' if fields.get(field) is None else str(fields.get(field)).strip()
+               for field in PROJECT_FIELDS}
+    if not all(project[field] for field in ('name', 'client', 'start_date', 'end_date')):
+        raise ValidationError("لطفاً فیلدهای اجباری را پر کنید")
+    try:
+        project['income'] = float(project['income'])
+        project['cost'] = float(project['cost'])
+    except ValueError:
+        raise ValidationError("مقادیر مالی باید عددی باشند")
+    return project
+
+
+class ProjectService:
+    """ثبت، ویرایش، حذف و ورود گروهی پروژه‌ها روی store مشترک، بدون وابستگی به Tk
+
+    رابط کاربری و کارهای دسته‌ای هر دو از همین کلاس استفاده می‌کنن؛ خطاهای
+    ورودی با ValidationError و پیام فارسی قابل نمایش برمی‌گردن.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or ProjectStore.shared()
+
+    def projects(self):
+        """لیست پروژه‌ها (فقط در صورت تغییر فایل دوباره خونده می‌شه)"""
+        return self.store.get_projects()
+
+    def find(self, name):
+        self.store.reload_if_changed()
+        return self.store.find(name)
+
+    def pages(self, order='position', limit=PAGE_SIZE):
+        """پیمایش صفحه به صفحه پروژه‌ها (ProjectPager)"""
+        return ProjectPager(self.store, order, limit)
+
+    def add(self, fields):
+        """یه پروژه جدید ثبت می‌کنم و برش می‌گردونم"""
+        project = clean_project(fields)
+        with self.store.lock:
+            self.store.reload_if_changed()
+            if self.store.has_project(project['name']):
+                raise ValidationError("پروژه‌ای با این نام قبلاً ثبت شده است")
+            now = datetime.now().isoformat()
+            project['created_at'] = now
+            project['updated_at'] = now
+            self.store.add_project(project)
+        return project
+
+    def update(self, name, fields):
+        """همه فیلدهای یه پروژه رو با مقدارهای جدید عوض می‌کنم (تغییر نام هم مجازه)"""
+        changes = clean_project(fields)
+        with self.store.lock:
+            self.store.reload_if_changed()
+            if self.store.find(name) is None:
+                raise ValidationError("پروژه یافت نشد")
+            # بررسی تکراری نبودن نام (به جز خود پروژه)
+            if changes['name'] != name and self.store.has_project(changes['name']):
+                raise ValidationError("پروژه‌ای با این نام قبلاً ثبت شده است")
+            changes['updated_at'] = datetime.now().isoformat()
+            return self.store.update_project(name, changes)
+
+    def delete(self, name):
+        """پروژه رو حذف می‌کنم؛ اگه نبود False برمی‌گرده"""
+        return self.store.delete_project(name)
+
+    def delete_many(self, names):
+        """چند پروژه رو حذف و با یه بار نوشتن ذخیره می‌کنم؛ تعداد حذف‌شده‌ها برمی‌گرده"""
+        count = self.store.delete_projects(names)
+        if count:
+            self.store.flush()
+        return count
+
+    def bulk_update(self, names, client=None, shift_days=0):
+        """کارفرمای پروژه‌ها رو عوض و/یا تاریخ‌هاشون رو جابه‌جا می‌کنم؛ همه با یه بار ذخیره
+
+        تاریخی که قابل خوندن نیست دست نمی‌خوره. تعداد پروژه‌های تغییرکرده برمی‌گرده.
+        """
+        now = datetime.now().isoformat()
+        changes = {}
+        with self.store.lock:
+            self.store.reload_if_changed()
+            for name in names:
+                project = self.store.find(name)
+                if project is None:
+                    continue
+                project_changes = {}
+                if client is not None and project.get('client') != client:
+                    project_changes['client'] = client
+                if shift_days:
+                    for field in ('start_date', 'end_date'):
+                        try:
+                            day = datetime.strptime(project.get(field, ''), '%Y-%m-%d')
+                        except (TypeError, ValueError):
+                            continue
+                        project_changes[field] = (day + timedelta(days=shift_days)).strftime('%Y-%m-%d')
+                if project_changes:
+                    project_changes['updated_at'] = now
+                    changes[name] = project_changes
+            if not changes:
+                return 0
+            self.store.update_projects(changes)
+        self.store.flush()
+        return len(changes)
+
+    def importer(self):
+        """ورود گروهی از CSV/TSV/JSONL (اعتبارسنجی و بعد commit)"""
+        return BulkImporter(self.store)
+
+    def flush(self):
+        """تغییرهای ذخیره‌نشده رو همین الان ذخیره می‌کنم"""
+        self.store.flush()
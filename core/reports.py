@@ -0,0 +1,167 @@
+import calendar
+from datetime import date, datetime, timedelta
+from core.errors import ValidationError
+from project_store import ProjectPager, ProjectStore
+from report_export import export_projects
+from result_cache import ResultCache
+
+
+def parse_day(text):
+    """تاریخ YYYY-MM-DD ورودی کاربر؛ قالب نادرست ValidationError می‌ده"""
+    try:
+        return datetime.strptime(text.strip(), '%Y-%m-%d').date()
+    except (AttributeError, ValueError):
+        raise ValidationError("فرمت تاریخ صحیح نیست. از فرمت YYYY-MM-DD استفاده کنید")
+
+
+def parse_range(first, last):
+    """بازه تاریخ (شروع، پایان)؛ پایان خالی یعنی همون روز شروع"""
+    first = parse_day(first)
+    last = parse_day(last) if last and last.strip() else first
+    if last < first:
+        raise ValidationError("تاریخ پایان بازه نمی‌تواند قبل از تاریخ شروع آن باشد")
+    return first, last
+
+
+def parse_month(year, month):
+    """(سال، ماه) به صورت عدد؛ ماه باید بین 1 و 12 باشه"""
+    try:
+        year = int(year)
+        month = int(month)
+    except (TypeError, ValueError):
+        raise ValidationError("لطفاً سال و ماه معتبر وارد کنید")
+    if not (1 <= month <= 12):
+        raise ValidationError("لطفاً سال و ماه معتبر وارد کنید")
+    return year, month
+
+
+def period_bounds(period, today=None):
+    """اولین و آخرین روز هفته/ماه/سالی که today درش هست"""
+    today = today or date.today()
+    if period == 'week':
+        first = today - timedelta(days=today.weekday())
+        return first, first + timedelta(days=6)
+    if period == 'month':
+        return today.replace(day=1), today.replace(day=calendar.monthrange(today.year, today.month)[1])
+    if period == 'year':
+        return today.replace(month=1, day=1), today.replace(month=12, day=31)
+    raise ValueError(f"دوره نامعتبر: {period}")
+
+
+class ReportService:
+    """همه گزارش‌ها به صورت متدهای ساده روی store، با کش نتیجه‌ها و بدون وابستگی به Tk
+
+    هر گزارش با کلید (گزارش، پارامترها، نسخه داده‌ها) کش می‌شه؛ گزارش‌هایی که
+    به وضعیت یا تاریخ امروز وابسته‌ان روز جاری هم در کلیدشون هست. قفل store
+    فقط برای ساختن کلید و گرفتن snapshot از ایندکس‌ها (داخل متدهای store)
+    گرفته می‌شه و محاسبه بیرون از قفله، پس Tk پشت گزارش‌های طولانی نمی‌مونه. خروجی لیست پروژه‌ها یا (لیست پروژه‌ها، اطلاعات اضافه) است.
+    check (اختیاری) برای لغو کردن کارهای طولانی وسط اجراست.
+    """
+
+    def __init__(self, store=None, result_cache=None):
+        self.store = store or ProjectStore.shared()
+        # کلیدها نسخه داده‌ها رو دارن پس بعد از هر تغییر خودبه‌خود کهنه می‌شن
+        self.result_cache = result_cache or ResultCache()
+
+    def cached_query(self, report, params, compute, by_day=False):
+        """نتیجه یه گزارش رو از کش برمی‌گردونم یا با compute حساب می‌کنم"""
+        with self.store.lock:
+            self.store.reload_if_changed()
+            version = self.store.version
+        key = (report, tuple(params), version, date.today() if by_day else None)
+        missing = object()
+        value = self.result_cache.get(key, missing)
+        if value is not missing:
+            return value
+        value = compute()
+        # اگه وسط محاسبه داده‌ها عوض شدن، نتیجه با کلید نسخه قبلی کش نمی‌شه
+        if self.store.version == version:
+            self.result_cache.put(key, value)
+        return value
+
+    def all_projects(self):
+        # پروژه‌ها صفحه به صفحه از store خونده می‌شن، بدون کپی گرفتن از کل لیست؛
+        # pager خودش نتیجه‌ای نگه نمی‌داره پس کش نمی‌شه
+        return ProjectPager(self.store)
+
+    def by_status(self, status):
+        return self.cached_query('status', (status,),
+                                 lambda: self.store.projects_with_status(status), by_day=True)
+
+    def advanced(self, query, check=None):
+        """جستجوی ترکیبی با ProjectQuery؛ planner از گزینش‌پذیرترین ایندکس شروع می‌کنه"""
+        return self.cached_query('advanced', query.cache_key(),
+                                 lambda: query.execute(self.store, check=check),
+                                 by_day=query.depends_on_day)
+
+    def explain(self, query):
+        """طرح اجرای یه ProjectQuery به صورت متن"""
+        query.execute(self.store)
+        return query.explain()
+
+    def by_name(self, term):
+        term = term.strip().lower()
+        return self.cached_query('name', (term,), lambda: self.store.search_projects(name=term))
+
+    def full_text(self, text):
+        """جستجوی متن کامل؛ نتایج به ترتیب امتیاز (مرتبط‌ترین اول)"""
+        text = text.strip()
+        return self.cached_query('full_text', (text,),
+                                 lambda: [project for project, _ in self.store.search_text(text)])
+
+    def clients(self):
+        return self.store.clients()
+
+    def by_client(self, client):
+        return self.cached_query('client', (client,), lambda: self.store.projects_by_client(client))
+
+    def starting_on(self, day):
+        return self.cached_query('start_date', (day,),
+                                 lambda: self.store.projects_starting_between(day, day))
+
+    def ending_on(self, day):
+        return self.cached_query('end_date', (day,),
+                                 lambda: self.store.projects_ending_between(day, day))
+
+    def active_between(self, first, last):
+        return self.cached_query('active', (first, last),
+                                 lambda: self.store.active_between(first, last))
+
+    def in_month(self, year, month):
+        """پروژه‌هایی که در این ماه شروع شده‌اند یا در این ماه پایان یافته‌اند"""
+        return self.cached_query('month', (year, month),
+                                 lambda: self.store.projects_in_month(year, month))
+
+    def financial_range(self, first, last, compare=False):
+        """(پروژه‌هایی که در بازه پایان می‌یابند، جمع‌های مالی بازه و در صورت compare دوره قبلش)"""
+        # جمع‌ها از آرایه‌های تجمعی روزانه؛ هزینه هر بازه ثابته
+        return self.cached_query(
+            'financial_range', (first, last, compare),
+            lambda: (self.store.projects_ending_between(first, last),
+                     self.store.compare_periods(first, last, 2 if compare else 1))
+        )
+
+    def financial_period(self, period, today=None):
+        """(پروژه‌هایی که در هفته/ماه/سال جاری پایان می‌یابند، جمع مالی همون دوره)"""
+        today = today or date.today()
+        first, last = period_bounds(period, today)
+        # جمع‌ها از جدول‌های دوره‌ای که با هر تغییر به‌روز می‌شن خونده می‌شن
+        return self.cached_query(
+            'financial_' + period, (today,),
+            lambda: (self.store.projects_ending_between(first, last),
+                     self.store.financial_rollup(period, today)),
+            by_day=True
+        )
+
+    def financial_by_client(self, first=None, last=None):
+        """جمع مالی به تفکیک کارفرما؛ با بازه فقط پروژه‌هایی که در [first, last] پایان می‌یابند"""
+        return self.cached_query('financial_by_client', (first, last),
+                                 lambda: self.store.financial_by_client(first, last))
+
+    def financial_trend(self, period):
+        """جمع مالی همه هفته‌ها/ماه‌ها/سال‌ها به ترتیب زمان"""
+        return self.store.financial_trend(period)
+
+    def export(self, projects, path, check=None):
+        """نتیجه یه گزارش رو بر اساس پسوند فایل (متن، CSV، TSV، JSONL یا XLSX) ذخیره می‌کنم"""
+        return export_projects(projects, path, self.store.status_of, check=check)
@@ -0,0 +1,305 @@
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from persistence import get_committer, report_error, write_file_atomic
+from project_indexes import ProjectIndex
+
+# فایل ایندکس متن کامل؛ نام نسبی کنار فایل‌های داده ذخیره‌ساز حساب می‌شه (storage.data_path)
+SEARCH_INDEX_FILE = os.environ.get('PM_SEARCH_INDEX', 'search_index.json')
+# وقتی لاگ تغییرات ایندکس از این اندازه (بایت) بزرگ‌تر بشه، با فایل اصلی ادغام می‌شه
+SEARCH_INDEX_COMPACT_BYTES = int(os.environ.get('PM_SEARCH_INDEX_COMPACT_BYTES', 4 * 1024 * 1024))
+# فیلدهایی که ایندکس می‌شن
+TEXT_FIELDS = ('description', 'team', 'client')
+INDEX_FORMAT = 1
+
+_TOKEN_RE = re.compile(r'\w+')
+# یکسان‌سازی حروف عربی و ارقام به حروف فارسی/لاتین
+_NORMALIZE = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ك': 'ک', 'ة': 'ه', 'أ': 'ا', 'إ': 'ا', 'آ': 'ا',
+    '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
+    '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9',
+})
+# translate با جدول dict کنده؛ فقط وقتی متن حرفی برای یکسان‌سازی داره صداش می‌زنم
+_NEEDS_NORMALIZE = re.compile('[' + ''.join(chr(code) for code in _NORMALIZE) + ']')
+
+
+def tokenize(text):
+    """متن رو به کلمه‌های کوچک‌شده و یکسان‌شده تبدیل می‌کنم (نیم‌فاصله هم جداکننده‌ست)"""
+    text = str(text).lower()
+    if _NEEDS_NORMALIZE.search(text):
+        text = text.translate(_NORMALIZE)
+    return _TOKEN_RE.findall(text)
+
+
+def _fingerprint(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class FullTextIndex(ProjectIndex):
+    """ایندکس معکوس متن کامل روی توضیحات، تیم و کارفرما با رتبه‌بندی BM25
+
+    ایندکس در فایل ذخیره می‌شه و هنگام بارگذاری فقط پروژه‌هایی که متنشون
+    عوض شده (با مقایسه اثر انگشت متن) دوباره توکن می‌شن.
+
+    هر ذخیره فقط سندهایی که با نسخه روی دیسک فرق دارن رو به انتهای یه لاگ
+    (path + '.log') اضافه می‌کنه؛ کل ایندکس فقط وقتی لاگ بزرگ شد بازنویسی می‌شه.
+    مثل ژورنال پروژه‌ها، لاگ اول کنار گذاشته می‌شه (.log.old) و فایل اصلی در
+    پس‌زمینه نوشته می‌شه، پس ذخیره (مثلاً بعد از ورود گروهی) منتظرش نمی‌مونه.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, path=SEARCH_INDEX_FILE, committer=None, compact_bytes=SEARCH_INDEX_COMPACT_BYTES):
+        # path برابر None یعنی ایندکس فقط در حافظه‌ست (مثلاً پایگاه داده :memory:)
+        self.path = path
+        self.log_path = None if path is None else path + ".log"
+        self.rotated_log_path = None if path is None else self.log_path + ".old"
+        self.committer = committer or get_committer()
+        self.compact_bytes = compact_bytes
+        self.clear()
+        # نام -> اثر انگشت سند روی دیسک (فایل اصلی + لاگ)
+        self._saved = {}
+        self._log_size = 0
+        self._compaction_thread = None
+        self._loaded = False
+
+    def clear(self):
+        # نام -> (اثر انگشت، طول سند، شمارش کلمه‌ها)
+        self._docs = {}
+        # کلمه -> {نام: تکرار}
+        self._postings = {}
+        self._total_length = 0
+        # نام سندهایی که از آخرین ذخیره دست خوردن
+        self._touched = set()
+
+    @property
+    def changed(self):
+        """ایندکس با نسخه روی دیسک فرق داره؛ حذف و افزودن دوباره همون متن تغییر حساب نمی‌شه"""
+        return any(self._fingerprint_of(name) != self._saved.get(name) for name in self._touched)
+
+    def _fingerprint_of(self, name):
+        doc = self._docs.get(name)
+        return None if doc is None else doc[0]
+
+    def _text(self, project):
+        return '\n'.join(str(project.get(field, '')) for field in TEXT_FIELDS)
+
+    def _load(self):
+        """ایندکس ذخیره‌شده و بعد لاگ تغییراتش رو (اگه سالم باشن) می‌خونم"""
+        self._loaded = True
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        if isinstance(data, dict) and data.get('format') == INDEX_FORMAT:
+            self._apply_docs(data.get('docs', {}))
+        # اگه ادغام قبلی نیمه‌کاره مونده، لاگ کنار گذاشته‌شده هنوز لازمه
+        self._replay_log(self.rotated_log_path)
+        self._log_size = self._replay_log(self.log_path)
+        self._saved = {name: doc[0] for name, doc in self._docs.items()}
+        self._touched = set()
+
+    def _replay_log(self, path):
+        """خط‌های لاگ رو به ترتیب اعمال می‌کنم و اندازه‌اش رو برمی‌گردونم
+
+        خط نیمه‌کاره (قطع برق وسط نوشتن) نادیده گرفته می‌شه.
+        """
+        try:
+            with open(path, 'rb') as f:
+                lines = f.read()
+        except OSError:
+            return 0
+        for line in lines.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and entry.get('format') == INDEX_FORMAT:
+                self._apply_docs(entry.get('docs', {}))
+        return len(lines)
+
+    def _apply_docs(self, docs):
+        for name, doc in docs.items():
+            self._drop(name)
+            if doc is not None:
+                fingerprint, counts = doc
+                self._store_doc(name, fingerprint, counts)
+
+    def save_if_changed(self):
+        """فقط سندهای تغییرکرده رو به لاگ اضافه می‌کنم؛ اگه لاگ بزرگ بشه، کل ایندکس بازنویسی می‌شه"""
+        delta = {}
+        for name in self._touched:
+            fingerprint = self._fingerprint_of(name)
+            if fingerprint != self._saved.get(name):
+                doc = self._docs.get(name)
+                delta[name] = None if doc is None else [doc[0], doc[2]]
+        self._touched = set()
+        if not delta:
+            return False
+        if self.path is None:
+            self._mark_saved(delta)
+            return False
+        # وقتی بیشتر ایندکس عوض شده (مثلاً ورود گروهی)، نوشتن کل ایندکس ارزون‌تر از لاگه
+        if len(delta) > len(self._docs) // 2 and self.start_compaction():
+            return True
+        line = (json.dumps({'format': INDEX_FORMAT, 'docs': delta}, ensure_ascii=False,
+                           separators=(',', ':')) + "\n").encode('utf-8')
+        if self._log_size + len(line) > self.compact_bytes and self.start_compaction():
+            return True
+        with open(self.log_path, 'ab') as f:
+            f.write(line)
+        self.committer.sync_append(self.log_path)
+        self._log_size += len(line)
+        self._mark_saved(delta)
+        return True
+
+    def _mark_saved(self, delta):
+        for name, doc in delta.items():
+            if doc is None:
+                self._saved.pop(name, None)
+            else:
+                self._saved[name] = doc[0]
+
+    def start_compaction(self):
+        """لاگ فعلی رو کنار می‌ذارم و کل ایندکس رو در پس‌زمینه در فایل اصلی می‌نویسم
+
+        اگه ادغام قبلی هنوز تموم نشده False برمی‌گرده تا تغییرها فعلاً به لاگ اضافه بشن.
+        """
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return False
+        if os.path.exists(self.log_path):
+            os.replace(self.log_path, self.rotated_log_path)
+        self._log_size = 0
+        # شمارش کلمه‌های هر سند بعد از ثبت عوض نمی‌شه، پس کپی سطحی کافیه
+        docs = dict(self._docs)
+        self._saved = {name: doc[0] for name, doc in docs.items()}
+        self._touched = set()
+        self._compaction_thread = threading.Thread(target=self._compact, args=(docs,), daemon=True)
+        self._compaction_thread.start()
+        return True
+
+    def _compact(self, docs):
+        docs = {name: [fingerprint, counts] for name, (fingerprint, _, counts) in docs.items()}
+        data = json.dumps({'format': INDEX_FORMAT, 'docs': docs}, ensure_ascii=False, separators=(',', ':'))
+        try:
+            # فایل اصلی باید قبل از حذف لاگ کنار گذاشته‌شده روی دیسک باشه، پس group commit نمی‌شه
+            write_file_atomic(self.path, data)
+            if os.path.exists(self.rotated_log_path):
+                os.remove(self.rotated_log_path)
+        except OSError as e:
+            # لاگ کنار گذاشته‌شده می‌مونه و بارگذاری بعدی از روی اون ادامه می‌ده
+            report_error(f"ادغام ایندکس {self.path}", e)
+
+    def wait_for_compaction(self):
+        """اگه ادغامی در حال اجراست، منتظر تموم شدنش می‌مونم"""
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+    def rebuild(self, projects):
+        """فقط سندهای جدید یا تغییرکرده رو دوباره ایندکس می‌کنم"""
+        if not self._loaded:
+            self._load()
+        seen = set()
+        for project in projects:
+            seen.add(project['name'])
+            self.add(project)
+        for name in [name for name in self._docs if name not in seen]:
+            self._drop(name)
+
+    def _store_doc(self, name, fingerprint, counts):
+        length = sum(counts.values())
+        self._docs[name] = (fingerprint, length, counts)
+        self._total_length += length
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[name] = count
+        self._touched.add(name)
+
+    def _drop(self, name):
+        doc = self._docs.pop(name, None)
+        if doc is None:
+            return
+        _, length, counts = doc
+        self._total_length -= length
+        for term in counts:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(name, None)
+                if not postings:
+                    del self._postings[term]
+        self._touched.add(name)
+
+    def add(self, project):
+        text = self._text(project)
+        fingerprint = _fingerprint(text)
+        doc = self._docs.get(project['name'])
+        if doc is not None:
+            if doc[0] == fingerprint:
+                return
+            self._drop(project['name'])
+        counts = {}
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+        self._store_doc(project['name'], fingerprint, counts)
+
+    def add_many(self, projects):
+        """ورود گروهی؛ همون add با دسترسی مستقیم به ساختارها و بدون صدا زدن تابع برای هر سند"""
+        docs = self._docs
+        postings = self._postings
+        touched = self._touched
+        total = 0
+        for project in projects:
+            name = project['name']
+            text = self._text(project)
+            fingerprint = _fingerprint(text)
+            doc = docs.get(name)
+            if doc is not None:
+                if doc[0] == fingerprint:
+                    continue
+                self._drop(name)
+            terms = tokenize(text)
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            docs[name] = (fingerprint, len(terms), counts)
+            total += len(terms)
+            for term, count in counts.items():
+                term_postings = postings.get(term)
+                if term_postings is None:
+                    postings[term] = {name: count}
+                else:
+                    term_postings[name] = count
+            touched.add(name)
+        self._total_length += total
+
+    def remove(self, project):
+        self._drop(project['name'])
+
+    def search(self, query, limit=None):
+        """لیست (نام، امتیاز) سندهای مرتبط با query، از بیشترین امتیاز"""
+        terms = set(tokenize(query))
+        count = len(self._docs)
+        if not terms or not count:
+            return []
+        average = self._total_length / count or 1
+        scores = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for name, frequency in postings.items():
+                length = self._docs[name][1]
+                norm = self.k1 * (1 - self.b + self.b * length / average)
+                scores[name] = scores.get(name, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        if limit is not None:
+            return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -2,11 +2,13 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import os
+import queue
 from datetime import datetime, timedelta
 from auth_manager import AuthManager
 from project_manager import ProjectManager
 from reports_manager import ReportsManager
 from text_editor import TextEditor
+from persistence import add_error_listener
 
 class ProjectManagementApp:
     def __init__(self):
@@ -24,7 +26,12 @@ class ProjectManagementApp:
         self.current_user = None
         self.is_logged_in = False
         
+        # خطاهای ذخیره‌سازی از threadهای پس‌زمینه میان؛ اینجا صف می‌شن و با after نشون داده می‌شن
+        self.persistence_errors = queue.Queue()
+        add_error_listener(lambda what, error: self.persistence_errors.put((what, error)))
+        
         self.setup_ui()
+        self.root.after(500, self.show_persistence_errors)
         
     def setup_fonts(self):
         """فونت‌ها رو تنظیم می‌کنم"""
@@ -202,14 +209,47 @@ class ProjectManagementApp:
                 fg='#7f8c8d'
             )
     
+    def show_persistence_errors(self):
+        """خطاهای ذخیره‌سازی پس‌زمینه رو روی thread اصلی به کاربر نشون می‌دم"""
+        messages = []
+        while True:
+            try:
+                what, error = self.persistence_errors.get_nowait()
+            except queue.Empty:
+                break
+            messages.append(f"{what}: {error}")
+        if messages:
+            messagebox.showerror(
+                "خطا در ذخیره‌سازی",
+                "ذخیره تغییرات ناموفق بود؛ تغییرات در حافظه نگه داشته شده و دوباره تلاش می‌شود:\n\n"
+                + "\n".join(messages[:10])
+            )
+        self.root.after(500, self.show_persistence_errors)
+    
     def quit_app(self):
         """از برنامه خارج می‌شم"""
         if messagebox.askyesno("تأیید", "آیا مطمئن هستید که می‌خواهید خارج شوید؟"):
+            if not self.flush_data() and not messagebox.askyesno(
+                    "خطا در ذخیره‌سازی",
+                    "بعضی تغییرات ذخیره نشدند و با خروج از بین می‌روند. باز هم خارج می‌شوید؟"):
+                return
             self.root.quit()
     
+    def flush_data(self):
+        """تغییرهای ذخیره‌نشده همه بخش‌ها رو روی دیسک می‌برم؛ اگه نشد False برمی‌گرده"""
+        saved = True
+        for manager in (self.project_manager, self.auth_manager):
+            try:
+                manager.flush()
+            except Exception:
+                # خطا (CommitError یا خطای خود ذخیره‌ساز) از طریق شنونده گزارش شده
+                saved = False
+        return saved
+    
     def run(self):
         """برنامه رو اجرا می‌کنم"""
         self.root.mainloop()
+        self.flush_data()
 
 if __name__ == "__main__":
     app = ProjectManagementApp()
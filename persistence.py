@@ -0,0 +1,322 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+# بازه group commit (ثانیه)؛ ذخیره‌هایی که در این بازه برسن با هم نوشته می‌شن
+COMMIT_WINDOW = float(os.environ.get('PM_COMMIT_WINDOW', 0.05))
+# تأخیر ذخیره‌سازی تغییرات (ثانیه)؛ تغییرات پشت سر هم با هم ذخیره می‌شن
+FLUSH_DELAY = float(os.environ.get('PM_FLUSH_DELAY', 1.0))
+# بیشترین فاصله (ثانیه) بین تلاش‌های دوباره برای ذخیره‌ای که شکست خورده
+MAX_RETRY_DELAY = float(os.environ.get('PM_MAX_RETRY_DELAY', 60.0))
+
+logger = logging.getLogger(__name__)
+# callback(شرح کار، خطا) برای خطاهای ذخیره‌سازی که در threadهای پس‌زمینه رخ می‌دن
+_error_listeners = []
+
+
+def add_error_listener(callback):
+    """callback روی همون threadی که خطا داده صدا زده می‌شه؛ رابط کاربری باید با after منتقلش کنه"""
+    _error_listeners.append(callback)
+
+
+def report_error(what, error):
+    """خطای ذخیره‌سازی رو log می‌کنم و به شنونده‌ها (مثلاً رابط کاربری) خبر می‌دم"""
+    logger.error("%s: %s", what, error, exc_info=(type(error), error, error.__traceback__))
+    for callback in list(_error_listeners):
+        try:
+            callback(what, error)
+        except Exception:
+            logger.exception("خطا در شنونده خطاهای ذخیره‌سازی")
+
+
+class CommitError(OSError):
+    """نوشتن یک یا چند فایل شکست خورد؛ failures: {مسیر: خطا}"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__("ذخیره فایل‌ها ناموفق بود: " + ", ".join(
+            f"{path} ({error})" for path, error in failures.items()))
+
+
+def file_signature(path):
+    """زمان تغییر و اندازه یه فایل رو برمی‌گردونم"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def fsync_directory(path):
+    """پوشه فایل رو fsync می‌کنم تا rename هم روی دیسک ثبت بشه"""
+    _fsync_path_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def _fsync_path_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # ویندوز باز کردن پوشه رو پشتیبانی نمی‌کنه
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_temp(path, text):
+    """متن رو در یه فایل موقت کنار فایل اصلی می‌نویسم و fsync می‌کنم"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path
+
+
+def commit_temp(tmp_path, path, sync_directory=True):
+    """فایل موقت رو به صورت اتمیک جای فایل اصلی می‌ذارم"""
+    os.replace(tmp_path, path)
+    if sync_directory:
+        fsync_directory(path)
+
+
+def write_file_atomic(path, text):
+    """نوشتن امن: فایل موقت، fsync و بعد rename؛ وسط کار فایل اصلی هیچ‌وقت نصفه نمی‌مونه"""
+    commit_temp(write_temp(path, text), path)
+
+
+class GroupCommitter:
+    """ذخیره‌های پشت سر هم رو جمع می‌کنم و در یه نوبت روی دیسک می‌نویسم
+
+    برای هر فایل فقط آخرین نسخه نوشته می‌شه، پس چند ذخیره پشت سر هم (مثلاً
+    چند ورود ناموفق یا ویرایش گروهی) فقط یه بار fsync می‌شن.
+
+    خطای نوشتن یه فایل بقیه فایل‌ها و thread نوشتن رو متوقف نمی‌کنه: خطا log و
+    به شنونده‌ها گزارش می‌شه، در failures می‌مونه و متن همون فایل نگه داشته
+    می‌شه تا با flush صریح بعدی (یا ذخیره جدیدتر همون فایل) دوباره نوشته بشه.
+    """
+
+    def __init__(self, window=COMMIT_WINDOW):
+        self.window = window
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._seq = 0
+        # مسیر -> (شماره ترتیب، متن) برای فایل‌هایی که هنوز نوشته نشدن
+        self._pending = {}
+        # فایل‌هایی که بعد از append فقط باید fsync بشن
+        self._sync_paths = set()
+        # مسیر -> (شماره ترتیب، امضای فایل) آخرین نوشتن خودمون
+        self._written = {}
+        # مسیر -> (شماره ترتیب، متن) نوشتن‌های ناموفق که منتظر تلاش دوباره‌ان
+        self._failed = {}
+        # مسیر -> آخرین خطای نوشتن؛ با اولین نوشتن موفق پاک می‌شه
+        self.failures = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, path, text):
+        """متن کامل یه فایل رو برای نوشتن در نوبت بعدی ثبت می‌کنم"""
+        with self._cond:
+            self._seq += 1
+            self._pending[path] = (self._seq, text)
+            # نسخه جدید جای نسخه ناموفق قبلی رو می‌گیره
+            self._failed.pop(path, None)
+            self._cond.notify()
+
+    def sync_append(self, path):
+        """درخواست fsync برای فایلی که بهش append شده"""
+        with self._cond:
+            self._sync_paths.add(path)
+            self._cond.notify()
+
+    def signature(self, path):
+        """امضای فایل؛ نوشتن‌های خودمون امضای ثابتی دارن تا باعث بارگذاری مجدد نشن"""
+        with self._cond:
+            if path in self._pending:
+                return ('own', self._pending[path][0])
+            if path in self._failed:
+                # نسخه حافظه جدیدتر از فایله و هنوز ذخیره نشده؛ نباید باعث بارگذاری مجدد بشه
+                return ('own', self._failed[path][0])
+            written = self._written.get(path)
+        current = file_signature(path)
+        if written is not None and current == written[1]:
+            return ('own', written[0])
+        return current
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._sync_paths and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending and not self._sync_paths:
+                    return
+            # کمی صبر می‌کنم تا ذخیره‌های نزدیک به هم هم برسن
+            time.sleep(self.window)
+            try:
+                self._write_pending(retry_failed=False)
+            except Exception as e:
+                # هیچ خطایی نباید تنها thread نوشتن رو از کار بندازه
+                report_error("group commit", e)
+
+    def flush(self, raise_errors=True):
+        """همه نوشتن‌های در انتظار (و ناموفق‌های قبلی) رو همین الان روی دیسک می‌برم
+
+        اگه نوشتن فایلی باز هم شکست بخوره و raise_errors باشه، CommitError می‌دم.
+        """
+        failures = self._write_pending(retry_failed=True)
+        if failures and raise_errors:
+            raise CommitError(failures)
+        return failures
+
+    def _write_pending(self, retry_failed):
+        with self._write_lock:
+            with self._cond:
+                if retry_failed:
+                    for path, entry in self._failed.items():
+                        self._pending.setdefault(path, entry)
+                    self._failed = {}
+                pending = dict(self._pending)
+                sync_paths = self._sync_paths
+                self._sync_paths = set()
+            directories = set()
+            failures = {}
+            for path, (seq, text) in pending.items():
+                try:
+                    tmp_path = write_temp(path, text)
+                    signature = file_signature(tmp_path)
+                    commit_temp(tmp_path, path, sync_directory=False)
+                except Exception as e:
+                    failures[path] = e
+                    with self._cond:
+                        if self._pending.get(path, (None,))[0] == seq:
+                            del self._pending[path]
+                            self._failed[path] = (seq, text)
+                        self.failures[path] = e
+                    report_error(f"نوشتن {path}", e)
+                    continue
+                directories.add(os.path.dirname(os.path.abspath(path)))
+                with self._cond:
+                    self._written[path] = (seq, signature)
+                    self.failures.pop(path, None)
+                    if self._pending.get(path, (None,))[0] == seq:
+                        del self._pending[path]
+            for path in sync_paths:
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except OSError:
+                    continue
+                try:
+                    os.fsync(fd)
+                except OSError as e:
+                    failures[path] = e
+                    report_error(f"fsync {path}", e)
+                finally:
+                    os.close(fd)
+            for directory in directories:
+                _fsync_path_directory(directory)
+            return failures
+
+    def close(self):
+        """باقی‌مونده‌ها رو می‌نویسم و thread رو متوقف می‌کنم"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.flush(raise_errors=False)
+        self._thread.join(timeout=5)
+
+
+class DeferredFlush:
+    """نسخه تغییرات رو می‌شمرم و ذخیره رو با تأخیر (debounce) انجام می‌دم
+
+    صاحب این شیء با هر تغییر واقعی mark_dirty رو صدا می‌زنه؛ اگه تا پایان
+    تأخیر تغییر دیگه‌ای نیومد، callback یک بار صدا زده می‌شه. تغییرهای بی‌اثر
+    اصلاً dirty نمی‌کنن و هیچ نوشتنی انجام نمی‌شه.
+
+    اگه callback خطا بده، تغییرها dirty می‌مونن (پس از دیسک روشون بارگذاری
+    نمی‌شه)، خطا log و به شنونده‌ها گزارش می‌شه و ذخیره با فاصله‌ای که هر بار
+    دو برابر می‌شه (تا MAX_RETRY_DELAY) دوباره امتحان می‌شه.
+    """
+
+    def __init__(self, callback, delay=FLUSH_DELAY, lock=None):
+        self.callback = callback
+        self.delay = delay
+        self.lock = lock or threading.RLock()
+        self.version = 0
+        self.flushed_version = 0
+        self._timer = None
+        # تعداد شکست‌های پشت سر هم؛ با اولین ذخیره موفق صفر می‌شه
+        self.failures = 0
+        self.last_error = None
+        atexit.register(self.flush, raise_errors=False)
+
+    @property
+    def dirty(self):
+        return self.version != self.flushed_version
+
+    def mark_dirty(self):
+        """یه تغییر واقعی ثبت می‌کنم و تایمر ذخیره رو از نو شروع می‌کنم"""
+        with self.lock:
+            self.version += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            if self.delay <= 0:
+                self._timer = None
+                self.flush(raise_errors=False)
+                return
+            self._schedule(self.delay)
+
+    def _schedule(self, delay):
+        self._timer = threading.Timer(delay, self.flush, kwargs={'raise_errors': False})
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self, raise_errors=True):
+        """اگه تغییری ذخیره نشده مونده، همین الان ذخیره‌اش می‌کنم
+
+        اگه ذخیره شکست بخوره، تلاش دوباره زمان‌بندی می‌شه و (با raise_errors)
+        همون خطا به صدازننده هم برمی‌گرده.
+        """
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.dirty:
+                return False
+            version = self.version
+            try:
+                self.callback()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = e
+                # فقط اولین شکست هر دوره به کاربر گزارش می‌شه؛ بقیه فقط log می‌شن
+                if self.failures == 1:
+                    report_error("ذخیره تغییرات", e)
+                else:
+                    logger.warning("ذخیره تغییرات دوباره ناموفق بود (%d): %s", self.failures, e)
+                retry = max(self.delay, 0.5) * 2 ** (self.failures - 1)
+                self._schedule(min(retry, MAX_RETRY_DELAY))
+                if raise_errors:
+                    raise
+                return False
+            self.failures = 0
+            self.last_error = None
+            self.flushed_version = version
+            return True
+
+
+_committer = None
+
+
+def get_committer():
+    """group committer مشترک برنامه رو برمی‌گردونم"""
+    global _committer
+    if _committer is None:
+        _committer = GroupCommitter()
+        atexit.register(_committer.close)
+    return _committer
@@ -0,0 +1,187 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from report_export import EXPORT_COLUMNS
+
+# تعداد رکوردهایی که با هم خونده و اعتبارسنجی می‌شن
+IMPORT_BATCH_SIZE = 5000
+PROJECT_FIELDS = ('name', 'client', 'start_date', 'end_date', 'income', 'cost',
+                  'team', 'description', 'created_at', 'updated_at')
+COMPANY_FIELDS = ('name', 'phone', 'address', 'created_at')
+# سرستون‌های فارسی (مثلاً فایل CSV خروجی گزارش‌ها) هم قبول می‌شن
+HEADER_ALIASES = {title: key for key, title in EXPORT_COLUMNS}
+HEADER_ALIASES.update({
+    'تیم': 'team',
+    'توضیحات': 'description',
+    'نام شرکت': 'name',
+    'نام شرکت/کارفرما': 'name',
+    'شماره تماس': 'phone',
+    'آدرس': 'address',
+})
+
+
+def read_records(path):
+    """رکوردهای فایل ورودی رو یکی‌یکی برمی‌گردونم: (شماره خط، رکورد، خطا)
+
+    قالب از پسوند انتخاب می‌شه: .jsonl (یه شیء JSON در هر خط)، .tsv یا CSV.
+    خط خراب با رکورد None و پیام خطا برمی‌گرده و بقیه فایل خونده می‌شه.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.jsonl', '.ndjson'):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    yield line_no, None, "JSON نامعتبر"
+                    continue
+                if not isinstance(record, dict):
+                    yield line_no, None, "هر خط باید یک شیء JSON باشد"
+                    continue
+                yield line_no, record, None
+        return
+    delimiter = '\t' if ext == '.tsv' else ','
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        keys = [HEADER_ALIASES.get(title.strip(), title.strip()) for title in header]
+        for row in reader:
+            if not any(value.strip() for value in row):
+                continue
+            yield reader.line_num, dict(zip(keys, row)), None
+
+
+def _batches(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportResult:
+    """نتیجه اعتبارسنجی یه فایل: رکوردهای سالم و خطاهای هر ردیف (شماره خط، پیام)"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.records = []
+        self.errors = []
+        self.rows = 0
+        self.seconds = 0
+
+    def error_text(self, limit=20):
+        """چند خطای اول برای نمایش به کاربر"""
+        lines = [f"خط {line_no}: {message}" for line_no, message in self.errors[:limit]]
+        if len(self.errors) > limit:
+            lines.append(f"... و {len(self.errors) - limit} خطای دیگر")
+        return '\n'.join(lines)
+
+
+class BulkImporter:
+    """ورود گروهی پروژه‌ها و شرکت‌ها از CSV/TSV/JSONL
+
+    ورودی به صورت جریانی و در دسته‌های IMPORT_BATCH_SIZE تایی خونده و
+    اعتبارسنجی می‌شه (همون قواعد فرم ثبت، به علاوه قالب تاریخ‌ها)؛ تکراری
+    بودن نام با ایندکس نام‌های store و نام‌های قبلی همون فایل چک می‌شه.
+    رکوردهای سالم بعد از تأیید با commit و یه بار نوشتن ذخیره می‌شن.
+    """
+
+    def __init__(self, store, batch_size=IMPORT_BATCH_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+
+    def validate_projects(self, path):
+        started = time.perf_counter()
+        result = ImportResult('projects')
+        now = datetime.now().isoformat()
+        seen = set()
+        with self.store.lock:
+            self.store.reload_if_changed()
+            for batch in _batches(read_records(path), self.batch_size):
+                for line_no, record, error in batch:
+                    result.rows += 1
+                    if error is None:
+                        project, error = self._project(record, now)
+                    if error is None:
+                        if self.store.has_project(project['name']) or project['name'] in seen:
+                            error = f"پروژه‌ای با نام «{project['name']}» قبلاً ثبت شده است"
+                    if error is not None:
+                        result.errors.append((line_no, error))
+                        continue
+                    seen.add(project['name'])
+                    result.records.append(project)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def _project(self, record, now):
+        """(پروژه، None) یا (None، پیام خطا)"""
+        project = {field: str(record.get(field) or '').strip() for field in PROJECT_FIELDS}
+        if not all(project[field] for field in ('name', 'client', 'start_date', 'end_date')):
+            return None, "فیلدهای اجباری (نام، کارفرما، تاریخ شروع و پایان) خالی است"
+        for field in ('start_date', 'end_date'):
+            # فقط قالب YYYY-MM-DD؛ fromisoformat شکل‌هایی مثل 20240101 رو هم قبول می‌کرد
+            try:
+                day = datetime.strptime(project[field], '%Y-%m-%d').date()
+            except ValueError:
+                return None, f"تاریخ «{project[field]}» نامعتبر است (YYYY-MM-DD)"
+            # 2024-1-5 هم با strptime خونده می‌شه؛ شکل استاندارد ذخیره می‌شه
+            project[field] = day.isoformat()
+        try:
+            project['income'] = float(record.get('income'))
+            project['cost'] = float(record.get('cost'))
+        except (TypeError, ValueError):
+            return None, "مقادیر مالی باید عددی باشند"
+        project['created_at'] = project['created_at'] or now
+        project['updated_at'] = project['updated_at'] or now
+        return project, None
+
+    def validate_companies(self, path, companies):
+        started = time.perf_counter()
+        result = ImportResult('companies')
+        now = datetime.now().isoformat()
+        seen = {company['name'] for company in companies}
+        for batch in _batches(read_records(path), self.batch_size):
+            for line_no, record, error in batch:
+                result.rows += 1
+                if error is None:
+                    company = {field: str(record.get(field) or '').strip() for field in COMPANY_FIELDS}
+                    if not company['name']:
+                        error = "نام شرکت خالی است"
+                    elif company['name'] in seen:
+                        error = f"شرکتی با نام «{company['name']}» قبلاً ثبت شده است"
+                if error is not None:
+                    result.errors.append((line_no, error))
+                    continue
+                company['created_at'] = company['created_at'] or now
+                seen.add(company['name'])
+                result.records.append(company)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def commit_projects(self, result):
+        """همه پروژه‌های سالم با یه بار نوشتن ذخیره می‌شن"""
+        with self.store.lock:
+            # اگه بین اعتبارسنجی و تأیید پروژه‌ای با همون نام ثبت شده باشه، کنار گذاشته می‌شه
+            projects = [project for project in result.records
+                        if not self.store.has_project(project['name'])]
+            if projects:
+                self.store.add_projects(projects)
+        if projects:
+            self.store.flush()
+        return len(projects)
+
+    def commit_companies(self, result, companies, storage):
+        if result.records:
+            companies.extend(result.records)
+            storage.save_companies(companies)
+        return len(result.records)
@@ -0,0 +1,533 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+
+
+def parse_date(value):
+    """تاریخ YYYY-MM-DD رو به date تبدیل می‌کنم؛ تاریخ نامعتبر None می‌شه"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def date_ordinal(value):
+    """شماره روز (ordinal) یه تاریخ یا None"""
+    if isinstance(value, int):
+        return value
+    parsed = parse_date(value)
+    return parsed.toordinal() if parsed is not None else None
+
+
+class ProjectIndex:
+    """پایه ایندکس‌های ثانویه پروژه‌ها؛ ProjectStore با هر تغییر صداش می‌زنه"""
+
+    def rebuild(self, projects):
+        """ایندکس رو از روی کل لیست از نو می‌سازم"""
+        self.clear()
+        for project in projects:
+            self.add(project)
+
+    def clear(self):
+        raise NotImplementedError
+
+    def add(self, project):
+        raise NotImplementedError
+
+    def add_many(self, projects):
+        """چند پروژه جدید رو یک‌جا اضافه می‌کنم (ورود گروهی)"""
+        for project in projects:
+            self.add(project)
+
+    def remove(self, project):
+        """project نسخه قبل از تغییره (نام و فیلدهای قدیمی)"""
+        raise NotImplementedError
+
+
+class ClientIndex(ProjectIndex):
+    """ایندکس کارفرما -> نام پروژه‌ها، به همراه لیست مرتب کارفرماها"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._names = {}
+        self._sorted_clients = None
+
+    def add(self, project):
+        client = project.get('client', '')
+        if client not in self._names:
+            self._names[client] = {}
+            self._sorted_clients = None
+        self._names[client][project['name']] = None
+
+    def remove(self, project):
+        client = project.get('client', '')
+        names = self._names.get(client)
+        if names is None:
+            return
+        names.pop(project['name'], None)
+        if not names:
+            del self._names[client]
+            self._sorted_clients = None
+
+    def names_for(self, client):
+        """نام پروژه‌های یه کارفرما"""
+        return list(self._names.get(client, ()))
+
+    def clients(self):
+        """لیست مرتب کارفرماهایی که پروژه دارن (کش می‌شه تا تغییر بعدی)"""
+        if self._sorted_clients is None:
+            self._sorted_clients = sorted(client for client in self._names if client)
+        return self._sorted_clients
+
+
+def parse_number(value):
+    """عدد (درآمد/هزینه) رو به float تبدیل می‌کنم؛ مقدار نامعتبر None می‌شه"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SortedIndex(ProjectIndex):
+    """آرایه مرتب (مقدار، نام) برای یه فیلد؛ جستجوی بازه با bisect
+
+    پروژه‌هایی که مقدارشون قابل تبدیل نیست جدا نگه داشته می‌شن.
+    """
+
+    def __init__(self, field, default=None):
+        self.field = field
+        # مقدار فیلدهایی که در پروژه نیستن (مثل income که پیش‌فرضش 0 بوده)
+        self.default = default
+        self.clear()
+
+    def key(self, value):
+        raise NotImplementedError
+
+    def clear(self):
+        self._entries = []
+        # نام -> مقدار؛ هر مقدار فقط یه بار (موقع افزودن) parse می‌شه
+        self._values = {}
+        self._invalid = set()
+
+    def rebuild(self, projects):
+        self.clear()
+        for project in projects:
+            value = self.key(project.get(self.field, self.default))
+            if value is not None:
+                self._values[project['name']] = value
+            else:
+                self._invalid.add(project['name'])
+        self._entries = sorted((value, name) for name, value in self._values.items())
+
+    def add(self, project):
+        value = self.key(project.get(self.field, self.default))
+        if value is not None:
+            self._values[project['name']] = value
+            insort(self._entries, (value, project['name']))
+        else:
+            self._invalid.add(project['name'])
+
+    def add_many(self, projects):
+        # به جای insort تک‌تک (هر کدوم O(n))، ورودی‌های جدید ته آرایه میان و یه بار مرتب می‌شن
+        entries = []
+        for project in projects:
+            value = self.key(project.get(self.field, self.default))
+            if value is not None:
+                self._values[project['name']] = value
+                entries.append((value, project['name']))
+            else:
+                self._invalid.add(project['name'])
+        self._entries.extend(entries)
+        self._entries.sort()
+
+    def remove(self, project):
+        self._invalid.discard(project['name'])
+        value = self._values.pop(project['name'], None)
+        if value is None:
+            return
+        entry = (value, project['name'])
+        i = bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    def value_of(self, name):
+        """مقدار parse شده برای یه پروژه (یا None)"""
+        return self._values.get(name)
+
+    def value_for(self, project):
+        """مقدار parse شده مستقیم از خود پروژه؛ به وضعیت ایندکس دست نمی‌زنه و بیرون از قفل هم امنه"""
+        return self.key(project.get(self.field, self.default))
+
+    def invalid_names(self):
+        """نام پروژه‌هایی که این فیلدشون نامعتبره"""
+        return list(self._invalid)
+
+    def _bounds(self, first, last):
+        lo = 0 if first is None else bisect_left(self._entries, (first,))
+        hi = len(self._entries) if last is None else self._upper(last)
+        return lo, max(lo, hi)
+
+    def _upper(self, last):
+        # اولین جایگاه بعد از همه مقدارهای <= last
+        lo, hi = 0, len(self._entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entries[mid][0] <= last:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def count_between(self, first, last):
+        """تعداد پروژه‌های بازه بدون ساختن لیست (برای تخمین هزینه)"""
+        lo, hi = self._bounds(first, last)
+        return hi - lo
+
+    def values_between(self, first, last):
+        """نام پروژه‌هایی که مقدارشون بین first و last (شامل هر دو؛ None یعنی بی‌حد) باشه"""
+        lo, hi = self._bounds(first, last)
+        return [name for _, name in self._entries[lo:hi]]
+
+    def entries_after(self, after, limit):
+        """حداکثر limit ورودی (مقدار، نام) بعد از کلید after (خودش شامل نمی‌شه؛ None یعنی از اول)"""
+        lo = 0 if after is None else bisect_right(self._entries, tuple(after))
+        return self._entries[lo:lo + limit]
+
+
+class TextIndex(SortedIndex):
+    """آرایه مرتب (متن، نام) برای ترتیب الفبایی، مثلاً صفحه‌بندی بر اساس نام"""
+
+    def key(self, value):
+        return value if isinstance(value, str) else None
+
+
+class DateIndex(SortedIndex):
+    """آرایه مرتب (شماره روز، نام) برای یه فیلد تاریخ"""
+
+    def key(self, value):
+        return date_ordinal(value)
+
+    def ordinal_of(self, name):
+        """شماره روز ذخیره‌شده برای یه پروژه"""
+        return self._values.get(name)
+
+    def count_between(self, first, last):
+        return super().count_between(self._ordinal(first), self._ordinal(last))
+
+    def names_between(self, first, last):
+        """نام پروژه‌هایی که این تاریخشون بین first و last (شامل هر دو) باشه"""
+        return self.values_between(self._ordinal(first), self._ordinal(last))
+
+    def _ordinal(self, value):
+        return None if value is None else date_ordinal(value)
+
+
+class NumberIndex(SortedIndex):
+    """آرایه مرتب (عدد، نام) برای فیلدهای عددی مثل درآمد"""
+
+    def key(self, value):
+        return parse_number(value)
+
+    def names_between(self, first, last):
+        return self.values_between(first, last)
+
+
+class _IntervalNode:
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+
+def _build_interval_tree(intervals):
+    """درخت بازه متمرکز: هر گره بازه‌هایی که از مرکزش رد می‌شن رو نگه می‌داره"""
+    if not intervals:
+        return None
+    intervals = sorted(intervals)
+    node = _IntervalNode()
+    # شروع بازه میانه به عنوان مرکز؛ هر گره حداقل یه بازه داره
+    node.center = center = intervals[len(intervals) // 2][0]
+    left, right, here = [], [], []
+    for interval in intervals:
+        if interval[1] < center:
+            left.append(interval)
+        elif interval[0] > center:
+            right.append(interval)
+        else:
+            here.append(interval)
+    node.by_start = here
+    node.by_end = sorted(here, key=lambda interval: interval[1], reverse=True)
+    node.left = _build_interval_tree(left)
+    node.right = _build_interval_tree(right)
+    return node
+
+
+class IntervalIndex(ProjectIndex):
+    """ایندکس بازه [تاریخ شروع، تاریخ پایان] برای پرس‌وجوی «فعال در این بازه»
+
+    درخت با تأخیر ساخته می‌شه؛ تغییرهای بعد از ساخت در یه بافر کوچک نگه
+    داشته می‌شن و وقتی بافر بزرگ شد درخت از نو ساخته می‌شه.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._intervals = {}
+        self._tree = None
+        self._built = False
+        self._added = {}
+        self._removed = set()
+
+    def rebuild(self, projects):
+        self.clear()
+        for project in projects:
+            interval = self._interval(project)
+            if interval is not None:
+                self._intervals[project['name']] = interval
+
+    def _interval(self, project):
+        start = date_ordinal(project.get('start_date'))
+        end = date_ordinal(project.get('end_date'))
+        if start is None or end is None:
+            return None
+        return (min(start, end), max(start, end))
+
+    def add(self, project):
+        interval = self._interval(project)
+        if interval is None:
+            return
+        self._intervals[project['name']] = interval
+        if self._built:
+            self._added[project['name']] = interval
+
+    def remove(self, project):
+        name = project['name']
+        if self._intervals.pop(name, None) is None:
+            return
+        if self._built:
+            self._added.pop(name, None)
+            self._removed.add(name)
+
+    def _ensure_tree(self):
+        pending = len(self._added) + len(self._removed)
+        if not self._built or pending > max(256, len(self._intervals) // 8):
+            self._tree = _build_interval_tree(
+                [(start, end, name) for name, (start, end) in self._intervals.items()]
+            )
+            self._built = True
+            self._added = {}
+            self._removed = set()
+
+    def names_overlapping(self, first, last):
+        """نام پروژه‌هایی که بازه‌شون با [first, last] هم‌پوشانی داره"""
+        first = date_ordinal(first)
+        last = date_ordinal(last)
+        self._ensure_tree()
+        found = []
+        stack = [self._tree]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if last < node.center:
+                for start, end, name in node.by_start:
+                    if start > last:
+                        break
+                    found.append(name)
+                stack.append(node.left)
+            elif first > node.center:
+                for start, end, name in node.by_end:
+                    if end < first:
+                        break
+                    found.append(name)
+                stack.append(node.right)
+            else:
+                found.extend(name for _, _, name in node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        if self._removed:
+            found = [name for name in found if name not in self._removed]
+        found.extend(name for name, (start, end) in self._added.items()
+                     if start <= last and end >= first)
+        return found
+
+
+STATUS_FINISHED = "پایان یافته"
+STATUS_TODAY = "امروز"
+STATUS_RUNNING = "در حال اجرا"
+STATUSES = (STATUS_RUNNING, STATUS_FINISHED, STATUS_TODAY)
+
+
+def project_status(end_date, today=None):
+    """وضعیت پروژه از روی تاریخ پایان (مقایسه در سطح روز، نه ساعت)؛ تاریخ نامعتبر ''"""
+    end = date_ordinal(end_date)
+    if end is None:
+        return ''
+    today = date_ordinal(today) if today is not None else date.today().toordinal()
+    if end < today:
+        return STATUS_FINISHED
+    if end == today:
+        return STATUS_TODAY
+    return STATUS_RUNNING
+
+
+class StatusIndex(ProjectIndex):
+    """پروژه‌ها رو بر اساس وضعیت دسته‌بندی می‌کنم: پایان یافته / امروز / در حال اجرا
+
+    وضعیت فقط به روز جاری بستگی داره؛ وقتی روز عوض می‌شه فقط پروژه‌هایی
+    که تاریخ پایانشون بین روز قبلی و امروزه جابه‌جا می‌شن (با کمک ایندکس تاریخ پایان).
+    خوندن‌ها (مثلاً status_of از thread اصلی Tk) ممکنه خودشون roll_day رو صدا
+    بزنن و دسته‌ها رو عوض کنن، پس همه دسترسی‌ها قفل خود ایندکس رو می‌گیرن.
+    """
+
+    def __init__(self, end_date_index):
+        self.end_date_index = end_date_index
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._today = date.today().toordinal()
+            self._buckets = {status: {} for status in STATUSES}
+            self._statuses = {}
+
+    def _place(self, name, status):
+        old = self._statuses.get(name)
+        if old == status:
+            return
+        if old is not None:
+            del self._buckets[old][name]
+        self._buckets[status][name] = None
+        self._statuses[name] = status
+
+    def add(self, project):
+        with self._lock:
+            status = project_status(project.get('end_date'), self._today)
+            if status:
+                self._place(project['name'], status)
+
+    def remove(self, project):
+        with self._lock:
+            status = self._statuses.pop(project['name'], None)
+            if status is not None:
+                del self._buckets[status][project['name']]
+
+    def roll_day(self, today=None):
+        """اگه روز عوض شده باشه دسته‌ها رو به‌روز می‌کنم"""
+        today = date_ordinal(today) if today is not None else date.today().toordinal()
+        with self._lock:
+            if today == self._today:
+                return False
+            if today < self._today:
+                # ساعت سیستم عقب رفته؛ همه رو از نو حساب می‌کنم
+                lo, hi = today, self._today
+            else:
+                lo, hi = self._today, today
+            self._today = today
+            for name in self.end_date_index.names_between(lo, hi):
+                if name in self._statuses:
+                    self._place(name, project_status(self.end_date_index.ordinal_of(name), today))
+            return True
+
+    def status_of(self, name):
+        with self._lock:
+            self.roll_day()
+            return self._statuses.get(name, '')
+
+    def names_with(self, status):
+        with self._lock:
+            self.roll_day()
+            return list(self._buckets.get(status, ()))
+
+    def count(self, status):
+        with self._lock:
+            self.roll_day()
+            return len(self._buckets.get(status, ()))
+
+
+class NgramIndex(ProjectIndex):
+    """ایندکس معکوس n-gram (پیش‌فرض سه‌حرفی) روی یه فیلد متنی برای جستجوی زیررشته
+
+    مقدارهای تکراری (مثلاً کارفرمای چند پروژه) فقط یه بار ایندکس می‌شن:
+    n-gram -> مقدارها و مقدار -> نام پروژه‌ها. جستجو لیست‌ها رو از کوچک‌ترین
+    اشتراک می‌گیره و بعد نامزدها رو با in واقعی چک می‌کنه.
+    """
+
+    def __init__(self, field, n=3):
+        self.field = field
+        self.n = n
+        self.clear()
+
+    def clear(self):
+        self._postings = {}
+        self._names = {}
+        self._count = 0
+
+    def _grams(self, text):
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def add(self, project):
+        value = str(project.get(self.field, '')).lower()
+        names = self._names.get(value)
+        if names is None:
+            names = self._names[value] = {}
+            for gram in self._grams(value):
+                self._postings.setdefault(gram, set()).add(value)
+        if project['name'] not in names:
+            self._count += 1
+        names[project['name']] = None
+
+    def remove(self, project):
+        value = str(project.get(self.field, '')).lower()
+        names = self._names.get(value)
+        if names is None:
+            return
+        if project['name'] not in names:
+            return
+        del names[project['name']]
+        self._count -= 1
+        if names:
+            return
+        del self._names[value]
+        for gram in self._grams(value):
+            values = self._postings.get(gram)
+            if values is not None:
+                values.discard(value)
+                if not values:
+                    del self._postings[gram]
+
+    def estimate(self, term):
+        """تخمین تعداد پروژه‌های منطبق از کوتاه‌ترین لیست (بدون اجرای جستجو)"""
+        grams = self._grams(term.lower())
+        if not grams or not self._names:
+            return self._count
+        shortest = min(len(self._postings.get(gram, ())) for gram in grams)
+        return int(shortest * self._count / len(self._names) + 0.5)
+
+    def names_containing(self, term):
+        """نام پروژه‌هایی که این فیلدشون term رو (بدون حساسیت به حروف) شامل می‌شه"""
+        term = term.lower()
+        grams = self._grams(term)
+        if not grams:
+            # عبارت کوتاه‌تر از n؛ فقط مقدارهای یکتا رو می‌گردم
+            candidates = self._names
+        else:
+            postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+            candidates = set(postings[0])
+            for values in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(values)
+        found = []
+        for value in candidates:
+            if term in value:
+                found.extend(self._names[value])
+        return found
@@ -1,46 +1,47 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
-import os
-from datetime import datetime
+from datetime import date, datetime
+from core import CompanyService, ProjectService, ValidationError
 from text_editor import TextEditor
+from project_store import ProjectStore
+from storage import get_storage
+from virtual_tree import VirtualTreeview
 
 class ProjectManager:
     def __init__(self):
-        self.projects_file = "projects.json"
-        self.companies_file = "companies.json"
+        self.storage = get_storage()
+        self.store = ProjectStore.shared(self.storage)
+        # منطق ثبت و ویرایش در لایه core؛ این کلاس فقط فرم‌ها و جدول رو می‌سازه
+        self.project_service = ProjectService(self.store)
+        self.company_service = CompanyService(self.storage)
+        # کش مقدارهای نمایشی جدول: نام -> (کلید، ردیف)
+        self._row_cache = {}
         self.projects = self.load_projects()
-        self.companies = self.load_companies()
+        self.companies = self.company_service.companies
         
     def load_projects(self):
-        """پروژه‌ها رو از فایل می‌خونم"""
-        if os.path.exists(self.projects_file):
-            try:
-                with open(self.projects_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        """پروژه‌ها رو از store مشترک می‌گیرم (فقط در صورت تغییر فایل دوباره خونده می‌شه)"""
+        return self.store.get_projects()
     
     def save_projects(self):
         """پروژه‌ها رو در فایل ذخیره می‌کنم"""
-        with open(self.projects_file, 'w', encoding='utf-8') as f:
-            json.dump(self.projects, f, ensure_ascii=False, indent=2)
+        self.store.save_projects(self.projects)
+    
+    def flush(self):
+        """تغییرهای ذخیره‌نشده پروژه‌ها رو همین الان ذخیره می‌کنم"""
+        self.store.flush()
     
     def load_companies(self):
-        """شرکت‌ها رو از فایل می‌خونم"""
-        if os.path.exists(self.companies_file):
-            try:
-                with open(self.companies_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        """شرکت‌ها رو از ذخیره‌ساز می‌خونم"""
+        return self.company_service.load()
+    
+    def company_names(self):
+        """لیست مرتب نام شرکت‌ها؛ تا ثبت شرکت جدید یا بارگذاری مجدد کش می‌مونه"""
+        return self.company_service.names()
     
     def save_companies(self):
-        """شرکت‌ها رو در فایل ذخیره می‌کنم"""
-        with open(self.companies_file, 'w', encoding='utf-8') as f:
-            json.dump(self.companies, f, ensure_ascii=False, indent=2)
+        """شرکت‌ها رو در ذخیره‌ساز ذخیره می‌کنم"""
+        self.company_service.save()
     
     def show_project_management(self, parent, current_user):
         """پنجره مدیریت پروژه رو نشون می‌دم"""
@@ -63,7 +64,9 @@ class ProjectManager:
             ("ثبت پروژه جدید", self.show_add_project_form, '#2ecc71'),
             ("ثبت اطلاعات شرکت/کارفرما", self.show_add_company_form, '#3498db'),
             ("ویرایش پروژه", self.show_edit_project_form, '#f39c12'),
-            ("حذف پروژه", self.delete_project, '#e74c3c')
+            ("حذف پروژه", self.delete_project, '#e74c3c'),
+            ("ویرایش گروهی", self.show_bulk_edit_form, '#d35400'),
+            ("ورود گروهی از فایل", self.show_import_form, '#8e44ad')
         ]
         
         for text, command, color in buttons_data:
@@ -87,7 +90,7 @@ class ProjectManager:
         
         self.create_projects_table(table_frame)
         
-        # بارگذاری مجدد پروژه‌ها و شرکت‌ها از فایل
+        # گرفتن پروژه‌ها از store و بارگذاری مجدد شرکت‌ها از فایل
         self.projects = self.load_projects()
         self.companies = self.load_companies()
         
@@ -116,9 +119,6 @@ class ProjectManager:
         content_frame = tk.Frame(parent)
         content_frame.pack(fill=tk.BOTH, expand=True)
         
-        columns = ('name', 'client', 'start_date', 'end_date', 'income', 'cost', 'profit', 'status')
-        self.tree = ttk.Treeview(content_frame, columns=columns, show='headings', height=15)
-        
         column_names = {
             'name': 'نام پروژه',
             'client': 'کارفرما',
@@ -130,58 +130,55 @@ class ProjectManager:
             'status': 'وضعیت'
         }
         
-        for col, name in column_names.items():
-            self.tree.heading(col, text=name)
-            self.tree.column(col, width=widths[list(column_names.keys()).index(col)], anchor=tk.CENTER)
+        # جدول با اسکرول مجازی: فقط ردیف‌های دیده‌شده در Treeview ساخته می‌شن
+        # انتخاب چندتایی با Ctrl/Shift برای حذف و ویرایش گروهی
+        self.tree = VirtualTreeview(content_frame, column_names, widths, self.project_row, height=15,
+                                    selectmode='extended')
+        self.tree.pack(fill=tk.BOTH, expand=True)
         
-        scrollbar = ttk.Scrollbar(content_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.tree.bind('<Double-1>', self.on_project_select)
+        self.tree.bind_activate(self.on_project_select)
     
     def refresh_projects_table(self):
         """به‌روزرسانی جدول پروژه‌ها"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # بارگذاری مجدد پروژه‌ها از فایل
+        # گرفتن پروژه‌ها از store مشترک
         self.projects = self.load_projects()
-        
-        for project in self.projects:
-            income = float(project.get('income', 0))
-            cost = float(project.get('cost', 0))
-            profit = income - cost
-            
-            end_date = datetime.strptime(project.get('end_date', ''), '%Y-%m-%d')
-            today = datetime.now()
-            if end_date < today:
-                status = "پایان یافته"
-            elif end_date == today:
-                status = "امروز"
-            else:
-                status = "در حال اجرا"
-            
-            self.tree.insert('', tk.END, values=(
-                project.get('name', ''),
-                project.get('client', ''),
-                project.get('start_date', ''),
-                project.get('end_date', ''),
-                f"{income:,}",
-                f"{cost:,}",
-                f"{profit:,}",
-                status
-            ))
+        # فقط ردیف‌هایی که عوض شدن دوباره نوشته می‌شن؛ جای اسکرول و انتخاب می‌مونه
+        self.tree.sync_items(self.projects)
+        if len(self._row_cache) > 2 * len(self.projects) + 100:
+            names = {project['name'] for project in self.projects}
+            self._row_cache = {name: row for name, row in self._row_cache.items() if name in names}
+    
+    def project_row(self, project):
+        """مقدارهای ستون‌های جدول برای یه پروژه؛ تا updated_at (یا روز) عوض نشه از کش خونده می‌شه"""
+        key = (id(project), project.get('updated_at'), date.today())
+        cached = self._row_cache.get(project.get('name'))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        row = self._format_row(project)
+        self._row_cache[project.get('name')] = (key, row)
+        return row
+    
+    def _format_row(self, project):
+        income = float(project.get('income', 0))
+        cost = float(project.get('cost', 0))
+        profit = income - cost
+        
+        status = self.store.status_of(project)
+        
+        return (
+            project.get('name', ''),
+            project.get('client', ''),
+            project.get('start_date', ''),
+            project.get('end_date', ''),
+            f"{income:,}",
+            f"{cost:,}",
+            f"{profit:,}",
+            status
+        )
     
-    def on_project_select(self, event):
-        """در صورت انتخاب پروژه از جدول"""
-        selection = self.tree.selection()
-        if selection:
-            item = self.tree.item(selection[0])
-            project_name = item['values'][0]
-            self.show_project_details(project_name)
+    def on_project_select(self, project):
+        """در صورت انتخاب پروژه از جدول (دوبار کلیک یا Enter)"""
+        self.show_project_details(project['name'])
     
     def show_add_project_form(self, parent):
         """نمایش فرم ثبت پروژه جدید"""
@@ -218,9 +215,8 @@ class ProjectManager:
         
         tk.Label(form_frame, text="کارفرما:", font=('Tahoma', 10), bg='#f0f0f0').pack(anchor=tk.W)
         client_combo = ttk.Combobox(form_frame, font=('Tahoma', 10), width=37)
-        # بارگذاری مجدد شرکت‌ها از فایل
-        self.companies = self.load_companies()
-        client_combo['values'] = [company['name'] for company in self.companies]
+        # لیست مرتب و کش‌شده نام شرکت‌ها
+        client_combo['values'] = self.company_names()
         client_combo.pack(fill=tk.X, pady=(0, 15))
         
         date_frame = tk.Frame(form_frame, bg='#f0f0f0')
@@ -274,45 +270,21 @@ class ProjectManager:
         status_label.pack(pady=(0, 15))
         
         def save_project():
-            name = name_entry.get().strip()
-            client = client_combo.get().strip()
-            start_date = start_date_entry.get().strip()
-            end_date = end_date_entry.get().strip()
-            income = income_entry.get().strip()
-            cost = cost_entry.get().strip()
-            team = team_entry.get().strip()
-            description = description_text.get("1.0", tk.END).strip()
-            
-            if not all([name, client, start_date, end_date]):
-                status_label.config(text="لطفاً فیلدهای اجباری را پر کنید")
-                return
-            
             try:
-                income = float(income)
-                cost = float(cost)
-            except ValueError:
-                status_label.config(text="مقادیر مالی باید عددی باشند")
+                self.project_service.add({
+                    'name': name_entry.get(),
+                    'client': client_combo.get(),
+                    'start_date': start_date_entry.get(),
+                    'end_date': end_date_entry.get(),
+                    'income': income_entry.get(),
+                    'cost': cost_entry.get(),
+                    'team': team_entry.get(),
+                    'description': description_text.get("1.0", tk.END)
+                })
+            except ValidationError as e:
+                status_label.config(text=str(e))
                 return
-            
-            if any(p['name'] == name for p in self.projects):
-                status_label.config(text="پروژه‌ای با این نام قبلاً ثبت شده است")
-                return
-            
-            new_project = {
-                'name': name,
-                'client': client,
-                'start_date': start_date,
-                'end_date': end_date,
-                'income': income,
-                'cost': cost,
-                'team': team,
-                'description': description,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }
-            
-            self.projects.append(new_project)
-            self.save_projects()
+            self.projects = self.store.projects
             
             status_label.config(text="پروژه با موفقیت ثبت شد!", fg='#27ae60')
             form_window.after(2000, form_window.destroy)
@@ -400,27 +372,12 @@ class ProjectManager:
         status_label.pack(pady=(0, 15))
         
         def save_company():
-            name = name_entry.get().strip()
-            phone = phone_entry.get().strip()
-            address = address_text.get("1.0", tk.END).strip()
-            
-            if not name:
-                status_label.config(text="لطفاً نام شرکت را وارد کنید")
-                return
-            
-            if any(c['name'] == name for c in self.companies):
-                status_label.config(text="شرکتی با این نام قبلاً ثبت شده است")
+            try:
+                self.company_service.add(name_entry.get(), phone_entry.get(), address_text.get("1.0", tk.END))
+            except ValidationError as e:
+                status_label.config(text=str(e))
                 return
-            
-            new_company = {
-                'name': name,
-                'phone': phone,
-                'address': address,
-                'created_at': datetime.now().isoformat()
-            }
-            
-            self.companies.append(new_company)
-            self.save_companies()
+            self.companies = self.company_service.companies
             
             status_label.config(text="شرکت با موفقیت ثبت شد!", fg='#27ae60')
             form_window.after(2000, form_window.destroy)
@@ -458,24 +415,148 @@ class ProjectManager:
         )
         cancel_btn.pack(side=tk.LEFT)
     
+    def show_import_form(self, parent):
+        """ورود گروهی پروژه‌ها یا شرکت‌ها از فایل CSV، TSV یا JSONL"""
+        form_window = tk.Toplevel(parent)
+        form_window.title("ورود گروهی از فایل")
+        form_window.geometry("450x250")
+        form_window.configure(bg='#f0f0f0')
+        form_window.transient(parent)
+        form_window.grab_set()
+        
+        main_frame = tk.Frame(form_window, bg='#f0f0f0')
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        tk.Label(
+            main_frame,
+            text="نوع اطلاعات فایل را انتخاب کنید:",
+            font=('Tahoma', 10),
+            bg='#f0f0f0'
+        ).pack(anchor=tk.W, pady=(0, 10))
+        
+        kind_var = tk.StringVar()
+        kind_var.set('projects')
+        
+        for text, value in (("پروژه‌ها", 'projects'), ("شرکت‌ها/کارفرماها", 'companies')):
+            tk.Radiobutton(
+                main_frame,
+                text=text,
+                variable=kind_var,
+                value=value,
+                font=('Tahoma', 10),
+                bg='#f0f0f0'
+            ).pack(anchor=tk.W, pady=2)
+        
+        tk.Label(
+            main_frame,
+            text="ستون‌ها: name, client, start_date, end_date, income, cost, team, description\n"
+                 "(برای شرکت‌ها: name, phone, address)",
+            font=('Tahoma', 8),
+            bg='#f0f0f0',
+            fg='#7f8c8d',
+            justify=tk.LEFT
+        ).pack(anchor=tk.W, pady=(10, 20))
+        
+        def choose_file():
+            file_path = filedialog.askopenfilename(
+                parent=form_window,
+                filetypes=[
+                    ("CSV files", "*.csv"),
+                    ("TSV files", "*.tsv"),
+                    ("JSON Lines files", "*.jsonl"),
+                    ("All files", "*.*")
+                ],
+                title="انتخاب فایل ورودی"
+            )
+            if not file_path:
+                return
+            
+            importer = self.project_service.importer()
+            form_window.config(cursor='watch')
+            form_window.update_idletasks()
+            try:
+                if kind_var.get() == 'projects':
+                    result = importer.validate_projects(file_path)
+                else:
+                    result = self.company_service.validate_import(importer, file_path)
+                    self.companies = self.company_service.companies
+            except (OSError, UnicodeDecodeError) as e:
+                messagebox.showerror("خطا", f"خطا در خواندن فایل:\n{str(e)}", parent=form_window)
+                return
+            finally:
+                form_window.config(cursor='')
+            
+            if not result.records:
+                messagebox.showerror(
+                    "خطا",
+                    f"هیچ ردیف سالمی در فایل یافت نشد\n\n{result.error_text()}",
+                    parent=form_window
+                )
+                return
+            
+            text = f"{len(result.records)} ردیف از {result.rows} ردیف سالم است."
+            if result.errors:
+                text += f"\n\nخطاها:\n{result.error_text()}"
+            text += "\n\nردیف‌های سالم ثبت شوند؟"
+            if not messagebox.askyesno("تأیید ورود گروهی", text, parent=form_window):
+                return
+            
+            # همه ردیف‌های سالم با یه بار نوشتن ذخیره می‌شن
+            if result.kind == 'projects':
+                count = importer.commit_projects(result)
+                self.projects = self.store.projects
+            else:
+                count = self.company_service.commit_import(importer, result)
+            self.refresh_projects_table()
+            form_window.destroy()
+            messagebox.showinfo("موفقیت", f"{count} ردیف با موفقیت ثبت شد")
+        
+        button_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        button_frame.pack(fill=tk.X)
+        
+        choose_btn = tk.Button(
+            button_frame,
+            text="انتخاب فایل",
+            command=choose_file,
+            font=('Tahoma', 10, 'bold'),
+            bg='#8e44ad',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        choose_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        cancel_btn = tk.Button(
+            button_frame,
+            text="لغو",
+            command=form_window.destroy,
+            font=('Tahoma', 10),
+            bg='#95a5a6',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        cancel_btn.pack(side=tk.LEFT)
+        
+        form_window.bind('<Escape>', lambda e: form_window.destroy())
+    
     def show_edit_project_form(self, parent):
         """نمایش فرم ویرایش پروژه"""
-        selection = self.tree.selection()
-        if not selection:
+        selected = self.tree.selected_item()
+        if not selected:
             messagebox.showwarning("هشدار", "لطفاً ابتدا پروژه‌ای را انتخاب کنید")
             return
         
-        item = self.tree.item(selection[0])
-        project_name = item['values'][0]
+        project_name = selected['name']
         
-        # بارگذاری مجدد پروژه‌ها از فایل
+        # گرفتن پروژه‌ها از store مشترک
         self.projects = self.load_projects()
         
-        project = None
-        for p in self.projects:
-            if p['name'] == project_name:
-                project = p
-                break
+        project = self.store.find(project_name)
         
         if not project:
             messagebox.showerror("خطا", "پروژه یافت نشد")
@@ -484,33 +565,136 @@ class ProjectManager:
         self.show_edit_project_window(parent, project)
     
     def delete_project(self, parent):
-        """حذف پروژه"""
-        selection = self.tree.selection()
-        if not selection:
+        """حذف پروژه (یا همه پروژه‌های انتخاب‌شده با یه بار ذخیره)"""
+        selected = self.tree.selected_items()
+        if not selected:
             messagebox.showwarning("هشدار", "لطفاً ابتدا پروژه‌ای را انتخاب کنید")
             return
         
-        item = self.tree.item(selection[0])
-        project_name = item['values'][0]
+        if len(selected) > 1:
+            if not messagebox.askyesno("تأیید", f"آیا مطمئن هستید که می‌خواهید {len(selected)} پروژه انتخاب‌شده را حذف کنید؟"):
+                return
+            # گرفتن پروژه‌ها از store مشترک
+            self.load_projects()
+            count = self.project_service.delete_many([project['name'] for project in selected])
+            self.projects = self.store.projects
+            self.refresh_projects_table()
+            messagebox.showinfo("موفقیت", f"{count} پروژه با موفقیت حذف شد")
+            return
+        
+        project_name = selected[0]['name']
         
         if messagebox.askyesno("تأیید", f"آیا مطمئن هستید که می‌خواهید پروژه '{project_name}' را حذف کنید؟"):
-            # بارگذاری مجدد پروژه‌ها از فایل
-            self.projects = self.load_projects()
-            self.projects = [p for p in self.projects if p['name'] != project_name]
-            self.save_projects()
+            # گرفتن پروژه‌ها از store مشترک
+            self.load_projects()
+            self.project_service.delete(project_name)
+            self.projects = self.store.projects
             self.refresh_projects_table()
             messagebox.showinfo("موفقیت", "پروژه با موفقیت حذف شد")
     
+    def show_bulk_edit_form(self, parent):
+        """تغییر کارفرما یا جابه‌جایی تاریخ همه پروژه‌های انتخاب‌شده"""
+        selected = self.tree.selected_items()
+        if not selected:
+            messagebox.showwarning("هشدار", "لطفاً ابتدا پروژه‌ای را انتخاب کنید (Ctrl/Shift برای انتخاب چندتایی)")
+            return
+        names = [project['name'] for project in selected]
+        
+        form_window = tk.Toplevel(parent)
+        form_window.title("ویرایش گروهی")
+        form_window.geometry("450x300")
+        form_window.configure(bg='#f0f0f0')
+        form_window.transient(parent)
+        form_window.grab_set()
+        
+        main_frame = tk.Frame(form_window, bg='#f0f0f0')
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        tk.Label(
+            main_frame,
+            text=f"{len(names)} پروژه انتخاب شده است",
+            font=('Tahoma', 12, 'bold'),
+            bg='#f0f0f0',
+            fg='#2c3e50'
+        ).pack(pady=(0, 15))
+        
+        tk.Label(main_frame, text="کارفرمای جدید (خالی = بدون تغییر):", font=('Tahoma', 10), bg='#f0f0f0').pack(anchor=tk.W)
+        client_combo = ttk.Combobox(main_frame, font=('Tahoma', 10), width=37)
+        client_combo['values'] = self.company_names()
+        client_combo.pack(fill=tk.X, pady=(0, 15))
+        
+        tk.Label(main_frame, text="جابه‌جایی تاریخ شروع و پایان (روز، منفی = عقب):", font=('Tahoma', 10), bg='#f0f0f0').pack(anchor=tk.W)
+        shift_entry = tk.Entry(main_frame, font=('Tahoma', 10), width=15)
+        shift_entry.pack(anchor=tk.W, pady=(0, 15))
+        shift_entry.insert(0, "0")
+        
+        status_label = tk.Label(
+            main_frame,
+            text="",
+            font=('Tahoma', 9),
+            bg='#f0f0f0',
+            fg='#e74c3c'
+        )
+        status_label.pack(pady=(0, 10))
+        
+        def apply_changes():
+            client = client_combo.get().strip() or None
+            try:
+                shift_days = int(shift_entry.get().strip() or 0)
+            except ValueError:
+                status_label.config(text="تعداد روز باید عدد صحیح باشد")
+                return
+            
+            if client is None and not shift_days:
+                status_label.config(text="تغییری وارد نشده است")
+                return
+            
+            count = self.project_service.bulk_update(names, client=client, shift_days=shift_days)
+            self.projects = self.store.projects
+            self.refresh_projects_table()
+            form_window.destroy()
+            messagebox.showinfo("موفقیت", f"{count} پروژه به‌روزرسانی شد")
+        
+        button_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        button_frame.pack(fill=tk.X)
+        
+        save_btn = tk.Button(
+            button_frame,
+            text="اعمال",
+            command=apply_changes,
+            font=('Tahoma', 10, 'bold'),
+            bg='#d35400',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        save_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        cancel_btn = tk.Button(
+            button_frame,
+            text="لغو",
+            command=form_window.destroy,
+            font=('Tahoma', 10),
+            bg='#95a5a6',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        cancel_btn.pack(side=tk.LEFT)
+        
+        form_window.bind('<Return>', lambda e: apply_changes())
+        form_window.bind('<Escape>', lambda e: form_window.destroy())
+    
     def show_project_details(self, project_name):
         """نمایش جزئیات پروژه"""
-        # بارگذاری مجدد پروژه‌ها از فایل
+        # گرفتن پروژه‌ها از store مشترک
         self.projects = self.load_projects()
         
-        project = None
-        for p in self.projects:
-            if p['name'] == project_name:
-                project = p
-                break
+        project = self.store.find(project_name)
         
         if not project:
             messagebox.showerror("خطا", "پروژه یافت نشد")
@@ -615,9 +799,8 @@ class ProjectManager:
         
         tk.Label(form_frame, text="کارفرما:", font=('Tahoma', 10), bg='#f0f0f0').pack(anchor=tk.W)
         client_combo = ttk.Combobox(form_frame, font=('Tahoma', 10), width=37)
-        # بارگذاری مجدد شرکت‌ها از فایل
-        self.companies = self.load_companies()
-        client_combo['values'] = [company['name'] for company in self.companies]
+        # لیست مرتب و کش‌شده نام شرکت‌ها
+        client_combo['values'] = self.company_names()
         client_combo.pack(fill=tk.X, pady=(0, 15))
         client_combo.set(project.get('client', ''))
         
@@ -675,44 +858,22 @@ class ProjectManager:
         status_label.pack(pady=(0, 15))
         
         def save_project():
-            name = name_entry.get().strip()
-            client = client_combo.get().strip()
-            start_date = start_date_entry.get().strip()
-            end_date = end_date_entry.get().strip()
-            income = income_entry.get().strip()
-            cost = cost_entry.get().strip()
-            team = team_entry.get().strip()
-            description = description_text.get("1.0", tk.END).strip()
-            
-            if not all([name, client, start_date, end_date]):
-                status_label.config(text="لطفاً فیلدهای اجباری را پر کنید")
-                return
-            
+            # به‌روزرسانی پروژه (اعتبارسنجی و تکراری نبودن نام در ProjectService)
             try:
-                income = float(income)
-                cost = float(cost)
-            except ValueError:
-                status_label.config(text="مقادیر مالی باید عددی باشند")
-                return
-            
-            # بررسی تکراری نبودن نام (به جز خود پروژه)
-            if any(p['name'] == name and p['name'] != project['name'] for p in self.projects):
-                status_label.config(text="پروژه‌ای با این نام قبلاً ثبت شده است")
+                self.project_service.update(project['name'], {
+                    'name': name_entry.get(),
+                    'client': client_combo.get(),
+                    'start_date': start_date_entry.get(),
+                    'end_date': end_date_entry.get(),
+                    'income': income_entry.get(),
+                    'cost': cost_entry.get(),
+                    'team': team_entry.get(),
+                    'description': description_text.get("1.0", tk.END)
+                })
+            except ValidationError as e:
+                status_label.config(text=str(e))
                 return
             
-            # به‌روزرسانی پروژه
-            project['name'] = name
-            project['client'] = client
-            project['start_date'] = start_date
-            project['end_date'] = end_date
-            project['income'] = income
-            project['cost'] = cost
-            project['team'] = team
-            project['description'] = description
-            project['updated_at'] = datetime.now().isoformat()
-            
-            self.save_projects()
-            
             status_label.config(text="پروژه با موفقیت به‌روزرسانی شد!", fg='#27ae60')
             form_window.after(2000, form_window.destroy)
             self.refresh_projects_table()
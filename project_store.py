@@ -0,0 +1,544 @@
+import calendar
+import threading
+from columnar import ColumnarView
+from datetime import date
+from fulltext_index import FullTextIndex, SEARCH_INDEX_FILE
+from persistence import DeferredFlush
+from bisect import bisect_right
+from project_indexes import (ClientIndex, DateIndex, IntervalIndex, NgramIndex, NumberIndex,
+                            StatusIndex, TextIndex, date_ordinal, project_status)
+from rollups import FinancialRollups, ROLLUPS_FILE
+from storage import get_storage
+
+_MISSING = object()
+# تعداد پیش‌فرض پروژه‌های هر صفحه در page_projects
+PAGE_SIZE = 500
+
+
+class ProjectPage:
+    """یه صفحه از پروژه‌ها؛ cursor کلید آخرین پروژه صفحه‌ست (یا None اگه صفحه بعدی نیست)
+
+    cursor یه tuple دوتایی از مقدارهای ساده (عدد/متن) است، پس برای مصرف‌کننده‌های
+    بیرونی به صورت لیست JSON هم قابل فرستادن و برگردوندنه.
+    """
+
+    def __init__(self, items, cursor, order):
+        self.items = items
+        self.cursor = cursor
+        self.order = order
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+class ProjectPager:
+    """پیمایش همه پروژه‌ها صفحه به صفحه؛ هر صفحه جدا زیر قفل store گرفته می‌شه
+
+    len() تعداد فعلی پروژه‌هاست (برای نوار پیشرفت) و پیمایش بدون ساختن کپی
+    از کل لیست انجام می‌شه. تغییرهای وسط پیمایش باعث تکرار یا جا افتادن
+    پروژه‌های دیگه نمی‌شن، چون هر صفحه از بعد از کلید صفحه قبل شروع می‌شه.
+    """
+
+    def __init__(self, store, order='position', limit=PAGE_SIZE):
+        self.store = store
+        self.order = order
+        self.limit = limit
+
+    def __len__(self):
+        return len(self.store.projects)
+
+    def pages(self, after=None):
+        while True:
+            page = self.store.page_projects(after, self.limit, self.order)
+            if page.items:
+                yield page
+            if page.cursor is None:
+                return
+            after = page.cursor
+
+    def __iter__(self):
+        for page in self.pages():
+            yield from page.items
+
+
+class ProjectStore:
+    """یه نسخه مشترک از پروژه‌ها رو توی حافظه نگه می‌دارم تا هر بار فایل خونده نشه
+
+    تغییرها اول فقط در حافظه اعمال می‌شن و با کمی تأخیر (یا با flush) یک‌جا
+    ذخیره می‌شن؛ تغییرهایی که چیزی رو عوض نمی‌کنن اصلاً نوشته نمی‌شن.
+    متدهای جستجو خودشون قفل رو می‌گیرن و لیست تازه برمی‌گردونن، پس نتیجه‌شون
+    رو می‌شه بیرون از قفل (مثلاً در thread گزارش‌ها) پردازش کرد.
+    """
+
+    _instances = {}
+
+    @classmethod
+    def shared(cls, storage=None):
+        """برای هر ذخیره‌ساز فقط یه store در کل برنامه می‌سازم"""
+        storage = storage or get_storage()
+        key = id(storage)
+        if key not in cls._instances:
+            cls._instances[key] = cls(storage)
+        return cls._instances[key]
+
+    def __init__(self, storage=None):
+        self.storage = storage or get_storage()
+        self.lock = threading.RLock()
+        self.projects = []
+        # نسخه داده‌ها؛ با هر بارگذاری یا تغییر یکی زیاد می‌شه
+        self.version = 0
+        self._signature = None
+        # تغییرهای ذخیره‌نشده: نام -> نام قبلی در ذخیره‌ساز، و نام‌های حذف‌شده
+        self._pending_upserts = {}
+        self._pending_deletes = []
+        # نام‌هایی از ذخیره‌ساز که در این نوبت حذف یا عوض شدن؛ استفاده دوباره ازشون
+        # قبل از ذخیره، ترتیب تغییرها رو مهم می‌کنه، پس اول نوبت فعلی نوشته می‌شه
+        self._freed_names = set()
+        self._deferred = DeferredFlush(self._write_pending, lock=self.lock)
+        # ایندکس نام -> پروژه و نام -> جایگاه در لیست
+        self._by_name = {}
+        self._positions = {}
+        # جایگاه‌های کمتر از این عدد معتبرن؛ بعد از حذف، بقیه با تأخیر دوباره حساب می‌شن
+        self._positions_valid = 0
+        # نام -> شماره ترتیب؛ با حذف عوض نمی‌شه، پس کلید پایدار صفحه‌بندی به ترتیب لیسته
+        self._sequence = {}
+        self._next_sequence = 0
+        # ایندکس‌های ثانویه که با هر تغییر به‌روز می‌شن
+        self.client_index = ClientIndex()
+        self.start_date_index = DateIndex('start_date')
+        self.end_date_index = DateIndex('end_date')
+        self.income_index = NumberIndex('income', default=0)
+        self.interval_index = IntervalIndex()
+        self.status_index = StatusIndex(self.end_date_index)
+        self.name_index = TextIndex('name')
+        self.name_search_index = NgramIndex('name')
+        self.client_search_index = NgramIndex('client')
+        self.fulltext_index = FullTextIndex(self.storage.data_path(SEARCH_INDEX_FILE))
+        self.rollups = FinancialRollups(self.storage.data_path(ROLLUPS_FILE))
+        # نمای ستونی و جمع‌های روزانه برای گزارش‌های مالی؛ مثل بقیه ایندکس‌ها با هر تغییر به‌روز می‌شن
+        self.columns = ColumnarView()
+        self.daily_totals = self.columns.daily
+        # status_index از end_date_index استفاده می‌کنه، پس باید بعد از اون به‌روز بشه
+        self.indexes = [self.client_index, self.start_date_index, self.end_date_index,
+                        self.income_index, self.interval_index, self.status_index,
+                        self.name_index, self.name_search_index, self.client_search_index, self.fulltext_index,
+                        self.rollups, self.columns]
+        # ترتیب‌های قابل صفحه‌بندی (به جز position که ترتیب خود لیسته)
+        self.page_orders = {
+            'name': self.name_index,
+            'start_date': self.start_date_index,
+            'end_date': self.end_date_index,
+            'income': self.income_index,
+        }
+        # ایندکس‌هایی که کنار داده‌ها ذخیره می‌شن
+        self.persistent_indexes = [self.fulltext_index, self.rollups]
+        self.reload_if_changed()
+
+    @property
+    def dirty(self):
+        return self._deferred.dirty
+
+    def reload_if_changed(self):
+        """فقط اگه داده‌ها روی دیسک عوض شده باشن دوباره می‌خونمشون"""
+        with self.lock:
+            if self.dirty:
+                # نسخه حافظه جدیدتره؛ تا ذخیره نشده از دیسک نمی‌خونم
+                return False
+            signature = self.storage.projects_signature()
+            if self.version and signature == self._signature:
+                return False
+            self.projects = self.storage.load_projects()
+            self._rebuild_index()
+            self._freed_names = set()
+            self._save_indexes()
+            self._signature = signature
+            self.version += 1
+            return True
+
+    def _rebuild_index(self):
+        """ایندکس نام‌ها رو از روی لیست کامل می‌سازم"""
+        self._by_name = {p['name']: p for p in self.projects}
+        self._positions = {p['name']: i for i, p in enumerate(self.projects)}
+        self._positions_valid = len(self.projects)
+        self._sequence = {p['name']: i for i, p in enumerate(self.projects)}
+        self._next_sequence = len(self.projects)
+        for index in self.indexes:
+            index.rebuild(self.projects)
+
+    def _save_indexes(self):
+        """ایندکس‌های ذخیره‌شدنی رو (اگه تغییر کرده باشن) ذخیره می‌کنم"""
+        for index in self.persistent_indexes:
+            index.save_if_changed()
+
+    def get_projects(self):
+        """لیست پروژه‌ها رو از حافظه برمی‌گردونم"""
+        self.reload_if_changed()
+        return self.projects
+
+    def find(self, name):
+        """پروژه رو با نامش از ایندکس پیدا می‌کنم"""
+        return self._by_name.get(name)
+
+    def has_project(self, name):
+        """چک می‌کنم پروژه‌ای با این نام وجود داره یا نه"""
+        return name in self._by_name
+
+    def position(self, name):
+        """جایگاه پروژه در لیست رو برمی‌گردونم"""
+        position = self._positions.get(name)
+        if position is None:
+            return None
+        if position >= self._positions_valid:
+            for i in range(self._positions_valid, len(self.projects)):
+                self._positions[self.projects[i]['name']] = i
+            self._positions_valid = len(self.projects)
+            position = self._positions[name]
+        return position
+
+    def page_projects(self, after=None, limit=PAGE_SIZE, order='position'):
+        """یه صفحه از پروژه‌ها با صفحه‌بندی keyset روی (کلید مرتب‌سازی، نام)
+
+        after همون cursor صفحه قبله (None برای صفحه اول)؛ order یکی از
+        'position' (ترتیب لیست)، 'name'، 'start_date'، 'end_date' یا 'income'.
+        پروژه‌هایی که فیلد مرتب‌سازیشون نامعتبره بعد از بقیه و به ترتیب نام میان.
+        """
+        with self.lock:
+            self.reload_if_changed()
+            if order == 'position':
+                return self._position_page(after, limit)
+            index = self.page_orders.get(order)
+            if index is None:
+                raise ValueError(f"ترتیب نامعتبر برای صفحه‌بندی: {order}")
+            cursor = None
+            items = []
+            if after is None or after[0] is not None:
+                entries = index.entries_after(after, limit)
+                items = [self._by_name[name] for _, name in entries]
+                if entries:
+                    cursor = tuple(entries[-1])
+                after = None
+            if len(items) < limit:
+                invalid = sorted(index.invalid_names())
+                start = 0 if after is None else bisect_right(invalid, after[1])
+                rest = invalid[start:start + limit - len(items)]
+                items.extend(self._by_name[name] for name in rest)
+                if rest:
+                    cursor = (None, rest[-1])
+            return ProjectPage(items, cursor if len(items) >= limit else None, order)
+
+    def _position_page(self, after, limit):
+        start = 0 if after is None else self._position_after(after)
+        items = self.projects[start:start + limit]
+        cursor = None
+        if len(items) >= limit:
+            name = items[-1]['name']
+            cursor = (self._sequence[name], name)
+        return ProjectPage(items, cursor, 'position')
+
+    def _position_after(self, after):
+        sequence, name = after
+        position = self.position(name)
+        if position is not None:
+            return position + 1
+        # پروژه cursor حذف شده؛ لیست به ترتیب شماره ترتیب مرتبه، پس جستجوی دودویی
+        lo, hi = 0, len(self.projects)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._sequence[self.projects[mid]['name']] <= sequence:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _sorted_by_position(self, names):
+        """نام‌ها رو به ترتیب جایگاهشون در لیست به پروژه تبدیل می‌کنم"""
+        return [self._by_name[name] for name in sorted(names, key=self.position)]
+
+    def projects_by_client(self, client):
+        """پروژه‌های یه کارفرما از ایندکس"""
+        with self.lock:
+            self.reload_if_changed()
+            return self._sorted_by_position(self.client_index.names_for(client))
+
+    def clients(self):
+        """لیست مرتب کارفرماهای پروژه‌ها"""
+        with self.lock:
+            self.reload_if_changed()
+            return self.client_index.clients()
+
+    def projects_starting_between(self, first, last):
+        """پروژه‌هایی که تاریخ شروعشون بین first و last (شامل هر دو) باشه"""
+        with self.lock:
+            self.reload_if_changed()
+            return self._sorted_by_position(self.start_date_index.names_between(first, last))
+
+    def projects_ending_between(self, first, last):
+        """پروژه‌هایی که تاریخ پایانشون بین first و last (شامل هر دو) باشه"""
+        with self.lock:
+            self.reload_if_changed()
+            return self._sorted_by_position(self.end_date_index.names_between(first, last))
+
+    def active_between(self, first, last):
+        """پروژه‌هایی که در بازه [first, last] در حال اجرا بوده‌اند (هم‌پوشانی بازه‌ها)"""
+        with self.lock:
+            self.reload_if_changed()
+            return self._sorted_by_position(self.interval_index.names_overlapping(first, last))
+
+    def projects_in_month(self, year, month):
+        """پروژه‌هایی که در این ماه شروع شده یا پایان یافته‌اند"""
+        first = date(year, month, 1)
+        last = date(year, month, calendar.monthrange(year, month)[1])
+        with self.lock:
+            self.reload_if_changed()
+            names = set(self.start_date_index.names_between(first, last))
+            names.update(self.end_date_index.names_between(first, last))
+            return self._sorted_by_position(names)
+
+    def search_projects(self, name='', client=''):
+        """پروژه‌هایی که نام و کارفرماشون عبارت‌های داده‌شده رو شامل می‌شه (زیررشته)"""
+        with self.lock:
+            self.reload_if_changed()
+            names = None
+            for term, index in ((name, self.name_search_index), (client, self.client_search_index)):
+                if not term:
+                    continue
+                matches = index.names_containing(term)
+                names = set(matches) if names is None else names.intersection(matches)
+            if names is None:
+                return list(self.projects)
+            return self._sorted_by_position(names)
+
+    def search_text(self, query, limit=None):
+        """جستجوی متن کامل در توضیحات، تیم و کارفرما؛ لیست (پروژه، امتیاز) به ترتیب رتبه"""
+        with self.lock:
+            self.reload_if_changed()
+            return [(self._by_name[name], score)
+                    for name, score in self.fulltext_index.search(query, limit)]
+
+    def financial_summary(self, first, last):
+        """تعداد، درآمد، هزینه و سود پروژه‌هایی که در [first, last] پایان می‌یابند"""
+        with self.lock:
+            self.reload_if_changed()
+            return self.daily_totals.summary(first, last)
+
+    def compare_periods(self, first, last, periods=2):
+        """جمع مالی بازه [first, last] و دوره‌های هم‌طول قبل از آن، از قدیمی به جدید"""
+        first = date_ordinal(first)
+        last = date_ordinal(last)
+        length = last - first + 1
+        results = []
+        # هر بازه با دو جستجوی دودویی حساب می‌شه، پس کل کار زیر قفل می‌مونه
+        with self.lock:
+            self.reload_if_changed()
+            for i in range(periods - 1, -1, -1):
+                start = first - i * length
+                end = last - i * length
+                row = self.daily_totals.summary(start, end)
+                row['first'] = date.fromordinal(start)
+                row['last'] = date.fromordinal(end)
+                results.append(row)
+        return results
+
+    def financial_by_client(self, first=None, last=None):
+        """جمع مالی به تفکیک کارفرما؛ با first/last فقط پروژه‌هایی که در بازه پایان می‌یابند
+
+        بدون بازه جمع‌های به‌روز نگه‌داشته‌شده برمی‌گردن؛ با بازه فقط کپی ستون‌ها
+        زیر قفل گرفته می‌شه و گروه‌بندی (با NumPy برداری) بیرون از قفله.
+        """
+        with self.lock:
+            self.reload_if_changed()
+            if first is None and last is None:
+                return self.columns.client_totals()
+            columns = self.columns.snapshot(first, last)
+        return columns.group_by_client()
+
+    def financial_rollup(self, period, day):
+        """جمع مالی هفته/ماه/سالی که day درش هست، از جدول‌های به‌روز نگه‌داشته‌شده"""
+        with self.lock:
+            self.reload_if_changed()
+            return self.rollups.row(period, day)
+
+    def financial_trend(self, period):
+        """جمع مالی همه هفته‌ها/ماه‌ها/سال‌ها به ترتیب زمان"""
+        with self.lock:
+            self.reload_if_changed()
+            return self.rollups.trend(period)
+
+    def status_of(self, project):
+        """وضعیت محاسبه‌شده یه پروژه (پایان یافته / امروز / در حال اجرا)"""
+        # roll_day داخل status_of ایندکس تاریخ پایان رو می‌خونه، پس زیر قفل store
+        with self.lock:
+            if self._by_name.get(project.get('name')) is project:
+                return self.status_index.status_of(project['name'])
+        return project_status(project.get('end_date'))
+
+    def projects_with_status(self, status):
+        """پروژه‌های یه وضعیت، مستقیم از دسته‌ای که در ایندکس نگه داشته شده"""
+        with self.lock:
+            self.reload_if_changed()
+            return self._sorted_by_position(self.status_index.names_with(status))
+
+    def _changed(self):
+        """یه تغییر واقعی ثبت می‌کنم تا با تأخیر ذخیره بشه"""
+        self.version += 1
+        self._deferred.mark_dirty()
+
+    def _write_pending(self):
+        """تغییرهای جمع‌شده رو با یه بار نوشتن ذخیره می‌کنم"""
+        # پروژه‌های جدید به همون ترتیب حافظه به ذخیره‌ساز اضافه بشن
+        upserts = sorted(
+            (self.position(name), old_name) for name, old_name in self._pending_upserts.items()
+            if name in self._by_name
+        )
+        self.storage.apply_project_changes(
+            self.projects,
+            [(self.projects[position], old_name) for position, old_name in upserts],
+            list(self._pending_deletes)
+        )
+        self._pending_upserts = {}
+        self._pending_deletes = []
+        self._freed_names = set()
+        self._save_indexes()
+        self._signature = self.storage.projects_signature()
+
+    def _flush_before_reuse(self, names):
+        """اگه یکی از نام‌ها در همین نوبت آزاد شده، اول تغییرهای قبلی رو می‌نویسم
+
+        تغییرها به ترتیب جایگاه نوشته می‌شن، نه ترتیب انجامشون؛ پس بدون این کار
+        مثلاً c→tmp و بعد a→c می‌تونه در ذخیره‌ساز جابه‌جا اعمال بشه.
+        """
+        if self._freed_names and not self._freed_names.isdisjoint(names):
+            self._deferred.flush()
+
+    def flush(self):
+        """تغییرهای ذخیره‌نشده رو همین الان ذخیره می‌کنم"""
+        with self.lock:
+            self._deferred.flush()
+            self.storage.flush()
+
+    def save_projects(self, projects=None):
+        """کل پروژه‌ها رو ذخیره می‌کنم"""
+        with self.lock:
+            if projects is not None:
+                self.projects = projects
+            self._rebuild_index()
+            self._pending_upserts = {}
+            self._pending_deletes = []
+            self._freed_names = set()
+            self.storage.save_projects(self.projects)
+            self._save_indexes()
+            self._deferred.flushed_version = self._deferred.version
+            self._signature = self.storage.projects_signature()
+            self.version += 1
+
+    def add_project(self, project):
+        """یه پروژه جدید اضافه می‌کنم"""
+        with self.lock:
+            self._flush_before_reuse((project['name'],))
+            self.projects.append(project)
+            self._by_name[project['name']] = project
+            self._positions[project['name']] = len(self.projects) - 1
+            self._sequence[project['name']] = self._next_sequence
+            self._next_sequence += 1
+            for index in self.indexes:
+                index.add(project)
+            self._pending_upserts[project['name']] = None
+            self._changed()
+
+    def add_projects(self, projects):
+        """چند پروژه جدید رو یک‌جا اضافه می‌کنم (ورود گروهی)؛ همه با یه بار ذخیره نوشته می‌شن"""
+        with self.lock:
+            self._flush_before_reuse(project['name'] for project in projects)
+            start = len(self.projects)
+            self.projects.extend(projects)
+            for offset, project in enumerate(projects):
+                self._by_name[project['name']] = project
+                self._positions[project['name']] = start + offset
+                self._sequence[project['name']] = self._next_sequence + offset
+                self._pending_upserts[project['name']] = None
+            self._next_sequence += len(projects)
+            for index in self.indexes:
+                index.add_many(projects)
+            self._changed()
+
+    def update_project(self, name, changes):
+        """فیلدهای یه پروژه رو تغییر می‌دم؛ اگه چیزی عوض نشه، ذخیره‌ای هم انجام نمی‌شه"""
+        with self.lock:
+            project = self.find(name)
+            if project is None:
+                return None
+            if all(project.get(key) == value for key, value in changes.items() if key != 'updated_at'):
+                return project
+            if changes.get('name', name) != name:
+                self._flush_before_reuse((changes['name'],))
+            for index in self.indexes:
+                index.remove(project)
+            project.update(changes)
+            for index in self.indexes:
+                index.add(project)
+            new_name = project['name']
+            if new_name != name:
+                del self._by_name[name]
+                self._by_name[new_name] = project
+                self._positions[new_name] = self._positions.pop(name)
+                self._sequence[new_name] = self._sequence.pop(name)
+            origin = self._pending_upserts.pop(name, _MISSING)
+            if origin is _MISSING:
+                origin = name
+            if origin is not None and origin != new_name:
+                self._freed_names.add(origin)
+            self._pending_upserts[new_name] = None if origin == new_name else origin
+            self._changed()
+            return project
+
+    def update_projects(self, changes):
+        """چند پروژه رو یک‌جا تغییر می‌دم ({نام: تغییرها})؛ با flush همه با یه بار نوشتن ذخیره می‌شن"""
+        with self.lock:
+            updated = [self.update_project(name, project_changes)
+                       for name, project_changes in changes.items()]
+        return sum(1 for project in updated if project is not None)
+
+    def delete_projects(self, names):
+        """چند پروژه رو یک‌جا حذف می‌کنم؛ لیست پروژه‌ها فقط یه بار فیلتر می‌شه"""
+        with self.lock:
+            names = {name for name in names if name in self._by_name}
+            if not names:
+                return 0
+            first = min(self.position(name) for name in names)
+            for name in names:
+                project = self._by_name.pop(name)
+                for index in self.indexes:
+                    index.remove(project)
+                del self._positions[name]
+                del self._sequence[name]
+                origin = self._pending_upserts.pop(name, _MISSING)
+                self._pending_deletes.append(name if origin is _MISSING or origin is None else origin)
+                self._freed_names.add(self._pending_deletes[-1])
+            # در جا فیلتر می‌کنم تا بقیه کدهایی که به همین لیست اشاره دارن به‌روز بمونن
+            self.projects[first:] = [project for project in self.projects[first:]
+                                     if project['name'] not in names]
+            self._positions_valid = min(self._positions_valid, first)
+            self._changed()
+            return len(names)
+
+    def delete_project(self, name):
+        """پروژه رو با نامش حذف می‌کنم"""
+        with self.lock:
+            position = self.position(name)
+            if position is None:
+                return False
+            for index in self.indexes:
+                index.remove(self.projects[position])
+            del self.projects[position]
+            del self._by_name[name]
+            del self._positions[name]
+            del self._sequence[name]
+            self._positions_valid = min(self._positions_valid, position)
+            origin = self._pending_upserts.pop(name, _MISSING)
+            self._pending_deletes.append(name if origin is _MISSING or origin is None else origin)
+            self._freed_names.add(self._pending_deletes[-1])
+            self._changed()
+            return True
@@ -0,0 +1,243 @@
+import time
+from datetime import date
+from project_indexes import date_ordinal, parse_number, project_status
+
+# هزینه نسبی چک کردن یه شرط روی یه پروژه در مقایسه با خوندن یه نام از ایندکس
+RESIDUAL_COST = 0.25
+# هر چند نامزد یک بار لغو شدن جستجوی پس‌زمینه چک می‌شه
+CHECK_EVERY = 4096
+# مقدار پیش‌فرض فیلدهای تاریخ فرم جستجو
+DATE_PLACEHOLDER = "YYYY-MM-DD"
+
+
+class QueryFilter:
+    """پایه شرط‌های جستجو؛ هر شرط از ایندکس خودش تخمین و نامزدها رو می‌ده"""
+
+    label = ''
+
+    def estimate(self, store):
+        """تعداد تقریبی پروژه‌هایی که این شرط رو دارن"""
+        raise NotImplementedError
+
+    def candidates(self, store):
+        """نام پروژه‌های منطبق از ایندکس"""
+        raise NotImplementedError
+
+    def prepare(self, store):
+        """زیر قفل store و قبل از چک نامزدها صدا زده می‌شه؛ matches بعدش بیرون از قفل اجرا می‌شه"""
+
+    def matches(self, store, project):
+        """چک شرط روی یه پروژه (وقتی این شرط ایندکس شروع نیست)؛ فقط از داده‌های خود پروژه"""
+        raise NotImplementedError
+
+    def describe(self):
+        return self.label
+
+    def key(self):
+        """شکل نرمال‌شده شرط برای کلید کش"""
+        raise NotImplementedError
+
+
+class SubstringFilter(QueryFilter):
+    """شرط «شامل بودن» روی نام یا کارفرما (ایندکس n-gram)"""
+
+    def __init__(self, field, term):
+        self.field = field
+        self.term = term.lower()
+        self.label = f"{'نام' if field == 'name' else 'کارفرما'} شامل '{self.term}'"
+
+    def _index(self, store):
+        return store.name_search_index if self.field == 'name' else store.client_search_index
+
+    def estimate(self, store):
+        return self._index(store).estimate(self.term)
+
+    def candidates(self, store):
+        return self._index(store).names_containing(self.term)
+
+    def matches(self, store, project):
+        return self.term in str(project.get(self.field, '')).lower()
+
+    def key(self):
+        return ('substring', self.field, self.term)
+
+
+class RangeFilter(QueryFilter):
+    """شرط بازه روی یه ایندکس مرتب؛ پروژه‌هایی که مقدارشون نامعتبره حذف نمی‌شن"""
+
+    def __init__(self, index_name, label, first, last):
+        self.index_name = index_name
+        self.first = first
+        self.last = last
+        self.label = label
+
+    def _index(self, store):
+        return getattr(store, self.index_name)
+
+    def estimate(self, store):
+        index = self._index(store)
+        return index.count_between(self.first, self.last) + len(index.invalid_names())
+
+    def candidates(self, store):
+        index = self._index(store)
+        return index.values_between(self.first, self.last) + index.invalid_names()
+
+    def matches(self, store, project):
+        value = self._index(store).value_for(project)
+        if value is None:
+            return True
+        if self.first is not None and value < self.first:
+            return False
+        if self.last is not None and value > self.last:
+            return False
+        return True
+
+    def key(self):
+        return ('range', self.index_name, self.first, self.last)
+
+
+class StatusFilter(QueryFilter):
+    """شرط وضعیت از دسته‌های ایندکس وضعیت"""
+
+    def __init__(self, status):
+        self.status = status
+        self.label = f"وضعیت = {status}"
+        self._today = None
+
+    def estimate(self, store):
+        return store.status_index.count(self.status) + len(store.end_date_index.invalid_names())
+
+    def candidates(self, store):
+        return store.status_index.names_with(self.status) + store.end_date_index.invalid_names()
+
+    def prepare(self, store):
+        self._today = date.today().toordinal()
+
+    def matches(self, store, project):
+        status = project_status(project.get('end_date'), self._today)
+        return not status or status == self.status
+
+    def key(self):
+        return ('status', self.status)
+
+
+class ProjectQuery:
+    """یه جستجوی پیشرفته: شرط‌های پرشده فرم به همراه طرح اجرا
+
+    برای اجرا، کم‌هزینه‌ترین ایندکس (کمترین تخمین) به عنوان شروع انتخاب
+    می‌شه و بقیه شرط‌ها به ترتیب گزینش‌پذیری روی نامزدها چک می‌شن.
+    """
+
+    def __init__(self, name='', client='', min_income='', max_income='',
+                 start_from='', start_to='', status=''):
+        self.filters = []
+        if name:
+            self.filters.append(SubstringFilter('name', name))
+        if client:
+            self.filters.append(SubstringFilter('client', client))
+        low, high = parse_number(min_income), parse_number(max_income)
+        if low is not None or high is not None:
+            self.filters.append(RangeFilter(
+                'income_index', f"درآمد بین {min_income or '-'} و {max_income or '-'}", low, high))
+        first, last = self._date(start_from), self._date(start_to)
+        if first is not None or last is not None:
+            self.filters.append(RangeFilter(
+                'start_date_index', f"تاریخ شروع بین {start_from if first else '-'} و {start_to if last else '-'}",
+                first, last))
+        if status and status != "همه":
+            self.filters.append(StatusFilter(status))
+        self.plan = None
+        self.stats = None
+
+    def cache_key(self):
+        """پارامترهای نرمال‌شده جستجو (ورودی‌های نادیده‌گرفته‌شده حذف شدن)"""
+        return tuple(sorted(f.key() for f in self.filters))
+
+    @property
+    def depends_on_day(self):
+        return any(isinstance(f, StatusFilter) for f in self.filters)
+
+    def _date(self, value):
+        # فیلدهای خالی یا با مقدار پیش‌فرض و تاریخ‌های نامعتبر نادیده گرفته می‌شن (مثل قبل)
+        if not value or value == DATE_PLACEHOLDER:
+            return None
+        return date_ordinal(value)
+
+    def make_plan(self, store):
+        """هزینه هر شرط رو تخمین می‌زنم و ترتیب اجرا رو انتخاب می‌کنم"""
+        total = len(store.projects)
+        estimates = sorted(((f.estimate(store), i, f) for i, f in enumerate(self.filters)),
+                           key=lambda item: (item[0], item[1]))
+        best_cost, driver = total * RESIDUAL_COST * len(self.filters), None
+        for estimate, _, query_filter in estimates:
+            cost = estimate + estimate * RESIDUAL_COST * (len(self.filters) - 1)
+            if cost < best_cost:
+                best_cost, driver = cost, query_filter
+        residual = [f for _, _, f in estimates if f is not driver]
+        self.plan = {
+            'total': total,
+            'driver': driver,
+            'residual': residual,
+            'estimates': {id(f): estimate for estimate, _, f in estimates},
+            'cost': best_cost,
+        }
+        return self.plan
+
+    def execute(self, store, check=None):
+        """جستجو رو اجرا می‌کنم و پروژه‌ها رو به ترتیب جایگاهشون برمی‌گردونم
+
+        check (اختیاری) هر CHECK_EVERY نامزد یک بار صدا زده می‌شه تا اجرای
+        پس‌زمینه بتونه با یه استثنا جستجو رو وسط کار متوقف کنه.
+
+        فقط طرح و لیست نامزدها (به ترتیب جایگاه) زیر قفل store ساخته می‌شن؛
+        چک شرط‌های باقی‌مونده که کار اصلیه بیرون از قفل انجام می‌شه.
+        """
+        started = time.perf_counter()
+        with store.lock:
+            store.reload_if_changed()
+            plan = self.make_plan(store)
+            if plan['driver'] is None:
+                candidates = list(store.projects)
+            else:
+                candidates = [store.find(name) for name in set(plan['driver'].candidates(store))]
+                candidates.sort(key=lambda project: store.position(project['name']))
+            for query_filter in plan['residual']:
+                query_filter.prepare(store)
+        if check is None:
+            found = [project for project in candidates
+                     if all(f.matches(store, project) for f in plan['residual'])]
+        else:
+            found = []
+            for start in range(0, len(candidates), CHECK_EVERY):
+                check()
+                found.extend(project for project in candidates[start:start + CHECK_EVERY]
+                             if all(f.matches(store, project) for f in plan['residual']))
+        self.stats = {
+            'examined': len(candidates),
+            'matched': len(found),
+            'seconds': time.perf_counter() - started,
+        }
+        return found
+
+    def explain(self, store=None):
+        """متن طرح اجرا: ایندکس شروع، شرط‌های باقی‌مونده و تخمین‌ها (و آمار آخرین اجرا)"""
+        if store is not None:
+            self.make_plan(store)
+        if self.plan is None:
+            return "طرحی ساخته نشده است"
+        plan = self.plan
+        lines = [f"تعداد کل پروژه‌ها: {plan['total']}"]
+        if plan['driver'] is None:
+            lines.append("شروع: پیمایش کامل همه پروژه‌ها")
+        else:
+            lines.append(f"شروع از ایندکس: {plan['driver'].describe()} "
+                         f"(تخمین {plan['estimates'][id(plan['driver'])]} پروژه)")
+        for query_filter in plan['residual']:
+            lines.append(f"شرط باقی‌مانده: {query_filter.describe()} "
+                         f"(تخمین {plan['estimates'][id(query_filter)]} پروژه)")
+        lines.append(f"هزینه تخمینی: {plan['cost']:.1f}")
+        if self.stats is not None:
+            lines.append(f"آخرین اجرا: {self.stats['examined']} پروژه بررسی، "
+                         f"{self.stats['matched']} پروژه یافت شد در "
+                         f"{self.stats['seconds'] * 1000:.1f} میلی‌ثانیه")
+        return "\n".join(lines)
@@ -0,0 +1,258 @@
+import csv
+import json
+import os
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+from project_indexes import parse_number
+
+# ستون‌های خروجی گزارش به ترتیب: (کلید، عنوان)
+EXPORT_COLUMNS = (
+    ('name', 'نام پروژه'),
+    ('client', 'کارفرما'),
+    ('start_date', 'تاریخ شروع'),
+    ('end_date', 'تاریخ پایان'),
+    ('income', 'درآمد'),
+    ('cost', 'هزینه'),
+    ('profit', 'سود خالص'),
+    ('status', 'وضعیت'),
+)
+NUMBER_FIELDS = ('income', 'cost', 'profit')
+# هر چند ردیف یک بار لغو شدن خروجی گرفتن چک می‌شه
+CHECK_EVERY = 4096
+
+
+def export_record(project, status_of):
+    """یه پروژه رو به رکورد خروجی تبدیل می‌کنم؛ مبلغ‌ها عدد می‌مونن (نه رشته قالب‌بندی‌شده)"""
+    income = parse_number(project.get('income', 0)) or 0.0
+    cost = parse_number(project.get('cost', 0)) or 0.0
+    return {
+        'name': project.get('name', ''),
+        'client': project.get('client', ''),
+        'start_date': project.get('start_date', ''),
+        'end_date': project.get('end_date', ''),
+        'income': income,
+        'cost': cost,
+        'profit': income - cost,
+        'status': status_of(project),
+    }
+
+
+class ReportWriter:
+    """پایه نویسنده‌های خروجی: begin(تعداد)، write(رکورد)، end(جمع‌ها) و close()"""
+
+    encoding = 'utf-8'
+    newline = None
+
+    def __init__(self, path):
+        self.path = path
+        self.f = None
+
+    def begin(self, count):
+        self.f = open(self.path, 'w', encoding=self.encoding, newline=self.newline)
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def end(self, totals):
+        pass
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+
+class CsvWriter(ReportWriter):
+    # BOM باعث می‌شه Excel متن فارسی رو درست باز کنه
+    encoding = 'utf-8-sig'
+    newline = ''
+    delimiter = ','
+
+    def begin(self, count):
+        super().begin(count)
+        self.writer = csv.writer(self.f, delimiter=self.delimiter)
+        self.writer.writerow([title for _, title in EXPORT_COLUMNS])
+
+    def write(self, record):
+        self.writer.writerow([record[key] for key, _ in EXPORT_COLUMNS])
+
+
+class TsvWriter(CsvWriter):
+    delimiter = '\t'
+
+
+class JsonLinesWriter(ReportWriter):
+    def write(self, record):
+        self.f.write(json.dumps(record, ensure_ascii=False))
+        self.f.write('\n')
+
+
+class TextWriter(ReportWriter):
+    """همون قالب متنی قبلی «ذخیره گزارش» با خلاصه مالی در انتها"""
+
+    def begin(self, count):
+        super().begin(count)
+        self.f.write("گزارش پروژه‌ها\n")
+        self.f.write("=" * 50 + "\n\n")
+        self.f.write(f"تاریخ گزارش: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        self.f.write(f"تعداد نتایج: {count}\n\n")
+        self.f.write("\t".join(title for _, title in EXPORT_COLUMNS) + "\n")
+        self.f.write("-" * 100 + "\n")
+
+    def write(self, record):
+        self.f.write("\t".join(f"{record[key]:,}" if key in NUMBER_FIELDS else str(record[key])
+                               for key, _ in EXPORT_COLUMNS) + "\n")
+
+    def end(self, totals):
+        self.f.write("\n" + "=" * 50 + "\n")
+        self.f.write("خلاصه مالی:\n")
+        self.f.write(f"کل درآمد: {totals['income']:,} تومان\n")
+        self.f.write(f"کل هزینه: {totals['cost']:,} تومان\n")
+        self.f.write(f"سود خالص: {totals['profit']:,} تومان\n")
+
+
+# کاراکترهای کنترلی که در XML مجاز نیستن
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Report" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+class XlsxWriter(ReportWriter):
+    """فایل XLSX حداقلی که برگه‌ش مستقیم داخل zip نوشته می‌شه (بدون نگه داشتن ردیف‌ها در حافظه)
+
+    متن‌ها inline نوشته می‌شن تا جدول sharedStrings (که باید کامل در حافظه
+    ساخته بشه) لازم نباشه.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.zip = None
+        self.sheet = None
+        self.row = 0
+        # ردیف‌ها چندتا چندتا در zip نوشته می‌شن؛ هر بار نوشتن در فشرده‌ساز هزینه ثابت داره
+        self._pending = []
+
+    def begin(self, count):
+        self.zip = zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED)
+        self.zip.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        self.zip.writestr('_rels/.rels', _XLSX_RELS)
+        self.zip.writestr('xl/workbook.xml', _XLSX_WORKBOOK)
+        self.zip.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        self.sheet = self.zip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)
+        self._put('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                  '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                  '<sheetViews><sheetView workbookViewId="0" rightToLeft="1"/></sheetViews>'
+                  '<sheetData>')
+        self._row([title for _, title in EXPORT_COLUMNS])
+
+    def _put(self, text):
+        self.sheet.write(text.encode('utf-8'))
+
+    def _row(self, values):
+        self.row += 1
+        cells = []
+        for value in values:
+            if isinstance(value, (int, float)):
+                cells.append(f'<c><v>{value!r}</v></c>')
+            else:
+                text = escape(_XML_INVALID.sub('', str(value)))
+                cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        self._pending.append(f'<row r="{self.row}">{"".join(cells)}</row>')
+        if len(self._pending) >= 1024:
+            self._flush()
+
+    def _flush(self):
+        self._put(''.join(self._pending))
+        self._pending = []
+
+    def write(self, record):
+        self._row([record[key] for key, _ in EXPORT_COLUMNS])
+
+    def end(self, totals):
+        self._flush()
+        self._put('</sheetData></worksheet>')
+
+    def close(self):
+        if self.sheet is not None:
+            self.sheet.close()
+            self.sheet = None
+        if self.zip is not None:
+            self.zip.close()
+            self.zip = None
+
+
+# پسوند فایل -> نویسنده
+EXPORT_FORMATS = {
+    '.csv': CsvWriter,
+    '.tsv': TsvWriter,
+    '.jsonl': JsonLinesWriter,
+    '.txt': TextWriter,
+    '.xlsx': XlsxWriter,
+}
+
+
+def export_projects(projects, path, status_of, check=None):
+    """پروژه‌ها رو در یک گذر در فایل می‌نویسم و جمع‌های مالی رو همزمان حساب می‌کنم
+
+    قالب از پسوند فایل انتخاب می‌شه (پسوند ناشناخته همون قالب متنی می‌گیره).
+    check (اختیاری) هر CHECK_EVERY ردیف صدا زده می‌شه تا خروجی گرفتن
+    پس‌زمینه قابل لغو باشه؛ فایل نیمه‌کاره پاک می‌شه. جمع‌ها برمی‌گردن: {'count', 'income', 'cost', 'profit'}
+    """
+    writer = EXPORT_FORMATS.get(os.path.splitext(path)[1].lower(), TextWriter)(path)
+    count = len(projects) if hasattr(projects, '__len__') else ''
+    totals = {'count': 0, 'income': 0.0, 'cost': 0.0, 'profit': 0.0}
+    try:
+        writer.begin(count)
+        for project in projects:
+            if check is not None and totals['count'] % CHECK_EVERY == 0:
+                check()
+            record = export_record(project, status_of)
+            writer.write(record)
+            totals['count'] += 1
+            totals['income'] += record['income']
+            totals['cost'] += record['cost']
+        totals['profit'] = totals['income'] - totals['cost']
+        writer.end(totals)
+    except BaseException:
+        # فایل نیمه‌کاره (مثلاً بعد از لغو) باقی نمی‌مونه
+        writer.close()
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    writer.close()
+    return totals
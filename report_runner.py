@@ -0,0 +1,136 @@
+import os
+import queue
+import threading
+
+# تعداد ردیف‌های هر دسته‌ای که از thread کارگر به جدول نتایج فرستاده می‌شه
+REPORT_BATCH_SIZE = int(os.environ.get('PM_REPORT_BATCH_SIZE', 500))
+# فاصله خوندن صف نتیجه‌ها از thread اصلی (میلی‌ثانیه)
+REPORT_POLL_MS = 30
+# حداکثر دسته‌هایی که در هر نوبت خوندن صف به جدول اضافه می‌شن تا Tk روون بمونه
+BATCHES_PER_POLL = 8
+
+
+class ReportCancelled(Exception):
+    """اجرای گزارش با دکمه لغو متوقف شد"""
+
+
+class ReportJob:
+    """یه گزارش که روی thread جدا اجرا می‌شه و نتیجه‌ش رو دسته‌دسته به رابط کاربری می‌ده
+
+    compute(job) روی thread کارگر صدا زده می‌شه و لیست یا هر iterable از
+    نتیجه‌ها رو برمی‌گردونه؛ ردیف‌ها در دسته‌های batch_size تایی در صف
+    گذاشته می‌شن و thread اصلی با after() صف رو می‌خونه، پس به Tk فقط از
+    thread خودش دست زده می‌شه. کارهای طولانی داخل compute می‌تونن با
+    job.check() لغو شدن رو چک کنن.
+
+    callbackها همه روی thread اصلی صدا زده می‌شن:
+    on_batch(rows)، on_progress(done, total) (total برای iterableهای بی‌طول None‌ه)،
+    on_done(job)، on_error(error) و on_cancel(job).
+    """
+
+    def __init__(self, widget, compute, on_batch, on_done=None, on_error=None,
+                 on_progress=None, on_cancel=None, batch_size=REPORT_BATCH_SIZE,
+                 poll_ms=REPORT_POLL_MS):
+        self.widget = widget
+        self.compute = compute
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.batch_size = batch_size
+        self.poll_ms = poll_ms
+        # compute می‌تونه اطلاعات اضافه (مثلاً خلاصه مالی) رو اینجا بذاره
+        self.extra = None
+        self.total = None
+        self.delivered = 0
+        self.finished = False
+        self._cancelled = threading.Event()
+        self._queue = queue.Queue()
+        self._after = None
+        self._thread = None
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check(self):
+        """اگه گزارش لغو شده باشه ReportCancelled می‌دم؛ برای صدا زدن از داخل compute"""
+        if self._cancelled.is_set():
+            raise ReportCancelled()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._work, name='report-job', daemon=True)
+        self._thread.start()
+        self._after = self.widget.after(self.poll_ms, self._poll)
+        return self
+
+    def cancel(self):
+        """thread کارگر سر اولین دسته بعدی متوقف می‌شه؛ ردیف‌هایی که رسیدن می‌مونن"""
+        if self.finished:
+            return
+        self._cancelled.set()
+        self._finish()
+        if self.on_cancel is not None:
+            self.on_cancel(self)
+
+    def _work(self):
+        try:
+            result = self.compute(self)
+            self.check()
+            total = len(result) if hasattr(result, '__len__') else None
+            self._queue.put(('total', total))
+            batch = []
+            for item in result:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self.check()
+                    self._queue.put(('batch', batch))
+                    batch = []
+            if batch:
+                self._queue.put(('batch', batch))
+            self._queue.put(('done', None))
+        except ReportCancelled:
+            pass
+        except Exception as e:
+            self._queue.put(('error', e))
+
+    def _poll(self):
+        self._after = None
+        if self.finished:
+            return
+        batches = 0
+        while batches < BATCHES_PER_POLL:
+            try:
+                kind, value = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'total':
+                self.total = value
+            elif kind == 'batch':
+                batches += 1
+                self.delivered += len(value)
+                self.on_batch(value)
+            elif kind == 'done':
+                self._finish()
+                self._progress()
+                if self.on_done is not None:
+                    self.on_done(self)
+                return
+            else:
+                self._finish()
+                if self.on_error is not None:
+                    self.on_error(value)
+                return
+        self._progress()
+        self._after = self.widget.after(self.poll_ms, self._poll)
+
+    def _progress(self):
+        if self.on_progress is not None:
+            self.on_progress(self.delivered, self.total)
+
+    def _finish(self):
+        self.finished = True
+        if self._after is not None:
+            self.widget.after_cancel(self._after)
+            self._after = None
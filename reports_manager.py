@@ -1,23 +1,89 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
-import os
-from datetime import datetime, timedelta
-import calendar
+from datetime import datetime
+from core import ReportService, ValidationError
+from core.reports import parse_day, parse_month, parse_range, period_bounds
+from project_store import ProjectStore
+from query_planner import ProjectQuery
+from report_runner import ReportJob
+from virtual_tree import VirtualTreeview
+from storage import get_storage
 
 class ReportsManager:
     def __init__(self):
-        self.projects_file = "projects.json"
+        self.store = ProjectStore.shared(get_storage())
+        # خود گزارش‌ها (و کش نتیجه‌هاشون) در لایه core هستن؛ اینجا فقط نمایش و اجرای پس‌زمینه
+        self.reports = ReportService(self.store)
+        self.result_cache = self.reports.result_cache
+        # گزارشی که الان روی thread کارگر در حال اجراست
+        self.report_job = None
         
     def load_projects(self):
-        """پروژه‌ها رو از فایل می‌خونم"""
-        if os.path.exists(self.projects_file):
-            try:
-                with open(self.projects_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        """پروژه‌ها رو از store مشترک می‌گیرم (همون نسخه‌ای که ProjectManager داره)"""
+        return self.store.get_projects()
+    
+    def run_report(self, compute, on_done=None):
+        """گزارش رو روی thread کارگر اجرا می‌کنم و نتیجه‌ها رو دسته‌دسته در جدول می‌ریزم
+
+        compute(job) یکی از متدهای ReportService رو صدا می‌زنه (زیر قفل store و
+        با کش) و لیست پروژه‌ها یا (لیست پروژه‌ها، اطلاعات اضافه) رو برمی‌گردونه.
+        on_done(تعداد، اطلاعات اضافه) بعد از رسیدن آخرین دسته روی thread اصلی صدا زده می‌شه.
+        """
+        self.cancel_report()
+        self.clear_results()
+        
+        def work(job):
+            # نتیجه کامل کش می‌شه؛ گزارشی که وسط کار لغو بشه چیزی در کش نمی‌ذاره
+            found = compute(job)
+            if isinstance(found, tuple):
+                found, job.extra = found
+            return found
+        
+        def done(job):
+            self.report_finished()
+            if on_done is not None:
+                on_done(job.delivered, job.extra)
+        
+        def failed(error):
+            self.report_finished()
+            messagebox.showerror("خطا", f"خطا در اجرای گزارش:\n{str(error)}")
+        
+        def cancelled(job):
+            self.report_finished()
+            self.count_label.config(text=f"تعداد نتایج: {job.delivered} (متوقف شد)")
+        
+        self.start_job(work, self.add_results_batch, done, failed, cancelled)
+    
+    def start_job(self, work, on_batch, on_done, on_error, on_cancel):
+        """یه کار پس‌زمینه (گزارش یا خروجی گرفتن) رو با نوار پیشرفت و دکمه توقف شروع می‌کنم"""
+        self.cancel_report()
+        self.progress.config(mode='indeterminate')
+        self.progress.start(10)
+        self.stop_btn.config(state=tk.NORMAL)
+        self.report_job = ReportJob(
+            self.results_tree, work, on_batch, on_done=on_done, on_error=on_error,
+            on_progress=self.update_progress, on_cancel=on_cancel
+        ).start()
+    
+    def cancel_report(self):
+        """گزارش در حال اجرا رو متوقف می‌کنم (ردیف‌هایی که رسیدن در جدول می‌مونن)"""
+        if self.report_job is not None and not self.report_job.finished:
+            self.report_job.cancel()
+    
+    def report_finished(self):
+        self.progress.stop()
+        self.progress.config(mode='determinate', value=0)
+        self.stop_btn.config(state=tk.DISABLED)
+        self.update_count_label()
+    
+    def update_progress(self, done, total):
+        """نوار پیشرفت: تا وقتی تعداد کل معلوم نیست حالت نامعین نشون داده می‌شه"""
+        if total is None:
+            return
+        if str(self.progress.cget('mode')) != 'determinate':
+            self.progress.stop()
+            self.progress.config(mode='determinate')
+        self.progress.config(maximum=max(total, 1), value=done)
     
     def show_reports_window(self, parent):
         """پنجره گزارش‌گیری رو نشون می‌دم"""
@@ -43,11 +109,16 @@ class ReportsManager:
             ("گزارش بر اساس تاریخ شروع", self.report_by_start_date, '#f39c12'),
             ("گزارش بر اساس تاریخ پایان", self.report_by_end_date, '#e74c3c'),
             ("گزارش پروژه‌های یک ماه خاص", self.report_by_month, '#9b59b6'),
+            ("گزارش پروژه‌های فعال در یک بازه", self.report_active_between, '#c0392b'),
             ("گزارش بر اساس وضعیت", self.report_by_status, '#8e44ad'),
             ("جستجوی پیشرفته", self.advanced_search, '#16a085'),
+            ("جستجوی متن کامل (توضیحات، تیم، کارفرما)", self.report_full_text, '#2980b9'),
             ("گزارش مالی هفتگی", self.financial_report_weekly, '#1abc9c'),
             ("گزارش مالی ماهانه", self.financial_report_monthly, '#34495e'),
-            ("گزارش مالی سالانه", self.financial_report_yearly, '#e67e22')
+            ("گزارش مالی سالانه", self.financial_report_yearly, '#e67e22'),
+            ("روند مالی چندساله", self.financial_trend_report, '#d35400'),
+            ("گزارش مالی به تفکیک کارفرما", self.financial_by_client_report, '#2c3e50'),
+            ("گزارش مالی بازه دلخواه", self.financial_report_range, '#7f8c8d')
         ]
         
         for i, (text, command, color) in enumerate(reports_data):
@@ -87,9 +158,6 @@ class ReportsManager:
         content_frame = tk.Frame(results_frame)
         content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        columns = ('name', 'client', 'start_date', 'end_date', 'income', 'cost', 'profit', 'status')
-        self.results_tree = ttk.Treeview(content_frame, columns=columns, show='headings', height=15)
-        
         column_names = {
             'name': 'نام پروژه',
             'client': 'کارفرما',
@@ -103,15 +171,9 @@ class ReportsManager:
         
         widths = [150, 120, 100, 100, 80, 80, 80, 80]
         
-        for col, name in column_names.items():
-            self.results_tree.heading(col, text=name)
-            self.results_tree.column(col, width=widths[list(column_names.keys()).index(col)], anchor=tk.CENTER)
-        
-        scrollbar = ttk.Scrollbar(content_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
-        self.results_tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # فقط ردیف‌های دیده‌شده ساخته می‌شن؛ نتیجه‌ها در یه لیست معمولی نگه داشته می‌شن
+        self.results_tree = VirtualTreeview(content_frame, column_names, widths, self.project_row, height=15)
+        self.results_tree.pack(fill=tk.BOTH, expand=True)
         
         bottom_frame = tk.Frame(results_frame, bg='#ecf0f1')
         bottom_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=5)
@@ -125,6 +187,32 @@ class ReportsManager:
         )
         self.count_label.pack(side=tk.LEFT, padx=10)
         
+        self.cache_label = tk.Label(
+            bottom_frame,
+            text="",
+            font=('Tahoma', 9),
+            bg='#ecf0f1',
+            fg='#7f8c8d'
+        )
+        self.cache_label.pack(side=tk.LEFT, padx=10)
+        
+        self.progress = ttk.Progressbar(bottom_frame, length=150, mode='determinate')
+        self.progress.pack(side=tk.LEFT, padx=10)
+        
+        self.stop_btn = tk.Button(
+            bottom_frame,
+            text="توقف گزارش",
+            command=self.cancel_report,
+            font=('Tahoma', 9),
+            bg='#c0392b',
+            fg='white',
+            relief=tk.RAISED,
+            bd=1,
+            state=tk.DISABLED,
+            cursor='hand2'
+        )
+        self.stop_btn.pack(side=tk.LEFT, padx=10)
+        
         save_btn = tk.Button(
             bottom_frame,
             text="ذخیره گزارش",
@@ -140,26 +228,27 @@ class ReportsManager:
     
     def clear_results(self):
         """پاک کردن نتایج قبلی"""
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
+        self.results_tree.clear()
         self.update_count_label()
     
     def add_project_to_results(self, project):
-        """اضافه کردن پروژه به نتایج"""
+        """اضافه کردن پروژه به نتایج (ردیف فقط وقتی دیده بشه ساخته می‌شه)"""
+        self.results_tree.append(project)
+    
+    def add_results_batch(self, projects):
+        """یه دسته نتیجه که از thread کارگر رسیده رو به جدول اضافه می‌کنم"""
+        self.results_tree.extend(projects)
+        self.count_label.config(text=f"تعداد نتایج: {self.results_tree.count()}")
+    
+    def project_row(self, project):
+        """مقدارهای ستون‌های جدول نتایج برای یه پروژه"""
         income = float(project.get('income', 0))
         cost = float(project.get('cost', 0))
         profit = income - cost
         
-        end_date = datetime.strptime(project.get('end_date', ''), '%Y-%m-%d')
-        today = datetime.now()
-        if end_date < today:
-            status = "پایان یافته"
-        elif end_date == today:
-            status = "امروز"
-        else:
-            status = "در حال اجرا"
+        status = self.store.status_of(project)
         
-        self.results_tree.insert('', tk.END, values=(
+        return (
             project.get('name', ''),
             project.get('client', ''),
             project.get('start_date', ''),
@@ -168,83 +257,68 @@ class ReportsManager:
             f"{cost:,}",
             f"{profit:,}",
             status
-        ))
+        )
     
     def update_count_label(self):
         """به‌روزرسانی برچسب تعداد نتایج"""
-        count = len(self.results_tree.get_children())
+        count = self.results_tree.count()
         self.count_label.config(text=f"تعداد نتایج: {count}")
+        stats = self.result_cache.stats()
+        self.cache_label.config(
+            text=f"کش گزارش‌ها: {stats['hits']} استفاده مجدد / {stats['misses']} محاسبه ({stats['entries']} نتیجه)"
+        )
     
     def show_all_projects(self, parent):
         """نمایش همه پروژه‌ها"""
-        self.clear_results()
-        projects = self.load_projects()
-        
-        if not projects:
-            messagebox.showinfo("اطلاع", "هیچ پروژه‌ای یافت نشد")
-            return
-        
-        for project in projects:
-            self.add_project_to_results(project)
+        def done(count, extra):
+            if not count:
+                messagebox.showinfo("اطلاع", "هیچ پروژه‌ای یافت نشد")
+            else:
+                messagebox.showinfo("اطلاع", f"تمام {count} پروژه نمایش داده شدند")
         
-        self.update_count_label()
-        messagebox.showinfo("اطلاع", f"تمام {len(projects)} پروژه نمایش داده شدند")
+        # پروژه‌ها صفحه به صفحه از store خونده می‌شن، بدون کپی گرفتن از کل لیست
+        self.run_report(lambda job: self.reports.all_projects(), done)
     
     def save_report_to_file(self):
-        """ذخیره گزارش در فایل"""
-        items = self.results_tree.get_children()
-        if not items:
+        """ذخیره گزارش در فایل (متن، CSV، TSV، JSONL یا XLSX بر اساس پسوند)
+
+        خروجی از خود پروژه‌های نتیجه و در یک گذر روی thread کارگر نوشته می‌شه؛
+        جمع‌های مالی همزمان با نوشتن حساب می‌شن.
+        """
+        projects = list(self.results_tree.items)
+        if not projects:
             messagebox.showwarning("هشدار", "هیچ نتیجه‌ای برای ذخیره وجود ندارد")
             return
         
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=[
+                ("Text files", "*.txt"),
+                ("CSV files", "*.csv"),
+                ("TSV files", "*.tsv"),
+                ("JSON Lines files", "*.jsonl"),
+                ("Excel files", "*.xlsx"),
+                ("All files", "*.*")
+            ],
             title="ذخیره گزارش"
         )
         
         if not file_path:
             return
         
-        try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write("گزارش پروژه‌ها\n")
-                f.write("=" * 50 + "\n\n")
-                f.write(f"تاریخ گزارش: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"تعداد نتایج: {len(items)}\n\n")
-                
-                f.write("نام پروژه\tکارفرما\tتاریخ شروع\tتاریخ پایان\tدرآمد\tهزینه\tسود خالص\tوضعیت\n")
-                f.write("-" * 100 + "\n")
-                
-                for item in items:
-                    values = self.results_tree.item(item)['values']
-                    f.write("\t".join(str(v) for v in values) + "\n")
-                
-                # محاسبه خلاصه مالی
-                total_income = 0
-                total_cost = 0
-                for item in items:
-                    values = self.results_tree.item(item)['values']
-                    income_str = values[4].replace(',', '')
-                    cost_str = values[5].replace(',', '')
-                    try:
-                        total_income += float(income_str)
-                        total_cost += float(cost_str)
-                    except:
-                        pass
-                
-                total_profit = total_income - total_cost
-                
-                f.write("\n" + "=" * 50 + "\n")
-                f.write("خلاصه مالی:\n")
-                f.write(f"کل درآمد: {total_income:,} تومان\n")
-                f.write(f"کل هزینه: {total_cost:,} تومان\n")
-                f.write(f"سود خالص: {total_profit:,} تومان\n")
-            
+        def work(job):
+            job.extra = self.reports.export(projects, file_path, check=job.check)
+            return ()
+        
+        def done(job):
+            self.report_finished()
             messagebox.showinfo("موفقیت", f"گزارش با موفقیت در فایل ذخیره شد:\n{file_path}")
-            
-        except Exception as e:
-            messagebox.showerror("خطا", f"خطا در ذخیره فایل:\n{str(e)}")
+        
+        def failed(error):
+            self.report_finished()
+            messagebox.showerror("خطا", f"خطا در ذخیره فایل:\n{str(error)}")
+        
+        self.start_job(work, lambda rows: None, done, failed, lambda job: self.report_finished())
     
     def report_by_status(self, parent):
         """گزارش بر اساس وضعیت پروژه"""
@@ -301,35 +375,14 @@ class ReportsManager:
         def search():
             selected_status = status_var.get()
             
-            self.clear_results()
-            found_projects = []
-            projects = self.load_projects()
+            def done(count, extra):
+                if not count:
+                    messagebox.showinfo("اطلاع", f"پروژه‌ای با وضعیت '{selected_status}' یافت نشد")
+                else:
+                    messagebox.showinfo("اطلاع", f"{count} پروژه با وضعیت '{selected_status}' یافت شد")
             
-            for project in projects:
-                try:
-                    end_date = datetime.strptime(project.get('end_date', ''), '%Y-%m-%d')
-                    today = datetime.now()
-                    
-                    if end_date < today:
-                        status = "پایان یافته"
-                    elif end_date == today:
-                        status = "امروز"
-                    else:
-                        status = "در حال اجرا"
-                    
-                    if status == selected_status:
-                        found_projects.append(project)
-                        self.add_project_to_results(project)
-                except:
-                    continue
-            
-            self.update_count_label()
+            self.run_report(lambda job: self.reports.by_status(selected_status), done)
             status_window.destroy()
-            
-            if not found_projects:
-                messagebox.showinfo("اطلاع", f"پروژه‌ای با وضعیت '{selected_status}' یافت نشد")
-            else:
-                messagebox.showinfo("اطلاع", f"{len(found_projects)} پروژه با وضعیت '{selected_status}' یافت شد")
         
         button_frame = tk.Frame(main_frame, bg='#f0f0f0')
         button_frame.pack(fill=tk.X)
@@ -437,80 +490,29 @@ class ReportsManager:
         tk.Radiobutton(status_frame, text="پایان یافته", variable=status_var, value="پایان یافته", font=('Tahoma', 9), bg='#f0f0f0').pack(side=tk.LEFT, padx=(0, 10))
         tk.Radiobutton(status_frame, text="امروز", variable=status_var, value="امروز", font=('Tahoma', 9), bg='#f0f0f0').pack(side=tk.LEFT)
         
+        def build_query():
+            return ProjectQuery(
+                name=name_entry.get().strip().lower(),
+                client=client_entry.get().strip().lower(),
+                min_income=min_income_entry.get().strip(),
+                max_income=max_income_entry.get().strip(),
+                start_from=start_date_from.get().strip(),
+                start_to=start_date_to.get().strip(),
+                status=status_var.get()
+            )
+        
         def search():
-            name_filter = name_entry.get().strip().lower()
-            client_filter = client_entry.get().strip().lower()
-            min_income = min_income_entry.get().strip()
-            max_income = max_income_entry.get().strip()
-            start_from = start_date_from.get().strip()
-            start_to = start_date_to.get().strip()
-            status_filter = status_var.get()
+            # planner از گزینش‌پذیرترین ایندکس شروع می‌کنه و بقیه شرط‌ها رو روی نامزدها چک می‌کنه
+            query = build_query()
             
-            self.clear_results()
-            found_projects = []
-            projects = self.load_projects()
-            
-            for project in projects:
-                # فیلتر نام
-                if name_filter and name_filter not in project.get('name', '').lower():
-                    continue
-                
-                # فیلتر کارفرما
-                if client_filter and client_filter not in project.get('client', '').lower():
-                    continue
-                
-                # فیلتر درآمد
-                try:
-                    income = float(project.get('income', 0))
-                    if min_income and income < float(min_income):
-                        continue
-                    if max_income and income > float(max_income):
-                        continue
-                except:
-                    pass
-                
-                # فیلتر تاریخ شروع
-                try:
-                    start_date = datetime.strptime(project.get('start_date', ''), '%Y-%m-%d')
-                    if start_from and start_from != "YYYY-MM-DD":
-                        start_from_date = datetime.strptime(start_from, '%Y-%m-%d')
-                        if start_date < start_from_date:
-                            continue
-                    if start_to and start_to != "YYYY-MM-DD":
-                        start_to_date = datetime.strptime(start_to, '%Y-%m-%d')
-                        if start_date > start_to_date:
-                            continue
-                except:
-                    pass
-                
-                # فیلتر وضعیت
-                if status_filter != "همه":
-                    try:
-                        end_date = datetime.strptime(project.get('end_date', ''), '%Y-%m-%d')
-                        today = datetime.now()
-                        
-                        if end_date < today:
-                            status = "پایان یافته"
-                        elif end_date == today:
-                            status = "امروز"
-                        else:
-                            status = "در حال اجرا"
-                        
-                        if status != status_filter:
-                            continue
-                    except:
-                        pass
-                
-                found_projects.append(project)
-                self.add_project_to_results(project)
+            def done(count, extra):
+                if not count:
+                    messagebox.showinfo("اطلاع", "هیچ پروژه‌ای با معیارهای انتخاب شده یافت نشد")
+                else:
+                    messagebox.showinfo("اطلاع", f"{count} پروژه با معیارهای انتخاب شده یافت شد")
             
-            self.update_count_label()
+            self.run_report(lambda job: self.reports.advanced(query, check=job.check), done)
             search_window.destroy()
-            
-            if not found_projects:
-                messagebox.showinfo("اطلاع", "هیچ پروژه‌ای با معیارهای انتخاب شده یافت نشد")
-            else:
-                messagebox.showinfo("اطلاع", f"{len(found_projects)} پروژه با معیارهای انتخاب شده یافت شد")
         
         button_frame = tk.Frame(main_frame, bg='#f0f0f0')
         button_frame.pack(fill=tk.X)
@@ -529,6 +531,23 @@ class ReportsManager:
         )
         search_btn.pack(side=tk.LEFT, padx=(0, 10))
         
+        def explain():
+            messagebox.showinfo("طرح اجرای جستجو", self.reports.explain(build_query()), parent=search_window)
+        
+        explain_btn = tk.Button(
+            button_frame,
+            text="طرح اجرا",
+            command=explain,
+            font=('Tahoma', 10),
+            bg='#2c3e50',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        explain_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
         cancel_btn = tk.Button(
             button_frame,
             text="لغو",
@@ -575,20 +594,12 @@ class ReportsManager:
                 messagebox.showwarning("هشدار", "لطفاً نام پروژه را وارد کنید")
                 return
             
-            self.clear_results()
-            found_projects = []
-            projects = self.load_projects()
-            
-            for project in projects:
-                if search_term in project.get('name', '').lower():
-                    found_projects.append(project)
-                    self.add_project_to_results(project)
+            def done(count, extra):
+                if not count:
+                    messagebox.showinfo("اطلاع", "پروژه‌ای با این نام یافت نشد")
             
-            self.update_count_label()
+            self.run_report(lambda job: self.reports.by_name(search_term), done)
             search_window.destroy()
-            
-            if not found_projects:
-                messagebox.showinfo("اطلاع", "پروژه‌ای با این نام یافت نشد")
         
         button_frame = tk.Frame(main_frame, bg='#f0f0f0')
         button_frame.pack(fill=tk.X)
@@ -624,10 +635,80 @@ class ReportsManager:
         search_window.bind('<Return>', lambda e: search())
         search_window.bind('<Escape>', lambda e: search_window.destroy())
     
+    def report_full_text(self, parent):
+        """جستجوی متن کامل در توضیحات، تیم و کارفرما با نتایج رتبه‌بندی‌شده"""
+        search_window = tk.Toplevel(parent)
+        search_window.title("جستجوی متن کامل")
+        search_window.geometry("400x200")
+        search_window.configure(bg='#f0f0f0')
+        search_window.transient(parent)
+        search_window.grab_set()
+        
+        main_frame = tk.Frame(search_window, bg='#f0f0f0')
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        tk.Label(
+            main_frame,
+            text="کلمات مورد نظر (در توضیحات، تیم یا کارفرما):",
+            font=('Tahoma', 10),
+            bg='#f0f0f0'
+        ).pack(anchor=tk.W, pady=(0, 10))
+        
+        search_entry = tk.Entry(main_frame, font=('Tahoma', 10), width=40)
+        search_entry.pack(fill=tk.X, pady=(0, 20))
+        search_entry.focus()
+        
+        def search():
+            search_term = search_entry.get().strip()
+            if not search_term:
+                messagebox.showwarning("هشدار", "لطفاً عبارت جستجو را وارد کنید")
+                return
+            
+            def done(count, extra):
+                if not count:
+                    messagebox.showinfo("اطلاع", "پروژه‌ای با این کلمات یافت نشد")
+            
+            # نتایج به ترتیب امتیاز (مرتبط‌ترین اول) نمایش داده می‌شن
+            self.run_report(lambda job: self.reports.full_text(search_term), done)
+            search_window.destroy()
+        
+        button_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        button_frame.pack(fill=tk.X)
+        
+        search_btn = tk.Button(
+            button_frame,
+            text="جستجو",
+            command=search,
+            font=('Tahoma', 10, 'bold'),
+            bg='#2980b9',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        search_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        cancel_btn = tk.Button(
+            button_frame,
+            text="لغو",
+            command=search_window.destroy,
+            font=('Tahoma', 10),
+            bg='#95a5a6',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        cancel_btn.pack(side=tk.LEFT)
+        
+        search_window.bind('<Return>', lambda e: search())
+        search_window.bind('<Escape>', lambda e: search_window.destroy())
+    
     def report_by_client(self, parent):
         """گزارش بر اساس نام شرکت/کارفرما"""
-        projects = self.load_projects()
-        clients = list(set(project.get('client', '') for project in projects if project.get('client')))
+        clients = self.reports.clients()
         
         if not clients:
             messagebox.showinfo("اطلاع", "هیچ شرکت/کارفرمایی یافت نشد")
@@ -653,8 +734,7 @@ class ReportsManager:
         client_listbox = tk.Listbox(main_frame, font=('Tahoma', 10), height=10)
         client_listbox.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
         
-        for client in sorted(clients):
-            client_listbox.insert(tk.END, client)
+        client_listbox.insert(tk.END, *clients)
         
         def select_client():
             selection = client_listbox.curselection()
@@ -664,19 +744,12 @@ class ReportsManager:
             
             selected_client = client_listbox.get(selection[0])
             
-            self.clear_results()
-            found_projects = []
+            def done(count, extra):
+                if not count:
+                    messagebox.showinfo("اطلاع", f"پروژه‌ای برای شرکت '{selected_client}' یافت نشد")
             
-            for project in projects:
-                if project.get('client', '') == selected_client:
-                    found_projects.append(project)
-                    self.add_project_to_results(project)
-            
-            self.update_count_label()
+            self.run_report(lambda job: self.reports.by_client(selected_client), done)
             client_window.destroy()
-            
-            if not found_projects:
-                messagebox.showinfo("اطلاع", f"پروژه‌ای برای شرکت '{selected_client}' یافت نشد")
         
         button_frame = tk.Frame(main_frame, bg='#f0f0f0')
         button_frame.pack(fill=tk.X)
@@ -742,29 +815,17 @@ class ReportsManager:
                 return
             
             try:
-                search_date = datetime.strptime(date_str, '%Y-%m-%d')
-            except ValueError:
-                messagebox.showerror("خطا", "فرمت تاریخ صحیح نیست. از فرمت YYYY-MM-DD استفاده کنید")
+                search_date = parse_day(date_str)
+            except ValidationError as e:
+                messagebox.showerror("خطا", str(e))
                 return
             
-            self.clear_results()
-            found_projects = []
-            projects = self.load_projects()
+            def done(count, extra):
+                if not count:
+                    messagebox.showinfo("اطلاع", f"پروژه‌ای با تاریخ شروع {date_str} یافت نشد")
             
-            for project in projects:
-                try:
-                    project_date = datetime.strptime(project.get('start_date', ''), '%Y-%m-%d')
-                    if project_date == search_date:
-                        found_projects.append(project)
-                        self.add_project_to_results(project)
-                except:
-                    continue
-            
-            self.update_count_label()
+            self.run_report(lambda job: self.reports.starting_on(search_date), done)
             date_window.destroy()
-            
-            if not found_projects:
-                messagebox.showinfo("اطلاع", f"پروژه‌ای با تاریخ شروع {date_str} یافت نشد")
         
         button_frame = tk.Frame(main_frame, bg='#f0f0f0')
         button_frame.pack(fill=tk.X)
@@ -830,29 +891,216 @@ class ReportsManager:
                 return
             
             try:
-                search_date = datetime.strptime(date_str, '%Y-%m-%d')
-            except ValueError:
-                messagebox.showerror("خطا", "فرمت تاریخ صحیح نیست. از فرمت YYYY-MM-DD استفاده کنید")
+                search_date = parse_day(date_str)
+            except ValidationError as e:
+                messagebox.showerror("خطا", str(e))
                 return
             
-            self.clear_results()
-            found_projects = []
-            projects = self.load_projects()
+            def done(count, extra):
+                if not count:
+                    messagebox.showinfo("اطلاع", f"پروژه‌ای با تاریخ پایان {date_str} یافت نشد")
             
-            for project in projects:
-                try:
-                    project_date = datetime.strptime(project.get('end_date', ''), '%Y-%m-%d')
-                    if project_date == search_date:
-                        found_projects.append(project)
-                        self.add_project_to_results(project)
-                except:
-                    continue
+            self.run_report(lambda job: self.reports.ending_on(search_date), done)
+            date_window.destroy()
+        
+        button_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        button_frame.pack(fill=tk.X)
+        
+        search_btn = tk.Button(
+            button_frame,
+            text="جستجو",
+            command=search,
+            font=('Tahoma', 10, 'bold'),
+            bg='#e74c3c',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        search_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        cancel_btn = tk.Button(
+            button_frame,
+            text="لغو",
+            command=date_window.destroy,
+            font=('Tahoma', 10),
+            bg='#95a5a6',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        cancel_btn.pack(side=tk.LEFT)
+        
+        date_window.bind('<Return>', lambda e: search())
+        date_window.bind('<Escape>', lambda e: date_window.destroy())
+    
+    def report_active_between(self, parent):
+        """گزارش پروژه‌هایی که در یک بازه زمانی فعال بوده‌اند"""
+        date_window = tk.Toplevel(parent)
+        date_window.title("پروژه‌های فعال در یک بازه")
+        date_window.geometry("400x260")
+        date_window.configure(bg='#f0f0f0')
+        date_window.transient(parent)
+        date_window.grab_set()
+        
+        main_frame = tk.Frame(date_window, bg='#f0f0f0')
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        tk.Label(
+            main_frame,
+            text="از تاریخ (YYYY-MM-DD):",
+            font=('Tahoma', 10),
+            bg='#f0f0f0'
+        ).pack(anchor=tk.W, pady=(0, 10))
+        
+        from_entry = tk.Entry(main_frame, font=('Tahoma', 10), width=20)
+        from_entry.pack(fill=tk.X, pady=(0, 10))
+        from_entry.focus()
+        
+        tk.Label(
+            main_frame,
+            text="تا تاریخ (YYYY-MM-DD):",
+            font=('Tahoma', 10),
+            bg='#f0f0f0'
+        ).pack(anchor=tk.W, pady=(0, 10))
+        
+        to_entry = tk.Entry(main_frame, font=('Tahoma', 10), width=20)
+        to_entry.pack(fill=tk.X, pady=(0, 20))
+        
+        def search():
+            from_str = from_entry.get().strip()
+            to_str = to_entry.get().strip() or from_str
+            if not from_str:
+                messagebox.showwarning("هشدار", "لطفاً تاریخ را وارد کنید")
+                return
             
-            self.update_count_label()
+            try:
+                from_date, to_date = parse_range(from_str, to_str)
+            except ValidationError as e:
+                messagebox.showerror("خطا", str(e))
+                return
+            
+            def done(count, extra):
+                if not count:
+                    messagebox.showinfo("اطلاع", f"پروژه‌ای در بازه {from_str} تا {to_str} فعال نبوده است")
+            
+            self.run_report(lambda job: self.reports.active_between(from_date, to_date), done)
             date_window.destroy()
+        
+        button_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        button_frame.pack(fill=tk.X)
+        
+        search_btn = tk.Button(
+            button_frame,
+            text="جستجو",
+            command=search,
+            font=('Tahoma', 10, 'bold'),
+            bg='#c0392b',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        search_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        cancel_btn = tk.Button(
+            button_frame,
+            text="لغو",
+            command=date_window.destroy,
+            font=('Tahoma', 10),
+            bg='#95a5a6',
+            fg='white',
+            relief=tk.RAISED,
+            bd=2,
+            width=15,
+            cursor='hand2'
+        )
+        cancel_btn.pack(side=tk.LEFT)
+        
+        date_window.bind('<Return>', lambda e: search())
+        date_window.bind('<Escape>', lambda e: date_window.destroy())
+    
+    def financial_report_range(self, parent):
+        """گزارش مالی برای بازه دلخواه، با امکان مقایسه با دوره قبل"""
+        date_window = tk.Toplevel(parent)
+        date_window.title("گزارش مالی بازه دلخواه")
+        date_window.geometry("400x300")
+        date_window.configure(bg='#f0f0f0')
+        date_window.transient(parent)
+        date_window.grab_set()
+        
+        main_frame = tk.Frame(date_window, bg='#f0f0f0')
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        tk.Label(
+            main_frame,
+            text="از تاریخ (YYYY-MM-DD):",
+            font=('Tahoma', 10),
+            bg='#f0f0f0'
+        ).pack(anchor=tk.W, pady=(0, 10))
+        
+        from_entry = tk.Entry(main_frame, font=('Tahoma', 10), width=20)
+        from_entry.pack(fill=tk.X, pady=(0, 10))
+        from_entry.focus()
+        
+        tk.Label(
+            main_frame,
+            text="تا تاریخ (YYYY-MM-DD):",
+            font=('Tahoma', 10),
+            bg='#f0f0f0'
+        ).pack(anchor=tk.W, pady=(0, 10))
+        
+        to_entry = tk.Entry(main_frame, font=('Tahoma', 10), width=20)
+        to_entry.pack(fill=tk.X, pady=(0, 10))
+        
+        compare_var = tk.BooleanVar()
+        tk.Checkbutton(
+            main_frame,
+            text="مقایسه با دوره هم‌طول قبلی",
+            variable=compare_var,
+            font=('Tahoma', 10),
+            bg='#f0f0f0'
+        ).pack(anchor=tk.W, pady=(0, 20))
+        
+        def search():
+            from_str = from_entry.get().strip()
+            to_str = to_entry.get().strip() or from_str
+            if not from_str:
+                messagebox.showwarning("هشدار", "لطفاً تاریخ را وارد کنید")
+                return
+            
+            try:
+                from_date, to_date = parse_range(from_str, to_str)
+            except ValidationError as e:
+                messagebox.showerror("خطا", str(e))
+                return
+            
+            compare = compare_var.get()
+            
+            def done(count, periods):
+                current = periods[-1]
+                text = (f"بازه {from_str} تا {to_str}\n\n"
+                        f"تعداد پروژه‌ها: {current['count']}\n"
+                        f"کل درآمد: {current['income']:,} تومان\n"
+                        f"کل هزینه: {current['cost']:,} تومان\n"
+                        f"سود خالص: {current['profit']:,} تومان")
+                if len(periods) > 1:
+                    previous = periods[0]
+                    text += (f"\n\nدوره قبل ({previous['first'].strftime('%Y-%m-%d')} تا "
+                             f"{previous['last'].strftime('%Y-%m-%d')})\n\n"
+                             f"تعداد پروژه‌ها: {previous['count']}\n"
+                             f"کل درآمد: {previous['income']:,} تومان\n"
+                             f"کل هزینه: {previous['cost']:,} تومان\n"
+                             f"سود خالص: {previous['profit']:,} تومان\n"
+                             f"تغییر سود: {current['profit'] - previous['profit']:+,} تومان")
+                messagebox.showinfo("خلاصه مالی بازه", text)
             
-            if not found_projects:
-                messagebox.showinfo("اطلاع", f"پروژه‌ای با تاریخ پایان {date_str} یافت نشد")
+            self.run_report(lambda job: self.reports.financial_range(from_date, to_date, compare), done)
+            date_window.destroy()
         
         button_frame = tk.Frame(main_frame, bg='#f0f0f0')
         button_frame.pack(fill=tk.X)
@@ -862,7 +1110,7 @@ class ReportsManager:
             text="جستجو",
             command=search,
             font=('Tahoma', 10, 'bold'),
-            bg='#e74c3c',
+            bg='#7f8c8d',
             fg='white',
             relief=tk.RAISED,
             bd=2,
@@ -926,36 +1174,18 @@ class ReportsManager:
         
         def search():
             try:
-                year = int(year_entry.get())
-                month = int(month_combo.get())
-                if not (1 <= month <= 12):
-                    raise ValueError
-            except ValueError:
-                messagebox.showerror("خطا", "لطفاً سال و ماه معتبر وارد کنید")
+                year, month = parse_month(year_entry.get(), month_combo.get())
+            except ValidationError as e:
+                messagebox.showerror("خطا", str(e))
                 return
             
-            self.clear_results()
-            found_projects = []
-            projects = self.load_projects()
+            def done(count, extra):
+                if not count:
+                    messagebox.showinfo("اطلاع", f"پروژه‌ای در ماه {month}/{year} یافت نشد")
             
-            for project in projects:
-                try:
-                    start_date = datetime.strptime(project.get('start_date', ''), '%Y-%m-%d')
-                    end_date = datetime.strptime(project.get('end_date', ''), '%Y-%m-%d')
-                    
-                    # پروژه‌هایی که در این ماه شروع شده‌اند یا در این ماه پایان یافته‌اند
-                    if (start_date.year == year and start_date.month == month) or \
-                       (end_date.year == year and end_date.month == month):
-                        found_projects.append(project)
-                        self.add_project_to_results(project)
-                except:
-                    continue
-            
-            self.update_count_label()
+            # پروژه‌هایی که در این ماه شروع شده‌اند یا در این ماه پایان یافته‌اند
+            self.run_report(lambda job: self.reports.in_month(year, month), done)
             month_window.destroy()
-            
-            if not found_projects:
-                messagebox.showinfo("اطلاع", f"پروژه‌ای در ماه {month}/{year} یافت نشد")
         
         button_frame = tk.Frame(main_frame, bg='#f0f0f0')
         button_frame.pack(fill=tk.X)
@@ -991,113 +1221,200 @@ class ReportsManager:
         month_window.bind('<Return>', lambda e: search())
         month_window.bind('<Escape>', lambda e: month_window.destroy())
     
-    def financial_report_weekly(self, parent):
-        """گزارش مالی هفتگی"""
-        today = datetime.now()
-        week_start = today - timedelta(days=today.weekday())
-        week_end = week_start + timedelta(days=6)
+    def financial_trend_report(self, parent):
+        """روند مالی چندساله به تفکیک سال، ماه یا هفته"""
+        trend_window = tk.Toplevel(parent)
+        trend_window.title("روند مالی")
+        trend_window.geometry("650x450")
+        trend_window.configure(bg='#f0f0f0')
+        trend_window.transient(parent)
+        
+        main_frame = tk.Frame(trend_window, bg='#f0f0f0')
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
-        self.clear_results()
-        found_projects = []
-        total_income = 0
-        total_cost = 0
+        period_var = tk.StringVar()
+        period_var.set('year')
         
-        projects = self.load_projects()
-        for project in projects:
-            try:
-                end_date = datetime.strptime(project.get('end_date', ''), '%Y-%m-%d')
-                if week_start <= end_date <= week_end:
-                    found_projects.append(project)
-                    self.add_project_to_results(project)
-                    total_income += float(project.get('income', 0))
-                    total_cost += float(project.get('cost', 0))
-            except:
-                continue
+        period_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        period_frame.pack(fill=tk.X, pady=(0, 10))
         
-        self.update_count_label()
+        columns = ('period', 'count', 'income', 'cost', 'profit')
+        trend_tree = ttk.Treeview(main_frame, columns=columns, show='headings', height=15)
         
-        if found_projects:
-            total_profit = total_income - total_cost
-            messagebox.showinfo("خلاصه مالی هفتگی", 
-                              f"هفته جاری ({week_start.strftime('%Y-%m-%d')} تا {week_end.strftime('%Y-%m-%d')})\n\n"
-                              f"تعداد پروژه‌ها: {len(found_projects)}\n"
-                              f"کل درآمد: {total_income:,} تومان\n"
-                              f"کل هزینه: {total_cost:,} تومان\n"
-                              f"سود خالص: {total_profit:,} تومان")
-        else:
-            messagebox.showinfo("اطلاع", "پروژه‌ای در هفته جاری یافت نشد")
-    
-    def financial_report_monthly(self, parent):
-        """گزارش مالی ماهانه"""
-        today = datetime.now()
-        month_start = today.replace(day=1)
-        if today.month == 12:
-            month_end = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            month_end = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
+        column_names = {
+            'period': 'دوره',
+            'count': 'تعداد پروژه‌ها',
+            'income': 'کل درآمد',
+            'cost': 'کل هزینه',
+            'profit': 'سود خالص'
+        }
         
-        self.clear_results()
-        found_projects = []
-        total_income = 0
-        total_cost = 0
+        for col, name in column_names.items():
+            trend_tree.heading(col, text=name)
+            trend_tree.column(col, width=110, anchor=tk.CENTER)
+        
+        def show_trend():
+            for item in trend_tree.get_children():
+                trend_tree.delete(item)
+            for key, row in self.reports.financial_trend(period_var.get()):
+                trend_tree.insert('', tk.END, values=(
+                    key,
+                    row['count'],
+                    f"{row['income']:,}",
+                    f"{row['cost']:,}",
+                    f"{row['profit']:,}"
+                ))
+        
+        for text, value in (("سالانه", 'year'), ("ماهانه", 'month'), ("هفتگی", 'week')):
+            tk.Radiobutton(
+                period_frame,
+                text=text,
+                variable=period_var,
+                value=value,
+                command=show_trend,
+                font=('Tahoma', 10),
+                bg='#f0f0f0'
+            ).pack(side=tk.LEFT, padx=(0, 10))
         
-        projects = self.load_projects()
-        for project in projects:
-            try:
-                end_date = datetime.strptime(project.get('end_date', ''), '%Y-%m-%d')
-                if month_start <= end_date <= month_end:
-                    found_projects.append(project)
-                    self.add_project_to_results(project)
-                    total_income += float(project.get('income', 0))
-                    total_cost += float(project.get('cost', 0))
-            except:
-                continue
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=trend_tree.yview)
+        trend_tree.configure(yscrollcommand=scrollbar.set)
         
-        self.update_count_label()
+        trend_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        show_trend()
         
-        if found_projects:
-            total_profit = total_income - total_cost
-            messagebox.showinfo("خلاصه مالی ماهانه", 
-                              f"ماه جاری ({month_start.strftime('%Y-%m')})\n\n"
-                              f"تعداد پروژه‌ها: {len(found_projects)}\n"
-                              f"کل درآمد: {total_income:,} تومان\n"
-                              f"کل هزینه: {total_cost:,} تومان\n"
-                              f"سود خالص: {total_profit:,} تومان")
-        else:
-            messagebox.showinfo("اطلاع", "پروژه‌ای در ماه جاری یافت نشد")
+        trend_window.bind('<Escape>', lambda e: trend_window.destroy())
     
-    def financial_report_yearly(self, parent):
-        """گزارش مالی سالانه"""
-        today = datetime.now()
-        year_start = today.replace(month=1, day=1)
-        year_end = today.replace(month=12, day=31)
+    def financial_by_client_report(self, parent):
+        """جمع مالی هر کارفرما، برای همه پروژه‌ها یا پروژه‌هایی که در یه بازه پایان می‌یابند"""
+        client_window = tk.Toplevel(parent)
+        client_window.title("گزارش مالی به تفکیک کارفرما")
+        client_window.geometry("700x500")
+        client_window.configure(bg='#f0f0f0')
+        client_window.transient(parent)
         
-        self.clear_results()
-        found_projects = []
-        total_income = 0
-        total_cost = 0
+        main_frame = tk.Frame(client_window, bg='#f0f0f0')
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
-        projects = self.load_projects()
-        for project in projects:
-            try:
-                end_date = datetime.strptime(project.get('end_date', ''), '%Y-%m-%d')
-                if year_start <= end_date <= year_end:
-                    found_projects.append(project)
-                    self.add_project_to_results(project)
-                    total_income += float(project.get('income', 0))
-                    total_cost += float(project.get('cost', 0))
-            except:
-                continue
+        range_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        range_frame.pack(fill=tk.X, pady=(0, 10))
         
-        self.update_count_label()
+        tk.Label(range_frame, text="از تاریخ:", font=('Tahoma', 10), bg='#f0f0f0').pack(side=tk.LEFT)
+        from_entry = tk.Entry(range_frame, font=('Tahoma', 10), width=12)
+        from_entry.pack(side=tk.LEFT, padx=(5, 10))
+        tk.Label(range_frame, text="تا تاریخ:", font=('Tahoma', 10), bg='#f0f0f0').pack(side=tk.LEFT)
+        to_entry = tk.Entry(range_frame, font=('Tahoma', 10), width=12)
+        to_entry.pack(side=tk.LEFT, padx=(5, 10))
+        
+        columns = ('client', 'count', 'income', 'cost', 'profit')
+        client_tree = ttk.Treeview(main_frame, columns=columns, show='headings', height=15)
+        
+        column_names = {
+            'client': 'کارفرما',
+            'count': 'تعداد پروژه‌ها',
+            'income': 'کل درآمد',
+            'cost': 'کل هزینه',
+            'profit': 'سود خالص'
+        }
+        
+        for col, name in column_names.items():
+            client_tree.heading(col, text=name)
+            client_tree.column(col, width=120, anchor=tk.CENTER)
+        
+        def show_totals():
+            # تاریخ خالی یعنی همه پروژه‌ها (بدون بازه)
+            from_str = from_entry.get().strip()
+            to_str = to_entry.get().strip()
+            first = last = None
+            if from_str or to_str:
+                try:
+                    first, last = parse_range(from_str or to_str, to_str)
+                except ValidationError as e:
+                    messagebox.showerror("خطا", str(e))
+                    return
+            for item in client_tree.get_children():
+                client_tree.delete(item)
+            groups = self.reports.financial_by_client(first, last)
+            for client, row in sorted(groups.items(), key=lambda item: item[1]['income'], reverse=True):
+                client_tree.insert('', tk.END, values=(
+                    client,
+                    row['count'],
+                    f"{row['income']:,}",
+                    f"{row['cost']:,}",
+                    f"{row['profit']:,}"
+                ))
+        
+        tk.Button(
+            range_frame,
+            text="نمایش",
+            command=show_totals,
+            font=('Tahoma', 10),
+            bg='#2c3e50',
+            fg='white',
+            cursor='hand2'
+        ).pack(side=tk.LEFT)
+        
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=client_tree.yview)
+        client_tree.configure(yscrollcommand=scrollbar.set)
+        
+        client_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        show_totals()
+        
+        client_window.bind('<Escape>', lambda e: client_window.destroy())
+    
+    def financial_report_weekly(self, parent):
+        """گزارش مالی هفتگی"""
+        week_start, week_end = period_bounds('week')
+        
+        def done(count, summary):
+            if count:
+                messagebox.showinfo("خلاصه مالی هفتگی", 
+                                  f"هفته جاری ({week_start.strftime('%Y-%m-%d')} تا {week_end.strftime('%Y-%m-%d')})\n\n"
+                                  f"تعداد پروژه‌ها: {summary['count']}\n"
+                                  f"کل درآمد: {summary['income']:,} تومان\n"
+                                  f"کل هزینه: {summary['cost']:,} تومان\n"
+                                  f"سود خالص: {summary['profit']:,} تومان")
+            else:
+                messagebox.showinfo("اطلاع", "پروژه‌ای در هفته جاری یافت نشد")
+        
+        # جمع‌ها از جدول‌های دوره‌ای که با هر تغییر به‌روز می‌شن خونده می‌شن
+        self.run_report(lambda job: self.reports.financial_period('week'), done)
+    
+    def financial_report_monthly(self, parent):
+        """گزارش مالی ماهانه"""
+        month_start, month_end = period_bounds('month')
+        
+        def done(count, summary):
+            if count:
+                messagebox.showinfo("خلاصه مالی ماهانه", 
+                                  f"ماه جاری ({month_start.strftime('%Y-%m')})\n\n"
+                                  f"تعداد پروژه‌ها: {summary['count']}\n"
+                                  f"کل درآمد: {summary['income']:,} تومان\n"
+                                  f"کل هزینه: {summary['cost']:,} تومان\n"
+                                  f"سود خالص: {summary['profit']:,} تومان")
+            else:
+                messagebox.showinfo("اطلاع", "پروژه‌ای در ماه جاری یافت نشد")
+        
+        # جمع‌ها از جدول‌های دوره‌ای که با هر تغییر به‌روز می‌شن خونده می‌شن
+        self.run_report(lambda job: self.reports.financial_period('month'), done)
+    
+    def financial_report_yearly(self, parent):
+        """گزارش مالی سالانه"""
+        year_start, year_end = period_bounds('year')
+        
+        def done(count, summary):
+            if count:
+                messagebox.showinfo("خلاصه مالی سالانه", 
+                                  f"سال جاری ({year_start.year})\n\n"
+                                  f"تعداد پروژه‌ها: {summary['count']}\n"
+                                  f"کل درآمد: {summary['income']:,} تومان\n"
+                                  f"کل هزینه: {summary['cost']:,} تومان\n"
+                                  f"سود خالص: {summary['profit']:,} تومان")
+            else:
+                messagebox.showinfo("اطلاع", "پروژه‌ای در سال جاری یافت نشد")
         
-        if found_projects:
-            total_profit = total_income - total_cost
-            messagebox.showinfo("خلاصه مالی سالانه", 
-                              f"سال جاری ({today.year})\n\n"
-                              f"تعداد پروژه‌ها: {len(found_projects)}\n"
-                              f"کل درآمد: {total_income:,} تومان\n"
-                              f"کل هزینه: {total_cost:,} تومان\n"
-                              f"سود خالص: {total_profit:,} تومان")
-        else:
-            messagebox.showinfo("اطلاع", "پروژه‌ای در سال جاری یافت نشد") 
\ No newline at end of file
+        # جمع‌ها از جدول‌های دوره‌ای که با هر تغییر به‌روز می‌شن خونده می‌شن
+        self.run_report(lambda job: self.reports.financial_period('year'), done) 
\ No newline at end of file
@@ -0,0 +1,89 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+# حداکثر تعداد نتیجه‌های نگه‌داشته‌شده و حجم تقریبی‌شون (بایت)
+RESULT_CACHE_ENTRIES = int(os.environ.get('PM_RESULT_CACHE_ENTRIES', 64))
+RESULT_CACHE_BYTES = int(os.environ.get('PM_RESULT_CACHE_BYTES', 32 * 1024 * 1024))
+
+
+def estimate_size(value):
+    """حجم تقریبی یه نتیجه؛ پروژه‌ها بین store و کش مشترکن پس فقط ظرف‌ها حساب می‌شن"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(item) for item in value.values())
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            # دیکشنری‌هایی که name دارن خود پروژه‌ها هستن و جزو حجم کش نیستن
+            if isinstance(item, (list, tuple)) or isinstance(item, dict) and 'name' not in item:
+                size += estimate_size(item)
+    return size
+
+
+class ResultCache:
+    """کش LRU نتیجه گزارش‌ها با محدودیت تعداد و حجم، به همراه شمارنده hit/miss
+
+    کلید باید نسخه داده‌ها (و برای گزارش‌های وابسته به روز، تاریخ امروز)
+    رو داشته باشه تا نتیجه‌های قدیمی هیچ‌وقت برنگردن؛ اون‌ها هم کم‌کم از
+    انتهای LRU بیرون می‌رن.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_ENTRIES, max_bytes=RESULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                # نتیجه‌ای که به تنهایی از کل بودجه بزرگ‌تره نگه داشته نمی‌شه
+                return value
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """نتیجه رو از کش برمی‌گردونم یا با compute می‌سازم و نگهش می‌دارم"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """آمار کش برای نمایش: hits، misses، تعداد و حجم نتیجه‌ها"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries),
+                    'bytes': self._bytes, 'evictions': self.evictions}
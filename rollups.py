@@ -0,0 +1,179 @@
+import json
+import os
+import zlib
+from persistence import get_committer
+from project_indexes import ProjectIndex, parse_date, parse_number
+
+# فایل جمع‌های مالی؛ نام نسبی کنار فایل‌های داده ذخیره‌ساز حساب می‌شه (storage.data_path)
+ROLLUPS_FILE = os.environ.get('PM_ROLLUPS_FILE', 'rollups.json')
+ROLLUPS_FORMAT = 1
+PERIODS = ('week', 'month', 'year')
+_CHECKSUM_MOD = 2 ** 64
+
+
+def period_key(period, day):
+    """کلید دوره یه تاریخ: هفته ISO ('2025-W03')، ماه ('2025-01') یا سال ('2025')"""
+    if period == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == 'month':
+        return f"{day.year}-{day.month:02d}"
+    return str(day.year)
+
+
+class FinancialRollups(ProjectIndex):
+    """جمع درآمد، هزینه و تعداد پروژه‌ها به تفکیک هفته، ماه و سال تاریخ پایان
+
+    با هر افزودن/ویرایش/حذف فقط سهم همون پروژه کم یا اضافه می‌شه. جدول‌ها
+    همراه یه checksum از داده‌ها ذخیره می‌شن؛ موقع بارگذاری اگه checksum
+    بخونه، جدول‌ها از فایل خونده می‌شن و دوباره حساب نمی‌شن.
+    """
+
+    def __init__(self, path=ROLLUPS_FILE, committer=None):
+        # path برابر None یعنی جدول‌ها ذخیره نمی‌شن
+        self.path = path
+        self.committer = committer or get_committer()
+        self._loaded = False
+        self.clear()
+
+    def clear(self):
+        # دوره -> کلید -> [تعداد، درآمد، هزینه]
+        self._tables = {period: {} for period in PERIODS}
+        self._checksum = 0
+        self._count = 0
+        self.changed = False
+
+    def _fingerprint(self, project):
+        # مقدارهای عددی parse می‌شن تا '100' در JSON و 100.0 در SQLite یکی حساب بشن
+        text = '\x1f'.join((
+            str(project.get('name', '')),
+            str(project.get('end_date', '')),
+            repr(parse_number(project.get('income', 0))),
+            repr(parse_number(project.get('cost', 0))),
+        ))
+        return zlib.crc32(text.encode('utf-8'))
+
+    def _contribution(self, project):
+        """(روز پایان، درآمد، هزینه) با همون قواعد گزارش‌های مالی؛ بدون تاریخ معتبر None"""
+        day = parse_date(project.get('end_date'))
+        if day is None:
+            return None
+        income = parse_number(project.get('income', 0))
+        cost = parse_number(project.get('cost', 0)) if income is not None else None
+        return day, income or 0, cost or 0
+
+    def _apply(self, project, sign):
+        self._checksum = (self._checksum + sign * self._fingerprint(project)) % _CHECKSUM_MOD
+        self._count += sign
+        self.changed = True
+        contribution = self._contribution(project)
+        if contribution is None:
+            return
+        day, income, cost = contribution
+        for period in PERIODS:
+            table = self._tables[period]
+            key = period_key(period, day)
+            row = table.setdefault(key, [0, 0, 0])
+            row[0] += sign
+            row[1] += sign * income
+            row[2] += sign * cost
+            if row[0] <= 0:
+                # ردیف خالی رو حذف می‌کنم تا خطای جمع و تفریق اعشاری نمونه
+                del table[key]
+
+    def add(self, project):
+        self._apply(project, 1)
+
+    def add_many(self, projects):
+        """ورود گروهی: سهم پروژه‌ها اول برای هر روز جمع و بعد یک‌جا به جدول‌ها اضافه می‌شه"""
+        checksum = 0
+        days = {}
+        for project in projects:
+            checksum += self._fingerprint(project)
+            contribution = self._contribution(project)
+            if contribution is None:
+                continue
+            day, income, cost = contribution
+            row = days.get(day)
+            if row is None:
+                days[day] = [1, income, cost]
+            else:
+                row[0] += 1
+                row[1] += income
+                row[2] += cost
+        self._checksum = (self._checksum + checksum) % _CHECKSUM_MOD
+        self._count += len(projects)
+        self.changed = True
+        for day, (count, income, cost) in days.items():
+            for period in PERIODS:
+                row = self._tables[period].setdefault(period_key(period, day), [0, 0, 0])
+                row[0] += count
+                row[1] += income
+                row[2] += cost
+
+    def remove(self, project):
+        self._apply(project, -1)
+
+    def _data_checksum(self, projects):
+        checksum = 0
+        for project in projects:
+            checksum += self._fingerprint(project)
+        return checksum % _CHECKSUM_MOD
+
+    def rebuild(self, projects):
+        """اگه داده‌ها با جدول‌های فعلی (یا ذخیره‌شده) یکی باشن، دوباره حساب نمی‌کنم"""
+        checksum = self._data_checksum(projects)
+        if not self._loaded:
+            self._loaded = True
+            if self._load(checksum, len(projects)):
+                return
+        if checksum == self._checksum and len(projects) == self._count:
+            return
+        self.clear()
+        for project in projects:
+            self.add(project)
+
+    def _load(self, checksum, count):
+        if self.path is None:
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (not isinstance(data, dict) or data.get('format') != ROLLUPS_FORMAT
+                or data.get('checksum') != checksum or data.get('count') != count):
+            return False
+        self._tables = {period: data['tables'].get(period, {}) for period in PERIODS}
+        self._checksum = checksum
+        self._count = count
+        self.changed = False
+        return True
+
+    def save_if_changed(self):
+        """اگه جدول‌ها تغییر کردن، با group commit ذخیره‌شون می‌کنم"""
+        if not self.changed:
+            return False
+        if self.path is None:
+            # جدول‌ها فقط در حافظه نگه داشته می‌شن
+            self.changed = False
+            return False
+        data = {
+            'format': ROLLUPS_FORMAT,
+            'checksum': self._checksum,
+            'count': self._count,
+            'tables': self._tables,
+        }
+        self.committer.submit(self.path, json.dumps(data, ensure_ascii=False))
+        self.changed = False
+        return True
+
+    def row(self, period, day):
+        """جمع یه دوره (دوره‌ای که day درش هست): {'count', 'income', 'cost', 'profit'}"""
+        count, income, cost = self._tables[period].get(period_key(period, day), (0, 0, 0))
+        return {'count': count, 'income': income, 'cost': cost, 'profit': income - cost}
+
+    def trend(self, period):
+        """همه دوره‌ها به ترتیب زمان: لیست (کلید، ردیف)"""
+        return [(key, {'count': count, 'income': income, 'cost': cost, 'profit': income - cost})
+                for key, (count, income, cost) in sorted(self._tables[period].items())]
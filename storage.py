@@ -0,0 +1,550 @@
+import atexit
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from persistence import get_committer, write_temp, commit_temp, file_signature
+
+# نوع ذخیره‌سازی: "json" (پیش‌فرض)، "journal" یا "sqlite"
+STORAGE_BACKEND = os.environ.get('PM_STORAGE', 'json')
+DATABASE_FILE = os.environ.get('PM_DATABASE', 'project_manager.db')
+# وقتی ژورنال از این اندازه (بایت) بزرگ‌تر بشه، با snapshot ادغام می‌شه
+JOURNAL_COMPACT_BYTES = int(os.environ.get('PM_JOURNAL_COMPACT_BYTES', 4 * 1024 * 1024))
+
+PROJECT_FIELDS = ('name', 'client', 'start_date', 'end_date', 'income', 'cost',
+                  'team', 'description', 'created_at', 'updated_at')
+COMPANY_FIELDS = ('name', 'phone', 'address', 'created_at')
+
+
+class JsonStorage:
+    """ذخیره‌سازی در فایل‌های JSON؛ هر ذخیره کل فایل رو بازنویسی می‌کنه"""
+
+    def __init__(self, projects_file="projects.json", companies_file="companies.json",
+                 users_file="users.json", lock_file="account_locks.json", committer=None):
+        self.projects_file = projects_file
+        self.companies_file = companies_file
+        self.users_file = users_file
+        self.lock_file = lock_file
+        self.committer = committer or get_committer()
+
+    def _read(self, path, default):
+        """یه فایل JSON رو می‌خونم"""
+        # اگه نوشتنی در صف هست، اول اون رو روی دیسک می‌برم
+        self.committer.flush(raise_errors=False)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except ValueError:
+                # فایل خراب رو کنار می‌ذارم تا ذخیره بعدی از بین نبرتش
+                os.replace(path, path + ".corrupt")
+                return default
+            except OSError:
+                return default
+        return default
+
+    def _write(self, path, data):
+        """یه فایل JSON رو به صورت اتمیک و با group commit بازنویسی می‌کنم"""
+        self.committer.submit(path, json.dumps(data, ensure_ascii=False))
+
+    def _stat(self, path):
+        """زمان تغییر و اندازه یه فایل رو برمی‌گردونم"""
+        return file_signature(path)
+
+    def projects_signature(self):
+        """امضای فایل پروژه‌ها برای تشخیص تغییرات بیرونی"""
+        return self.committer.signature(self.projects_file)
+
+    def data_path(self, name):
+        """مسیر فایل‌های کناری (ایندکس‌ها و ...) در همون پوشه فایل پروژه‌ها؛ مسیر مطلق دست نمی‌خوره"""
+        return os.path.join(os.path.dirname(os.path.abspath(self.projects_file)), name)
+
+    def flush(self):
+        """همه ذخیره‌های در صف رو همین الان روی دیسک می‌برم"""
+        self.committer.flush()
+
+    def close(self):
+        self.flush()
+
+    # پروژه‌ها
+    def load_projects(self):
+        return self._read(self.projects_file, [])
+
+    def save_projects(self, projects):
+        self._write(self.projects_file, projects)
+
+    def upsert_project(self, project, projects, old_name=None):
+        self.save_projects(projects)
+
+    def delete_project(self, name, projects):
+        self.save_projects(projects)
+
+    def apply_project_changes(self, projects, upserts, deletes):
+        """تغییرات جمع‌شده رو یک‌جا ذخیره می‌کنم
+
+        upserts لیستی از (پروژه، نام قبلی) و deletes لیستی از نام‌هاست.
+        """
+        self.save_projects(projects)
+
+    # شرکت‌ها
+    def load_companies(self):
+        return self._read(self.companies_file, [])
+
+    def save_companies(self, companies):
+        self._write(self.companies_file, companies)
+
+    def upsert_company(self, company, companies):
+        self.save_companies(companies)
+
+    # کاربران
+    def load_users(self):
+        return self._read(self.users_file, {})
+
+    def save_users(self, users):
+        self._write(self.users_file, users)
+
+    def upsert_user(self, username, users):
+        self.save_users(users)
+
+    # قفل حساب‌ها
+    def load_account_locks(self):
+        return self._read(self.lock_file, {})
+
+    def save_account_locks(self, account_locks):
+        self._write(self.lock_file, account_locks)
+
+    def upsert_account_lock(self, username, account_locks):
+        self.save_account_locks(account_locks)
+
+    def delete_account_lock(self, username, account_locks):
+        self.save_account_locks(account_locks)
+
+    def apply_account_lock_changes(self, account_locks, upserts, deletes):
+        """تغییرات جمع‌شده قفل حساب‌ها رو یک‌جا ذخیره می‌کنم"""
+        self.save_account_locks(account_locks)
+
+
+class JournalStorage(JsonStorage):
+    """پروژه‌ها = snapshot در projects.json + ژورنال append-only از تغییرات
+
+    هر افزودن/ویرایش/حذف فقط یه خط JSON به ژورنال اضافه می‌کنه. وقتی ژورنال
+    بزرگ شد، در یه thread پس‌زمینه با snapshot ادغام می‌شه.
+    """
+
+    def __init__(self, *args, compact_bytes=JOURNAL_COMPACT_BYTES, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.journal_file = os.path.splitext(self.projects_file)[0] + ".journal"
+        self.rotated_journal_file = self.journal_file + ".1"
+        self.compact_bytes = compact_bytes
+        self._journal_size = 0
+        self._compaction_thread = None
+        # امضای snapshot که خود ادغام نوشته و امضایی که باید به جاش گزارش بشه
+        self._compacted_stat = None
+        self._logical_snapshot_stat = None
+
+    def projects_signature(self):
+        snapshot = self._stat(self.projects_file)
+        if snapshot is not None and snapshot == self._compacted_stat:
+            # ادغام محتوای منطقی رو عوض نمی‌کنه؛ نباید باعث بارگذاری مجدد بشه
+            snapshot = self._logical_snapshot_stat
+        return (snapshot, self._stat(self.journal_file))
+
+    def _replay(self, path, projects, positions):
+        """خط‌های یه فایل ژورنال رو روی لیست پروژه‌ها اعمال می‌کنم"""
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # خط نیمه‌کاره (مثلاً بعد از قطع برق) رو نادیده می‌گیرم
+                    continue
+                if entry.get('op') == 'upsert':
+                    project = entry['project']
+                    index = positions.pop(entry.get('old_name'), None)
+                    existing = positions.get(project['name'])
+                    if index is None:
+                        index = existing
+                    elif existing is not None and existing != index:
+                        # نام جدید هنوز یه ردیف قدیمی داره (ژورنال‌های قبل از مرتب شدن
+                        # نوشتن‌ها)؛ آخرین خط برنده‌ست و اون ردیف کهنه حذف می‌شه تا زنده نشه
+                        projects[existing] = None
+                    if index is None:
+                        index = len(projects)
+                        projects.append(project)
+                    else:
+                        projects[index] = project
+                    positions[project['name']] = index
+                elif entry.get('op') == 'delete':
+                    index = positions.pop(entry.get('name'), None)
+                    if index is not None:
+                        projects[index] = None
+
+    def load_projects(self):
+        self.wait_for_compaction()
+        projects = self._read(self.projects_file, [])
+        positions = {p['name']: i for i, p in enumerate(projects)}
+        leftover = os.path.exists(self.rotated_journal_file)
+        self._replay(self.rotated_journal_file, projects, positions)
+        self._replay(self.journal_file, projects, positions)
+        self._drop_partial_tail()
+        projects = [p for p in projects if p is not None]
+        if leftover:
+            # ادغام قبلی نیمه‌کاره مونده؛ همین‌جا کاملش می‌کنم
+            self.save_projects(projects)
+        self._journal_size = self._stat(self.journal_file)[1] if os.path.exists(self.journal_file) else 0
+        return projects
+
+    def save_projects(self, projects):
+        self.wait_for_compaction()
+        commit_temp(self._write_snapshot(projects), self.projects_file)
+        for path in (self.rotated_journal_file, self.journal_file):
+            if os.path.exists(path):
+                os.remove(path)
+        self._journal_size = 0
+        self._compacted_stat = None
+
+    def _write_snapshot(self, projects):
+        """snapshot رو در فایل موقت می‌نویسم و مسیرش رو برمی‌گردونم"""
+        return write_temp(self.projects_file, json.dumps(projects, ensure_ascii=False))
+
+    def _drop_partial_tail(self):
+        """اگه آخرین خط ژورنال نیمه‌کاره نوشته شده، حذفش می‌کنم"""
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _append(self, entries, projects):
+        """خط‌های ژورنال رو اضافه می‌کنم و در صورت نیاز ادغام رو شروع می‌کنم"""
+        data = "".join(
+            json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n"
+            for entry in entries
+        ).encode('utf-8')
+        with open(self.journal_file, 'ab') as f:
+            f.write(data)
+        self.committer.sync_append(self.journal_file)
+        self._journal_size += len(data)
+        if self._journal_size >= self.compact_bytes:
+            self.start_compaction(projects)
+
+    def _upsert_entry(self, project, old_name=None):
+        entry = {'op': 'upsert', 'project': project}
+        if old_name is not None and old_name != project['name']:
+            entry['old_name'] = old_name
+        return entry
+
+    def upsert_project(self, project, projects, old_name=None):
+        self._append([self._upsert_entry(project, old_name)], projects)
+
+    def delete_project(self, name, projects):
+        self._append([{'op': 'delete', 'name': name}], projects)
+
+    def apply_project_changes(self, projects, upserts, deletes):
+        entries = [{'op': 'delete', 'name': name} for name in deletes]
+        entries.extend(self._upsert_entry(project, old_name) for project, old_name in upserts)
+        if entries:
+            self._append(entries, projects)
+
+    def start_compaction(self, projects):
+        """ژورنال فعلی رو کنار می‌ذارم و snapshot جدید رو در پس‌زمینه می‌نویسم"""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._logical_snapshot_stat = self.projects_signature()[0]
+        os.replace(self.journal_file, self.rotated_journal_file)
+        self._journal_size = 0
+        snapshot = [dict(p) for p in projects]
+        self._compaction_thread = threading.Thread(
+            target=self._compact, args=(snapshot,), daemon=True
+        )
+        self._compaction_thread.start()
+
+    def _compact(self, snapshot):
+        tmp_path = self._write_snapshot(snapshot)
+        # rename زمان تغییر و اندازه رو حفظ می‌کنه، پس امضا رو قبلش ثبت می‌کنم
+        self._compacted_stat = self._stat(tmp_path)
+        commit_temp(tmp_path, self.projects_file)
+        os.remove(self.rotated_journal_file)
+
+    def wait_for_compaction(self):
+        """اگه ادغامی در حال اجراست، منتظر تموم شدنش می‌مونم"""
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+    def close(self):
+        self.wait_for_compaction()
+
+
+class SqliteStorage:
+    """ذخیره‌سازی در SQLite؛ هر تغییر فقط همون یه سطر رو می‌نویسه"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            client TEXT,
+            start_date TEXT,
+            end_date TEXT,
+            income REAL,
+            cost REAL,
+            team TEXT,
+            description TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_projects_client ON projects (client);
+        CREATE INDEX IF NOT EXISTS idx_projects_start_date ON projects (start_date);
+        CREATE INDEX IF NOT EXISTS idx_projects_end_date ON projects (end_date);
+
+        CREATE TABLE IF NOT EXISTS companies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            phone TEXT,
+            address TEXT,
+            created_at TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password TEXT NOT NULL,
+            created_at TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS account_locks (
+            username TEXT PRIMARY KEY,
+            failed_attempts INTEGER NOT NULL DEFAULT 0,
+            lock_time TEXT
+        );
+    """
+
+    def __init__(self, db_file=DATABASE_FILE):
+        self.db_file = db_file
+        # اتصال از thread ذخیره‌سازی تأخیری هم استفاده می‌شه؛ با قفل سریالش می‌کنم
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """یه تراکنش با قفل اتصال"""
+        with self._lock, self.conn:
+            yield self.conn
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def projects_signature(self):
+        """شماره نسخه پایگاه داده؛ فقط با تغییرات اتصال‌های دیگه عوض می‌شه"""
+        return self._query("PRAGMA data_version")[0][0]
+
+    def data_path(self, name):
+        """مسیر فایل‌های کناری (ایندکس‌ها و ...) در همون پوشه پایگاه داده
+
+        پایگاه داده :memory: پوشه‌ای نداره؛ None یعنی فایل‌های کناری ذخیره نشن.
+        """
+        if self.db_file == ':memory:':
+            return None
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_file)), name)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # پروژه‌ها
+    def load_projects(self):
+        rows = self._query(f"SELECT {', '.join(PROJECT_FIELDS)} FROM projects ORDER BY id")
+        return [dict(row) for row in rows]
+
+    def save_projects(self, projects):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM projects")
+            conn.executemany(
+                f"INSERT INTO projects ({', '.join(PROJECT_FIELDS)}) "
+                f"VALUES ({', '.join('?' for _ in PROJECT_FIELDS)})",
+                [tuple(p.get(field) for field in PROJECT_FIELDS) for p in projects]
+            )
+
+    def _upsert_project_row(self, conn, project, old_name=None):
+        values = tuple(project.get(field) for field in PROJECT_FIELDS)
+        if old_name is not None and old_name != project['name']:
+            # تغییر نام: همون سطر قبلی رو به‌روز می‌کنم تا ترتیب حفظ بشه
+            assignments = ', '.join(f"{field} = ?" for field in PROJECT_FIELDS)
+            cursor = conn.execute(
+                f"UPDATE projects SET {assignments} WHERE name = ?",
+                values + (old_name,)
+            )
+            if cursor.rowcount:
+                return
+        updates = ', '.join(f"{field} = excluded.{field}" for field in PROJECT_FIELDS[1:])
+        conn.execute(
+            f"INSERT INTO projects ({', '.join(PROJECT_FIELDS)}) "
+            f"VALUES ({', '.join('?' for _ in PROJECT_FIELDS)}) "
+            f"ON CONFLICT(name) DO UPDATE SET {updates}",
+            values
+        )
+
+    def upsert_project(self, project, projects=None, old_name=None):
+        with self._transaction() as conn:
+            self._upsert_project_row(conn, project, old_name)
+
+    def delete_project(self, name, projects=None):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM projects WHERE name = ?", (name,))
+
+    def apply_project_changes(self, projects, upserts, deletes):
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM projects WHERE name = ?", [(name,) for name in deletes])
+            for project, old_name in upserts:
+                self._upsert_project_row(conn, project, old_name)
+
+    # شرکت‌ها
+    def load_companies(self):
+        rows = self._query(f"SELECT {', '.join(COMPANY_FIELDS)} FROM companies ORDER BY id")
+        return [dict(row) for row in rows]
+
+    def save_companies(self, companies):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM companies")
+            conn.executemany(
+                f"INSERT INTO companies ({', '.join(COMPANY_FIELDS)}) "
+                f"VALUES ({', '.join('?' for _ in COMPANY_FIELDS)})",
+                [tuple(c.get(field) for field in COMPANY_FIELDS) for c in companies]
+            )
+
+    def upsert_company(self, company, companies=None):
+        updates = ', '.join(f"{field} = excluded.{field}" for field in COMPANY_FIELDS[1:])
+        with self._transaction() as conn:
+            conn.execute(
+                f"INSERT INTO companies ({', '.join(COMPANY_FIELDS)}) "
+                f"VALUES ({', '.join('?' for _ in COMPANY_FIELDS)}) "
+                f"ON CONFLICT(name) DO UPDATE SET {updates}",
+                tuple(company.get(field) for field in COMPANY_FIELDS)
+            )
+
+    # کاربران
+    def load_users(self):
+        rows = self._query("SELECT username, password, created_at FROM users")
+        return {row['username']: {'password': row['password'], 'created_at': row['created_at']}
+                for row in rows}
+
+    def save_users(self, users):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM users")
+            conn.executemany(
+                "INSERT INTO users (username, password, created_at) VALUES (?, ?, ?)",
+                [(username, info.get('password'), info.get('created_at'))
+                 for username, info in users.items()]
+            )
+
+    def upsert_user(self, username, users):
+        info = users[username]
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO users (username, password, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET password = excluded.password, "
+                "created_at = excluded.created_at",
+                (username, info.get('password'), info.get('created_at'))
+            )
+
+    # قفل حساب‌ها
+    def load_account_locks(self):
+        rows = self._query("SELECT username, failed_attempts, lock_time FROM account_locks")
+        return {row['username']: {'failed_attempts': row['failed_attempts'], 'lock_time': row['lock_time']}
+                for row in rows}
+
+    def save_account_locks(self, account_locks):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM account_locks")
+            conn.executemany(
+                "INSERT INTO account_locks (username, failed_attempts, lock_time) VALUES (?, ?, ?)",
+                [(username, info.get('failed_attempts', 0), info.get('lock_time'))
+                 for username, info in account_locks.items()]
+            )
+
+    def upsert_account_lock(self, username, account_locks):
+        info = account_locks[username]
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO account_locks (username, failed_attempts, lock_time) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET failed_attempts = excluded.failed_attempts, "
+                "lock_time = excluded.lock_time",
+                (username, info.get('failed_attempts', 0), info.get('lock_time'))
+            )
+
+    def delete_account_lock(self, username, account_locks=None):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM account_locks WHERE username = ?", (username,))
+
+    def apply_account_lock_changes(self, account_locks, upserts, deletes):
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM account_locks WHERE username = ?",
+                             [(username,) for username in deletes])
+            conn.executemany(
+                "INSERT INTO account_locks (username, failed_attempts, lock_time) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET failed_attempts = excluded.failed_attempts, "
+                "lock_time = excluded.lock_time",
+                [(username, account_locks[username].get('failed_attempts', 0),
+                  account_locks[username].get('lock_time')) for username in upserts]
+            )
+
+
+_storage = None
+
+
+def get_storage():
+    """ذخیره‌ساز مشترک برنامه رو بر اساس تنظیمات برمی‌گردونم"""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == 'sqlite':
+            _storage = SqliteStorage(DATABASE_FILE)
+        elif STORAGE_BACKEND == 'journal':
+            _storage = JournalStorage()
+        else:
+            _storage = JsonStorage()
+        atexit.register(_storage.close)
+    return _storage
+
+
+def migrate_json_to_sqlite(db_file=DATABASE_FILE, source=None):
+    """داده‌های فایل‌های JSON رو یک‌جا به پایگاه داده SQLite منتقل می‌کنم"""
+    source = source or JsonStorage()
+    target = SqliteStorage(db_file)
+    projects = source.load_projects()
+    companies = source.load_companies()
+    users = source.load_users()
+    account_locks = source.load_account_locks()
+    target.save_projects(projects)
+    target.save_companies(companies)
+    target.save_users(users)
+    target.save_account_locks(account_locks)
+    target.close()
+    return {
+        'projects': len(projects),
+        'companies': len(companies),
+        'users': len(users),
+        'account_locks': len(account_locks)
+    }
+
+
+if __name__ == "__main__":
+    # اجرا: python storage.py migrate [مسیر پایگاه داده]
+    if len(sys.argv) >= 2 and sys.argv[1] == 'migrate':
+        db_file = sys.argv[2] if len(sys.argv) >= 3 else DATABASE_FILE
+        counts = migrate_json_to_sqlite(db_file)
+        print(f"انتقال به {db_file} انجام شد: {counts}")
+    else:
+        print("استفاده: python storage.py migrate [مسیر پایگاه داده]")
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from persistence import GroupCommitter  # noqa: E402
+from storage import JournalStorage, JsonStorage, SqliteStorage  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """هر تست در پوشه خودش اجرا می‌شه تا فایل‌های پیش‌فرض (ایندکس‌ها و ...) قاطی نشن"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def committer():
+    committer = GroupCommitter(window=0)
+    yield committer
+    committer.close()
+
+
+def make_storage(kind, directory, committer):
+    """یه ذخیره‌ساز تازه روی همون فایل‌ها (برای شبیه‌سازی اجرای دوباره برنامه)"""
+    if kind == 'sqlite':
+        return SqliteStorage(str(directory / 'projects.db'))
+    paths = dict(projects_file=str(directory / 'projects.json'),
+                 companies_file=str(directory / 'companies.json'),
+                 users_file=str(directory / 'users.json'),
+                 lock_file=str(directory / 'account_locks.json'),
+                 committer=committer)
+    if kind == 'journal':
+        return JournalStorage(**paths)
+    return JsonStorage(**paths)
+
+
+@pytest.fixture(params=['json', 'journal', 'sqlite'])
+def backend(request, tmp_path, committer):
+    """سازنده ذخیره‌ساز برای هر سه نوع؛ هر بار صدا زدن یه نمونه تازه روی همون داده‌ها می‌ده"""
+    opened = []
+
+    def factory():
+        storage = make_storage(request.param, tmp_path, committer)
+        opened.append(storage)
+        return storage
+
+    factory.kind = request.param
+    yield factory
+    for storage in opened:
+        storage.close()
+
+
+def project(name, **fields):
+    data = {'name': name, 'client': 'c', 'start_date': '2024-01-01', 'end_date': '2024-02-01',
+            'income': 100.0, 'cost': 40.0, 'team': '', 'description': '',
+            'created_at': '2024-01-01T00:00:00', 'updated_at': '2024-01-01T00:00:00'}
+    data.update(fields)
+    return data
@@ -0,0 +1,131 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import columnar
+from conftest import make_storage, project
+from core.reports import ReportService
+from project_store import ProjectStore
+
+BASE = date(2024, 1, 1)
+CLIENTS = ['آلفا', 'بتا', 'گاما', '']
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def store(request, tmp_path, committer, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(columnar, 'np', None)
+    store = ProjectStore(make_storage('json', tmp_path, committer))
+    assert store.columns.vectorized == (request.param == 'numpy')
+    return store
+
+
+def random_project(rng, name):
+    end = rng.choice(['?', ''] + [(BASE + timedelta(days=rng.randrange(120))).isoformat()] * 20)
+    income = rng.choice(['x', ''] + [float(rng.randrange(1000))] * 10)
+    cost = rng.choice(['?'] + [float(rng.randrange(500))] * 10)
+    return project(name, client=rng.choice(CLIENTS), end_date=end, income=income, cost=cost)
+
+
+def number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def plain_groups(projects, first=None, last=None):
+    groups = {}
+    for item in projects:
+        if first is not None or last is not None:
+            try:
+                end = date.fromisoformat(item['end_date'])
+            except ValueError:
+                continue
+            if first is not None and end < first or last is not None and end > last:
+                continue
+        income = number(item['income'])
+        cost = number(item['cost']) if income is not None else None
+        group = groups.setdefault(item['client'], {'count': 0, 'income': 0.0, 'cost': 0.0})
+        group['count'] += 1
+        group['income'] += income or 0.0
+        group['cost'] += cost or 0.0
+    for group in groups.values():
+        group['profit'] = group['income'] - group['cost']
+    return groups
+
+
+def assert_groups(found, expected):
+    assert sorted(found) == sorted(expected)
+    for client, group in expected.items():
+        assert found[client]['count'] == group['count']
+        assert found[client] == pytest.approx(group)
+
+
+def check(store, rng):
+    assert_groups(store.financial_by_client(), plain_groups(store.projects))
+    for _ in range(3):
+        first = BASE + timedelta(days=rng.randrange(-5, 120))
+        last = first + timedelta(days=rng.randrange(30))
+        expected = plain_groups(store.projects, first, last)
+        assert_groups(store.financial_by_client(first, last), expected)
+        assert_groups(store.financial_by_client(first=first), plain_groups(store.projects, first=first))
+        assert_groups(store.financial_by_client(last=last), plain_groups(store.projects, last=last))
+        summary = store.financial_summary(first, last)
+        assert summary['count'] == sum(group['count'] for group in expected.values())
+        assert summary['income'] == pytest.approx(sum(group['income'] for group in expected.values()))
+        assert summary['cost'] == pytest.approx(sum(group['cost'] for group in expected.values()))
+
+
+def test_group_by_client_matches_plain_sums(store):
+    rng = random.Random(14)
+    store.add_projects([random_project(rng, f'p{i}') for i in range(400)])
+    check(store, rng)
+    counter = 400
+    for step in range(600):
+        names = [item['name'] for item in store.projects]
+        roll = rng.random()
+        if roll < 0.3:
+            store.add_project(random_project(rng, f'p{counter}'))
+            counter += 1
+        elif roll < 0.6:
+            changed = random_project(rng, rng.choice(names))
+            store.update_project(changed['name'], {key: changed[key] for key in ('client', 'end_date', 'income', 'cost')})
+        elif roll < 0.7:
+            store.update_project(rng.choice(names), {'name': f'p{counter}', 'client': 'نو'})
+            counter += 1
+        else:
+            store.delete_project(rng.choice(names))
+        if step % 100 == 0:
+            check(store, rng)
+    check(store, rng)
+    # ردیف‌های پروژه‌های حذف‌شده دوباره استفاده می‌شن و ستون‌ها بی‌دلیل بزرگ نمی‌شن
+    assert store.columns.size <= 400 + 600
+
+
+def test_edits_do_not_rebuild_columns(store, monkeypatch):
+    store.add_projects([project(f'p{i}', client=CLIENTS[i % 3], end_date='2024-01-10') for i in range(50)])
+    store.financial_by_client(BASE, BASE + timedelta(days=30))
+
+    def fail(projects):
+        raise AssertionError('ستون‌ها نباید از نو ساخته بشن')
+
+    monkeypatch.setattr(store.columns, 'rebuild', fail)
+    store.update_project('p1', {'income': 1.0})
+    store.delete_project('p2')
+    store.add_project(project('new', client='آلفا', end_date='2024-01-11'))
+    groups = store.financial_by_client(BASE, BASE + timedelta(days=30))
+    assert_groups(groups, plain_groups(store.projects, BASE, BASE + timedelta(days=30)))
+    assert store.financial_summary(BASE, BASE + timedelta(days=30))['count'] == 50
+
+
+def test_report_service_caches_client_totals(store):
+    store.add_projects([project('a', client='x'), project('b', client='y', income=10.0)])
+    reports = ReportService(store)
+    first = reports.financial_by_client()
+    assert reports.financial_by_client() is first
+    store.update_project('b', {'client': 'x'})
+    assert reports.financial_by_client() == {'x': {'count': 2, 'income': 110.0, 'cost': 80.0, 'profit': 30.0}}
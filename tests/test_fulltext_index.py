@@ -0,0 +1,89 @@
+import os
+
+from conftest import project
+from fulltext_index import FullTextIndex
+
+
+def build(path, committer, projects, **kwargs):
+    index = FullTextIndex(str(path), committer=committer, **kwargs)
+    index.rebuild(projects)
+    return index
+
+
+def test_remove_and_add_same_text_is_not_a_change(tmp_path, committer):
+    projects = [project('a', description='سیستم انبارداری'), project('b', description='وب سایت')]
+    index = build(tmp_path / 'search.json', committer, projects)
+    assert index.save_if_changed()
+    index.remove(projects[0])
+    index.add(projects[0])
+    assert not index.changed
+    assert not index.save_if_changed()
+
+
+def test_only_changed_documents_are_appended(tmp_path, committer):
+    path = tmp_path / 'search.json'
+    projects = [project(f'p{i}', description=f'متن شماره {i}') for i in range(50)]
+    index = build(path, committer, projects)
+    # ساخت اولیه کل ایندکس رو یک‌جا می‌نویسه
+    index.save_if_changed()
+    index.wait_for_compaction()
+    size = os.path.getsize(path)
+
+    index.remove(projects[3])
+    projects[3] = project('p3', description='انبارداری')
+    index.add(projects[3])
+    assert index.save_if_changed()
+    # فقط یه سند به لاگ اضافه شده، نه کل ایندکس
+    assert os.path.getsize(str(path) + '.log') < size / 10
+    assert os.path.getsize(path) == size
+
+    reloaded = build(path, committer, projects)
+    assert not reloaded.changed
+    assert [name for name, _ in reloaded.search('انبارداری')] == ['p3']
+
+
+def test_compaction_rewrites_snapshot_and_clears_log(tmp_path, committer):
+    path = tmp_path / 'search.json'
+    projects = [project(f'p{i}', description=f'کلمه{i}') for i in range(20)]
+    index = build(path, committer, projects, compact_bytes=200)
+    index.save_if_changed()
+    index.wait_for_compaction()
+    assert path.exists()
+    assert not os.path.exists(str(path) + '.log')
+    assert not os.path.exists(str(path) + '.log.old')
+
+    index.remove(projects[0])
+    assert index.save_if_changed()
+    index.wait_for_compaction()
+    reloaded = build(path, committer, projects[1:])
+    assert not reloaded.changed
+    assert reloaded.search('کلمه0') == []
+    assert [name for name, _ in reloaded.search('کلمه5')] == ['p5']
+
+
+def test_interrupted_compaction_replays_rotated_log(tmp_path, committer):
+    path = tmp_path / 'search.json'
+    projects = [project('a', description='انبار'), project('b', description='وب')]
+    index = build(path, committer, projects)
+    index.save_if_changed()
+    index.wait_for_compaction()
+    index.remove(projects[1])
+    projects[1] = project('b', description='انبار وب')
+    index.add(projects[1])
+    index.save_if_changed()
+    # ادغامی که قبل از نوشتن فایل اصلی قطع شده: فقط لاگ کنار گذاشته شده
+    os.replace(str(path) + '.log', str(path) + '.log.old')
+    reloaded = build(path, committer, projects)
+    assert not reloaded.changed
+    assert sorted(name for name, _ in reloaded.search('انبار')) == ['a', 'b']
+
+
+def test_add_many_matches_add(tmp_path, committer):
+    projects = [project(f'p{i}', description=f'انبار شماره {i % 3} انبار', team='علي') for i in range(10)]
+    one_by_one = FullTextIndex(str(tmp_path / 'a.json'), committer=committer)
+    for item in projects:
+        one_by_one.add(item)
+    bulk = FullTextIndex(str(tmp_path / 'b.json'), committer=committer)
+    bulk.add_many(projects)
+    for query in ('انبار', 'علی', '۱', 'شماره 2'):
+        assert bulk.search(query) == one_by_one.search(query)
@@ -0,0 +1,53 @@
+import pytest
+
+from conftest import make_storage, project
+from project_store import ProjectPager, ProjectStore
+
+
+@pytest.fixture
+def store(tmp_path, committer):
+    store = ProjectStore(make_storage('json', tmp_path, committer))
+    store.add_projects([project(f'p{i:02d}', income=float((i * 7) % 30), start_date=f'2024-01-{i % 28 + 1:02d}')
+                        for i in range(30)]
+                       + [project('bad1', income='x', start_date='?'), project('bad0', income='', start_date='?')])
+    return store
+
+
+def names(items):
+    return [item['name'] for item in items]
+
+
+@pytest.mark.parametrize('order', ['position', 'name', 'income', 'start_date'])
+def test_pages_cover_all_projects_once(store, order):
+    found = names(ProjectPager(store, order, limit=7))
+    assert sorted(found) == sorted(names(store.projects))
+    assert len(found) == len(set(found))
+
+
+def test_invalid_values_come_last_by_name(store):
+    found = names(ProjectPager(store, 'income', limit=5))
+    assert found[-2:] == ['bad0', 'bad1']
+    incomes = [store.find(name)['income'] for name in found[:-2]]
+    assert incomes == sorted(incomes)
+
+
+@pytest.mark.parametrize('order', ['position', 'name', 'income'])
+def test_changes_between_pages_do_not_repeat_or_skip(store, order):
+    pages = ProjectPager(store, order, limit=6).pages()
+    first = next(pages)
+    seen = names(first.items)
+    # حذف cursor صفحه قبل و یه پروژه دیده‌نشده، و افزودن یه پروژه جدید وسط پیمایش
+    store.delete_project(seen[-1])
+    unseen = next(name for name in names(store.projects) if name not in seen)
+    store.delete_project(unseen)
+    store.add_project(project('zz_new', income=1000.0))
+    for page in pages:
+        seen.extend(names(page.items))
+    assert len(seen) == len(set(seen))
+    expected = set(names(store.projects)) | {first.items[-1]['name']}
+    assert set(seen) - {'zz_new'} == expected - {'zz_new'}
+
+
+def test_unknown_order_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.page_projects(order='client')
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+import persistence
+from persistence import CommitError, GroupCommitter
+
+
+@pytest.fixture
+def errors(monkeypatch):
+    reported = []
+    monkeypatch.setattr(persistence, '_error_listeners', [])
+    persistence.add_error_listener(lambda what, error: reported.append((what, error)))
+    return reported
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_failed_write_keeps_committer_alive(tmp_path, errors):
+    committer = GroupCommitter(window=0)
+    try:
+        bad = str(tmp_path / 'missing' / 'a.json')
+        good = str(tmp_path / 'b.json')
+        committer.submit(bad, 'x')
+        assert wait_for(lambda: bad in committer.failures)
+        assert errors and isinstance(errors[0][1], OSError)
+        # thread نوشتن هنوز زنده‌ست و فایل‌های دیگه نوشته می‌شن
+        committer.submit(good, 'y')
+        assert wait_for(lambda: (tmp_path / 'b.json').exists())
+        assert (tmp_path / 'b.json').read_text(encoding='utf-8') == 'y'
+    finally:
+        committer.close()
+
+
+def test_explicit_flush_raises_and_retries(tmp_path, errors):
+    committer = GroupCommitter(window=0)
+    try:
+        path = str(tmp_path / 'missing' / 'a.json')
+        committer.submit(path, 'x')
+        with pytest.raises(CommitError) as info:
+            committer.flush()
+        assert path in info.value.failures
+        # نسخه ناموفق تا تلاش بعدی «مال خودمون» حساب می‌شه و بارگذاری مجدد راه نمی‌ندازه
+        assert committer.signature(path)[0] == 'own'
+        (tmp_path / 'missing').mkdir()
+        assert committer.flush() == {}
+        assert (tmp_path / 'missing' / 'a.json').read_text(encoding='utf-8') == 'x'
+        assert committer.failures == {}
+    finally:
+        committer.close()
+
+
+def test_newer_submit_replaces_failed_text(tmp_path, errors):
+    committer = GroupCommitter(window=0)
+    try:
+        path = str(tmp_path / 'missing' / 'a.json')
+        committer.submit(path, 'old')
+        assert committer.flush(raise_errors=False)
+        (tmp_path / 'missing').mkdir()
+        committer.submit(path, 'new')
+        committer.flush()
+        assert (tmp_path / 'missing' / 'a.json').read_text(encoding='utf-8') == 'new'
+    finally:
+        committer.close()
+
+
+def test_deferred_flush_failure_stays_dirty_and_retries(errors):
+    calls = []
+
+    def callback():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError('disk full')
+
+    deferred = persistence.DeferredFlush(callback, delay=0.01)
+    deferred.mark_dirty()
+    assert wait_for(lambda: deferred.failures == 1)
+    assert [what for what, _ in errors] == ['ذخیره تغییرات']
+    # تلاش دوباره خودکار بعد از شکست، تغییر رو ذخیره می‌کنه
+    assert wait_for(lambda: not deferred.dirty)
+    assert len(calls) == 2 and deferred.failures == 0
+
+
+def test_deferred_flush_explicit_failure_raises(errors):
+    deferred = persistence.DeferredFlush(lambda: 1 / 0, delay=3600)
+    deferred.mark_dirty()
+    with pytest.raises(ZeroDivisionError):
+        deferred.flush()
+    assert deferred.dirty
+    assert not deferred.flush(raise_errors=False)
+    assert len(errors) == 1
+    deferred._timer.cancel()
+    deferred.flushed_version = deferred.version
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from conftest import make_storage, project
+from project_import import BulkImporter
+from project_store import ProjectStore
+
+HEADER = 'name,client,start_date,end_date,income,cost\n'
+
+
+@pytest.fixture
+def store(tmp_path, committer):
+    return ProjectStore(make_storage('json', tmp_path, committer))
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('value', ['20240101', '2024-W01-1', '2024-01-01T10:00', '2024/01/01', '2024-02-30'])
+def test_non_canonical_dates_are_rejected(tmp_path, store, value):
+    path = write(tmp_path / 'in.csv', HEADER + f'a,c,{value},2024-03-01,10,5\n')
+    result = BulkImporter(store).validate_projects(path)
+    assert result.records == []
+    assert result.errors == [(2, f"تاریخ «{value}» نامعتبر است (YYYY-MM-DD)")]
+
+
+def test_dates_are_stored_in_canonical_form(tmp_path, store):
+    path = write(tmp_path / 'in.csv', HEADER + 'a,c,2024-1-5,2024-03-01,10,5\n')
+    result = BulkImporter(store).validate_projects(path)
+    assert result.records[0]['start_date'] == '2024-01-05'
+
+
+def test_validation_errors_per_row(tmp_path, store):
+    store.add_project(project('old'))
+    path = write(tmp_path / 'in.csv', HEADER + '\n'.join([
+        'a,c,2024-01-01,2024-03-01,10,5',
+        'old,c,2024-01-01,2024-03-01,10,5',
+        'a,c,2024-01-01,2024-03-01,10,5',
+        'b,,2024-01-01,2024-03-01,10,5',
+        'd,c,2024-01-01,2024-03-01,ten,5',
+    ]) + '\n')
+    result = BulkImporter(store).validate_projects(path)
+    assert [p['name'] for p in result.records] == ['a']
+    assert [line_no for line_no, _ in result.errors] == [3, 4, 5, 6]
+    assert result.rows == 5
+
+
+def test_jsonl_bad_lines_and_commit(tmp_path, store, committer):
+    lines = [json.dumps({'name': f'p{i}', 'client': 'c', 'start_date': '2024-01-01',
+                         'end_date': '2024-02-01', 'income': i, 'cost': 0}) for i in range(3)]
+    lines.insert(1, '{broken')
+    lines.insert(2, '[1, 2]')
+    path = write(tmp_path / 'in.jsonl', '\n'.join(lines) + '\n')
+    importer = BulkImporter(store)
+    result = importer.validate_projects(path)
+    assert [line_no for line_no, _ in result.errors] == [2, 3]
+    assert importer.commit_projects(result) == 3
+    saved = make_storage('json', tmp_path, committer).load_projects()
+    assert [p['name'] for p in saved] == ['p0', 'p1', 'p2']
+    assert store.search_text('c') and store.financial_trend('month')
@@ -0,0 +1,139 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import make_storage, project
+from project_store import ProjectStore
+
+BASE = date(2024, 1, 1)
+
+
+def random_day(rng):
+    roll = rng.random()
+    if roll < 0.05:
+        return rng.choice(['', '?', '2024-13-01', '2024/01/01'])
+    return (BASE + timedelta(days=rng.randrange(365))).isoformat()
+
+
+def random_project(rng, name):
+    # بعضی بازه‌ها برعکسن (پایان قبل از شروع) و بعضی تاریخ نامعتبر دارن
+    return project(name, client=rng.choice(['آلفا', 'بتا', 'گاما', 'الف بتا', 'ab']),
+                   start_date=random_day(rng), end_date=random_day(rng))
+
+
+def day_or_none(text):
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def brute_active(store, first, last):
+    found = []
+    for item in store.projects:
+        start, end = day_or_none(item['start_date']), day_or_none(item['end_date'])
+        if start is None or end is None:
+            continue
+        start, end = min(start, end), max(start, end)
+        if start <= last and end >= first:
+            found.append(item['name'])
+    return found
+
+
+@pytest.fixture
+def store(tmp_path, committer):
+    return ProjectStore(make_storage('json', tmp_path, committer))
+
+
+def check_active(store, rng):
+    for _ in range(5):
+        first = BASE + timedelta(days=rng.randrange(-10, 370))
+        last = first + timedelta(days=rng.randrange(0, 40))
+        found = [item['name'] for item in store.active_between(first, last)]
+        assert found == brute_active(store, first, last)
+
+
+def test_active_between_matches_brute_force_across_rebuilds(store):
+    rng = random.Random(9)
+    store.add_projects([random_project(rng, f'p{i}') for i in range(600)])
+    check_active(store, rng)
+    index = store.interval_index
+    rebuilt = 0
+    counter = 600
+    for step in range(900):
+        names = [item['name'] for item in store.projects]
+        roll = rng.random()
+        if roll < 0.35:
+            store.add_project(random_project(rng, f'p{counter}'))
+            counter += 1
+        elif roll < 0.7:
+            store.update_project(rng.choice(names), {'start_date': random_day(rng), 'end_date': random_day(rng)})
+        elif roll < 0.85:
+            store.update_project(rng.choice(names), {'name': f'p{counter}'})
+            counter += 1
+        else:
+            store.delete_project(rng.choice(names))
+        if step % 40 == 0:
+            pending = len(index._added) + len(index._removed)
+            check_active(store, rng)
+            if pending and not index._added and not index._removed:
+                rebuilt += 1
+    # بافر تغییرها باید دست‌کم یه بار از آستانه رد شده و درخت از نو ساخته شده باشه
+    assert rebuilt >= 1
+    check_active(store, rng)
+
+
+def brute_search(store, name='', client=''):
+    return [item['name'] for item in store.projects
+            if name.lower() in item['name'].lower() and client.lower() in item['client'].lower()]
+
+
+SEARCH_TERMS = [('', ''), ('p1', ''), ('P', ''), ('1', ''), ('', 'a'), ('', 'بت'), ('', 'الف بتا'),
+                ('', 'لفا'), ('', 'AB'), ('2', 'گا'), ('sys', ''), ('', 'xyz'), ('new', 'بتا')]
+
+
+def check_search(store):
+    for name, client in SEARCH_TERMS:
+        found = [item['name'] for item in store.search_projects(name, client)]
+        assert found == brute_search(store, name, client), (name, client)
+
+
+def test_search_projects_matches_brute_force(store):
+    rng = random.Random(11)
+    store.add_projects([random_project(rng, f'p{i}') for i in range(300)])
+    check_search(store)
+    index = store.client_search_index
+    # کارفرماهای مشترک فقط یه بار ایندکس می‌شن
+    assert sorted(index._names) == sorted({item['client'].lower() for item in store.projects})
+
+    counter = 300
+    for step in range(400):
+        names = [item['name'] for item in store.projects]
+        roll = rng.random()
+        if roll < 0.3:
+            store.update_project(rng.choice(names), {'name': f'new_p{counter}'})
+            counter += 1
+        elif roll < 0.55:
+            store.update_project(rng.choice(names), {'client': rng.choice(['آلفا', 'بتا', 'Sys Admin', 'ABC'])})
+        elif roll < 0.8:
+            store.delete_project(rng.choice(names))
+        else:
+            store.add_project(random_project(rng, f'P{counter}'))
+            counter += 1
+        if step % 50 == 0:
+            check_search(store)
+    check_search(store)
+    assert sorted(index._names) == sorted({item['client'].lower() for item in store.projects})
+
+
+def test_deleted_values_leave_no_postings(store):
+    store.add_projects([project('a', client='مشترک'), project('b', client='مشترک'), project('c', client='تنها')])
+    index = store.client_search_index
+    store.delete_project('a')
+    assert [item['name'] for item in store.search_projects(client='مشتر')] == ['b']
+    store.update_project('b', {'client': 'تنها'})
+    assert store.search_projects(client='مشتر') == []
+    assert 'مشترک' not in index._names
+    assert all('مشترک' not in values for values in index._postings.values())
+    assert [item['name'] for item in store.search_projects(client='ت')] == ['b', 'c']
@@ -0,0 +1,113 @@
+import os
+
+from conftest import make_storage, project
+from core.projects import ProjectService
+from project_store import ProjectStore
+from storage import SqliteStorage
+
+
+def saved(backend):
+    return {p['name']: p for p in backend().load_projects()}
+
+
+def test_name_reuse_in_one_window_round_trip(backend):
+    store = ProjectStore(backend())
+    for name in 'abcd':
+        store.add_project(project(name, description=f'data {name}'))
+    store.flush()
+
+    store.update_project('c', {'name': 'a_tmp'})
+    store.update_project('a', {'name': 'c'})
+    store.delete_project('d')
+    store.add_project(project('d', description='new d'))
+    store.flush()
+
+    assert [p['name'] for p in store.projects] == ['c', 'b', 'a_tmp', 'd']
+    projects = saved(backend)
+    assert sorted(projects) == ['a_tmp', 'b', 'c', 'd']
+    assert projects['c']['description'] == 'data a'
+    assert projects['a_tmp']['description'] == 'data c'
+    assert projects['d']['description'] == 'new d'
+
+
+def test_swap_names_round_trip(backend):
+    store = ProjectStore(backend())
+    store.add_projects([project('x', income=1.0), project('y', income=2.0)])
+    store.flush()
+
+    store.update_project('x', {'name': 'tmp'})
+    store.update_project('y', {'name': 'x'})
+    store.update_project('tmp', {'name': 'y'})
+    store.flush()
+
+    projects = saved(backend)
+    assert projects['x']['income'] == 2.0
+    assert projects['y']['income'] == 1.0
+
+
+def test_bulk_delete_and_update_round_trip(backend):
+    store = ProjectStore(backend())
+    store.add_projects([project(name) for name in 'abcde'])
+    store.flush()
+
+    assert store.delete_projects(['b', 'd', 'missing']) == 2
+    assert store.update_projects({'a': {'client': 'z'}, 'e': {'income': 9.0}}) == 2
+    store.flush()
+
+    projects = saved(backend)
+    assert sorted(projects) == ['a', 'c', 'e']
+    assert projects['a']['client'] == 'z'
+    assert projects['e']['income'] == 9.0
+
+
+def test_side_files_live_next_to_data(tmp_path, committer, monkeypatch):
+    data = tmp_path / 'data'
+    data.mkdir()
+    elsewhere = tmp_path / 'elsewhere'
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    store = ProjectStore(make_storage('json', data, committer))
+    store.add_project(project('a', description='انبارداری'))
+    store.flush()
+    assert store.fulltext_index.path == str(data / 'search_index.json')
+    store.fulltext_index.wait_for_compaction()
+    assert os.path.exists(str(data / 'search_index.json'))
+    assert store.rollups.path == str(data / 'rollups.json')
+    assert not os.path.exists(str(elsewhere / 'search_index.json'))
+    assert not os.path.exists(str(elsewhere / 'rollups.json'))
+
+
+def test_compare_periods_matches_plain_sums(tmp_path, committer):
+    store = ProjectStore(make_storage('json', tmp_path, committer))
+    store.add_projects([project(f'p{i}', end_date=f'2024-01-{i % 28 + 1:02d}', income=float(i), cost=1.0)
+                        for i in range(60)] + [project('bad', end_date='?', income=1000.0)])
+    previous, current = store.compare_periods('2024-01-15', '2024-01-28')
+    for row in (previous, current):
+        first, last = row['first'].isoformat(), row['last'].isoformat()
+        rows = [p for p in store.projects if first <= p['end_date'] <= last]
+        assert row['count'] == len(rows)
+        assert row['income'] == sum(p['income'] for p in rows)
+        assert row['profit'] == sum(p['income'] - p['cost'] for p in rows)
+
+
+def test_service_update_sees_changes_from_disk(backend):
+    service = ProjectService(ProjectStore(backend()))
+    service.add(project('a', client='c', start_date='2024-01-01', end_date='2024-02-01'))
+    service.store.flush()
+    other = ProjectStore(backend())
+    other.add_project(project('b', client='c', start_date='2024-01-01', end_date='2024-02-01'))
+    other.flush()
+
+    service.update('b', {**other.find('b'), 'client': 'z'})
+    service.store.flush()
+    assert saved(backend)['b']['client'] == 'z'
+
+
+def test_memory_database_keeps_side_files_in_memory(tmp_path):
+    store = ProjectStore(SqliteStorage(':memory:'))
+    store.add_project(project('a', description='انبارداری'))
+    store.flush()
+    store.fulltext_index.wait_for_compaction()
+    assert [p['name'] for p, _ in store.search_text('انبارداری')] == ['a']
+    assert store.financial_trend('month')
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,110 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import make_storage, project
+from core.reports import ReportService
+from project_store import ProjectStore
+from query_planner import ProjectQuery
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def store(tmp_path, committer):
+    store = ProjectStore(make_storage('json', tmp_path, committer))
+    store.add_projects([
+        project(f'p{i}', client=f'client{i % 4}', income=float(i * 10),
+                start_date=f'2024-{i % 12 + 1:02d}-01',
+                end_date=(TODAY + timedelta(days=i - 20)).isoformat())
+        for i in range(40)
+    ] + [project('bad', client='client1', income='x', start_date='?', end_date='?')])
+    return store
+
+
+def brute_force(store, low=None, high=None, client='', first=None, last=None, status=None):
+    from project_indexes import date_ordinal, parse_number, project_status
+    found = []
+    for item in store.projects:
+        income = parse_number(item['income'])
+        start = date_ordinal(item['start_date'])
+        state = project_status(item['end_date'])
+        if client and client not in item['client']:
+            continue
+        if income is not None and ((low is not None and income < low) or (high is not None and income > high)):
+            continue
+        if start is not None and ((first is not None and start < first) or (last is not None and start > last)):
+            continue
+        if status and state and state != status:
+            continue
+        found.append(item['name'])
+    return found
+
+
+@pytest.mark.parametrize('kwargs, expected', [
+    (dict(min_income='100', max_income='200'), dict(low=100.0, high=200.0)),
+    (dict(client='client2', min_income='50'), dict(client='client2', low=50.0)),
+    (dict(start_from='2024-03-01', start_to='2024-05-01'),
+     dict(first=date(2024, 3, 1).toordinal(), last=date(2024, 5, 1).toordinal())),
+    (dict(status='در حال اجرا', client='client1'), dict(status='در حال اجرا', client='client1')),
+    (dict(), dict()),
+])
+def test_query_matches_brute_force(store, kwargs, expected):
+    query = ProjectQuery(**kwargs)
+    found = [item['name'] for item in query.execute(store)]
+    assert found == brute_force(store, **expected)
+    assert query.stats['matched'] == len(found)
+
+
+def test_planner_starts_from_most_selective_index(store):
+    query = ProjectQuery(client='client3', min_income='390')
+    query.execute(store)
+    assert query.plan['driver'].label.startswith('درآمد')
+    assert 'شروع از ایندکس' in query.explain()
+
+
+def test_residual_filters_run_outside_store_lock(store):
+    acquired = []
+
+    def check():
+        # thread دیگه‌ای (مثل Tk) باید بتونه وسط چک شرط‌ها قفل رو بگیره
+        worker = threading.Thread(target=lambda: acquired.append(store.lock.acquire(timeout=1)
+                                                                 and store.lock.release() is None))
+        worker.start()
+        worker.join()
+
+    ProjectQuery(client='client', min_income='0').execute(store, check=check)
+    assert acquired and all(acquired)
+
+
+def test_report_cache_keys_follow_version(store):
+    reports = ReportService(store)
+    first = reports.by_client('client1')
+    assert reports.by_client('client1') is first
+    store.update_project('p1', {'client': 'other'})
+    assert [item['name'] for item in reports.by_client('client1')] == \
+        [item['name'] for item in first if item['name'] != 'p1']
+
+
+def test_status_roll_day_from_two_threads(store):
+    index = store.status_index
+    errors = []
+
+    def reader():
+        try:
+            for _ in range(200):
+                index.names_with('در حال اجرا')
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for offset in range(1, 200):
+        index.roll_day(TODAY + timedelta(days=offset % 40 - 20))
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    index.roll_day(TODAY)
+    assert sorted(index.names_with('پایان یافته')) == sorted(f'p{i}' for i in range(20))
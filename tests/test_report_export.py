@@ -0,0 +1,128 @@
+import csv
+import json
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+import report_export
+from conftest import project
+from report_export import EXPORT_COLUMNS, export_projects
+from report_runner import ReportCancelled
+
+MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+TITLES = [title for _, title in EXPORT_COLUMNS]
+
+
+@pytest.fixture
+def projects():
+    return [
+        project('a', client='شرکت, "الف"', income=100.0, cost=40.0),
+        project('b', client='چند\nخطی', income='250', cost='x'),
+        project('c', client='\tتب<&>', income='?', cost=5.0),
+    ]
+
+
+def status_of(project):
+    return 'پایان یافته'
+
+
+def expected_rows(projects):
+    rows = []
+    for item in projects:
+        income = report_export.parse_number(item['income']) or 0.0
+        cost = report_export.parse_number(item['cost']) or 0.0
+        rows.append([item['name'], item['client'], item['start_date'], item['end_date'],
+                     income, cost, income - cost, 'پایان یافته'])
+    return rows
+
+
+def test_totals_skip_invalid_amounts(tmp_path, projects):
+    totals = export_projects(projects, str(tmp_path / 'out.jsonl'), status_of)
+    assert totals == {'count': 3, 'income': 350.0, 'cost': 45.0, 'profit': 305.0}
+
+
+@pytest.mark.parametrize('extension, delimiter', [('.csv', ','), ('.tsv', '\t')])
+def test_csv_round_trip(tmp_path, projects, extension, delimiter):
+    path = tmp_path / f'out{extension}'
+    export_projects(projects, str(path), status_of)
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.reader(f, delimiter=delimiter))
+    assert rows[0] == TITLES
+    assert rows[1:] == [[str(value) for value in row] for row in expected_rows(projects)]
+
+
+def test_jsonl_round_trip(tmp_path, projects):
+    path = tmp_path / 'out.jsonl'
+    export_projects(projects, str(path), status_of)
+    lines = path.read_text(encoding='utf-8').splitlines()
+    keys = [key for key, _ in EXPORT_COLUMNS]
+    assert [json.loads(line) for line in lines] == [dict(zip(keys, row)) for row in expected_rows(projects)]
+
+
+def read_xlsx(path):
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        names = set(archive.namelist())
+        for part in ('[Content_Types].xml', '_rels/.rels', 'xl/workbook.xml', 'xl/_rels/workbook.xml.rels'):
+            assert part in names
+            ElementTree.fromstring(archive.read(part))
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+    rows = []
+    for number, row in enumerate(sheet.iter(MAIN + 'row'), 1):
+        assert row.get('r') == str(number)
+        values = []
+        for cell in row.iter(MAIN + 'c'):
+            if cell.get('t') == 'inlineStr':
+                values.append(cell.find(f'{MAIN}is/{MAIN}t').text or '')
+            else:
+                values.append(float(cell.find(MAIN + 'v').text))
+        rows.append(values)
+    return rows
+
+
+def test_xlsx_round_trip(tmp_path, projects):
+    path = tmp_path / 'out.xlsx'
+    # کاراکتر کنترلی در XML مجاز نیست و حذف می‌شه
+    projects.append(project('d\x01', income=1.5, cost=0.5))
+    export_projects(projects, str(path), status_of)
+    rows = read_xlsx(path)
+    assert rows[0] == TITLES
+    expected = expected_rows(projects)
+    expected[-1][0] = 'd'
+    assert rows[1:] == expected
+
+
+def test_xlsx_flushes_rows_in_batches(tmp_path):
+    many = [project(f'p{i}', income=float(i)) for i in range(2500)]
+    path = tmp_path / 'many.xlsx'
+    totals = export_projects(many, str(path), status_of)
+    rows = read_xlsx(path)
+    assert len(rows) == 2501 and rows[-1][0] == 'p2499'
+    assert totals['income'] == sum(range(2500))
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.tsv', '.jsonl', '.txt', '.xlsx'])
+def test_cancel_removes_partial_file(tmp_path, monkeypatch, extension):
+    monkeypatch.setattr(report_export, 'CHECK_EVERY', 10)
+    calls = []
+
+    def check():
+        calls.append(1)
+        if len(calls) == 3:
+            raise ReportCancelled()
+
+    path = tmp_path / f'out{extension}'
+    with pytest.raises(ReportCancelled):
+        export_projects([project(f'p{i}') for i in range(100)], str(path), status_of, check=check)
+    assert len(calls) == 3
+    assert not path.exists()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_text_report_ends_with_totals(tmp_path, projects):
+    path = tmp_path / 'out.unknown'
+    export_projects(projects, str(path), status_of)
+    text = path.read_text(encoding='utf-8')
+    assert 'تعداد نتایج: 3' in text
+    assert text.endswith('کل درآمد: 350.0 تومان\nکل هزینه: 45.0 تومان\nسود خالص: 305.0 تومان\n')
@@ -0,0 +1,56 @@
+import sys
+
+from conftest import make_storage, project
+from core.reports import ReportService
+from project_store import ProjectStore
+from result_cache import ResultCache, estimate_size
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', [1])
+    cache.put('b', [2])
+    assert cache.get('a') == [1]
+    cache.put('c', [3])
+    assert cache.get('b') is None
+    assert cache.get('a') == [1] and cache.get('c') == [3]
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'entries': 2,
+                             'bytes': estimate_size([1]) + estimate_size([3]), 'evictions': 1}
+
+
+def test_byte_limit_evicts_until_it_fits():
+    small, large = list(range(10)), list(range(100))
+    cache = ResultCache(max_entries=10, max_bytes=estimate_size(large) + estimate_size(small))
+    cache.put('small1', small)
+    cache.put('small2', small)
+    cache.put('large', large)
+    assert len(cache) == 2 and cache.get('small1') is None
+    assert cache.stats()['bytes'] <= cache.max_bytes
+    assert cache.evictions == 1
+    # نتیجه‌ای که به تنهایی از کل بودجه بزرگ‌تره برمی‌گرده ولی نگه داشته نمی‌شه
+    huge = list(range(1000))
+    assert cache.put('huge', huge) is huge
+    assert cache.get('huge') is None and len(cache) == 2
+
+
+def test_projects_are_not_counted_in_size():
+    projects = [project(f'p{i}', description='x' * 1000) for i in range(5)]
+    # پروژه‌ها بین store و کش مشترکن؛ فقط خود لیست حساب می‌شه
+    assert estimate_size(projects) == sys.getsizeof(projects)
+
+
+def test_get_or_compute_runs_once():
+    cache = ResultCache()
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_compute('k', lambda: calls.append(1) or 'v') == 'v'
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_all_projects_is_not_cached(tmp_path, committer):
+    store = ProjectStore(make_storage('json', tmp_path, committer))
+    store.add_projects([project('a'), project('b')])
+    reports = ReportService(store)
+    assert [p['name'] for p in reports.all_projects()] == ['a', 'b']
+    assert len(reports.result_cache) == 0
@@ -0,0 +1,33 @@
+from datetime import date
+
+from conftest import project
+from rollups import FinancialRollups
+
+PROJECTS = [project('a', end_date='2024-01-03', income=10.0, cost=4.0),
+            project('b', end_date='2024-01-03', income='5', cost='1'),
+            project('c', end_date='2024-02-10', income=7.0, cost=0.0),
+            project('d', end_date='نامعتبر')]
+
+
+def test_add_many_matches_add(tmp_path, committer):
+    one_by_one = FinancialRollups(str(tmp_path / 'a.json'), committer=committer)
+    for item in PROJECTS:
+        one_by_one.add(item)
+    bulk = FinancialRollups(str(tmp_path / 'b.json'), committer=committer)
+    bulk.add_many(PROJECTS)
+    for period in ('week', 'month', 'year'):
+        assert bulk.trend(period) == one_by_one.trend(period)
+    assert bulk.row('month', date(2024, 1, 1)) == {
+        'count': 2, 'income': 15.0, 'cost': 5.0, 'profit': 10.0}
+
+
+def test_saved_tables_are_reused(tmp_path, committer):
+    path = str(tmp_path / 'rollups.json')
+    rollups = FinancialRollups(path, committer=committer)
+    rollups.rebuild(PROJECTS)
+    rollups.save_if_changed()
+    committer.flush()
+    reloaded = FinancialRollups(path, committer=committer)
+    reloaded.rebuild(PROJECTS)
+    assert not reloaded.changed
+    assert reloaded.trend('year') == rollups.trend('year')
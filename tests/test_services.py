@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from conftest import make_storage, project
+from core import AuthService, CompanyService, ProjectService, ReportService, ValidationError
+from core.auth import LOCK_MINUTES, MAX_FAILED_ATTEMPTS
+from project_import import BulkImporter
+from project_store import ProjectStore
+
+
+@pytest.fixture
+def storage(tmp_path, committer):
+    return make_storage('json', tmp_path, committer)
+
+
+@pytest.fixture
+def auth(storage):
+    auth = AuthService(storage)
+    auth.register('ali', 'secret1', 'secret1')
+    return auth
+
+
+def storage_dir(storage):
+    return Path(storage.projects_file).parent
+
+
+def form(name, **fields):
+    data = {'name': name, 'client': 'c', 'start_date': '2024-01-01', 'end_date': '2024-02-01',
+            'income': '100', 'cost': '40'}
+    data.update(fields)
+    return data
+
+
+@pytest.mark.parametrize('args, message', [
+    (('', 'secret1'), "لطفاً تمام فیلدها را پر کنید"),
+    (('ab', 'secret1'), "نام کاربری باید حداقل 3 کاراکتر باشد"),
+    (('abc', '123'), "رمز عبور باید حداقل 6 کاراکتر باشد"),
+    (('abc', 'secret1', 'secret2'), "رمز عبور و تکرار آن یکسان نیستند"),
+    (('ali', 'secret1'), "این نام کاربری قبلاً ثبت شده است"),
+])
+def test_register_errors(auth, args, message):
+    with pytest.raises(ValidationError, match=message):
+        auth.register(*args)
+
+
+def test_login_errors(auth):
+    with pytest.raises(ValidationError, match="لطفاً تمام فیلدها را پر کنید"):
+        auth.login('ali', '')
+    with pytest.raises(ValidationError, match="کاربری با این نام یافت نشد"):
+        auth.login('nobody', 'secret1')
+    assert auth.login(' ali ', 'secret1') == 'ali'
+
+
+def test_account_locks_after_third_failure(auth, storage, committer):
+    for attempt in range(1, MAX_FAILED_ATTEMPTS):
+        with pytest.raises(ValidationError, match=f"{MAX_FAILED_ATTEMPTS - attempt} تلاش باقی‌مانده"):
+            auth.login('ali', 'wrong!')
+    with pytest.raises(ValidationError, match=f"حساب شما به مدت {LOCK_MINUTES} دقیقه قفل شد"):
+        auth.login('ali', 'wrong!')
+    with pytest.raises(ValidationError, match="حساب قفل شده است"):
+        auth.login('ali', 'secret1')
+
+    # قفل ذخیره می‌شه و بعد از اجرای دوباره برنامه هم سر جاشه
+    auth.flush()
+    reopened = AuthService(make_storage('json', storage_dir(storage), committer))
+    assert reopened.is_account_locked('ali')[0]
+
+    # بعد از LOCK_MINUTES قفل باز می‌شه و ورود موفق شمارنده رو پاک می‌کنه
+    expired = datetime.now() - timedelta(minutes=LOCK_MINUTES, seconds=1)
+    reopened.account_locks['ali']['lock_time'] = expired.isoformat()
+    assert reopened.login('ali', 'secret1') == 'ali'
+    assert 'ali' not in reopened.account_locks
+    reopened.flush()
+    assert AuthService(make_storage('json', storage_dir(storage), committer)).account_locks == {}
+
+
+def test_successful_login_resets_failed_attempts(auth):
+    with pytest.raises(ValidationError):
+        auth.login('ali', 'wrong!')
+    auth.login('ali', 'secret1')
+    assert 'ali' not in auth.account_locks
+    for _ in range(MAX_FAILED_ATTEMPTS - 1):
+        with pytest.raises(ValidationError, match="تلاش باقی‌مانده"):
+            auth.login('ali', 'wrong!')
+
+
+def test_company_duplicates_are_rejected(storage, tmp_path, committer):
+    companies = CompanyService(storage)
+    companies.add(' Acme ', phone='123')
+    with pytest.raises(ValidationError, match="لطفاً نام شرکت را وارد کنید"):
+        companies.add('  ')
+    with pytest.raises(ValidationError, match="شرکتی با این نام قبلاً ثبت شده است"):
+        companies.add('Acme')
+
+    path = tmp_path / 'companies.csv'
+    path.write_text('name,phone,address\nBeta,1,x\nAcme,2,y\nBeta,3,z\n,4,w\n', encoding='utf-8')
+    importer = BulkImporter(ProjectStore(storage))
+    result = companies.validate_import(importer, str(path))
+    assert [c['name'] for c in result.records] == ['Beta']
+    assert [line_no for line_no, _ in result.errors] == [3, 4, 5]
+    assert companies.commit_import(importer, result) == 1
+    assert companies.names() == ['Acme', 'Beta']
+    storage.flush()
+    saved = CompanyService(make_storage('json', tmp_path, committer))
+    assert saved.names() == ['Acme', 'Beta']
+
+
+@pytest.mark.parametrize('fields, message', [
+    (form('a', client=''), "لطفاً فیلدهای اجباری را پر کنید"),
+    (form('a', income='ten'), "مقادیر مالی باید عددی باشند"),
+    (form('old'), "پروژه‌ای با این نام قبلاً ثبت شده است"),
+])
+def test_project_add_errors(storage, fields, message):
+    service = ProjectService(ProjectStore(storage))
+    service.add(form('old'))
+    with pytest.raises(ValidationError, match=message):
+        service.add(fields)
+
+
+def test_project_update_errors(storage):
+    service = ProjectService(ProjectStore(storage))
+    service.add(form('a'))
+    service.add(form('b'))
+    with pytest.raises(ValidationError, match="پروژه یافت نشد"):
+        service.update('missing', form('missing'))
+    with pytest.raises(ValidationError, match="پروژه‌ای با این نام قبلاً ثبت شده است"):
+        service.update('a', form('b'))
+    with pytest.raises(ValidationError, match="مقادیر مالی باید عددی باشند"):
+        service.update('a', form('a', cost='?'))
+    updated = service.update('a', form('a2', income='7'))
+    assert updated['name'] == 'a2' and updated['income'] == 7.0
+
+
+def test_bulk_update_sees_changes_from_disk(tmp_path, committer):
+    service = ProjectService(ProjectStore(make_storage('json', tmp_path, committer)))
+    service.add(form('a'))
+    service.flush()
+    other = ProjectStore(make_storage('json', tmp_path, committer))
+    other.add_project(project('b'))
+    other.flush()
+
+    assert service.bulk_update(['a', 'b'], client='z', shift_days=1) == 2
+    saved = {p['name']: p for p in make_storage('json', tmp_path, committer).load_projects()}
+    assert saved['b']['client'] == 'z'
+    assert saved['b']['start_date'] == '2024-01-02'
+
+
+def test_report_cache_is_invalidated_by_service_changes(storage):
+    service = ProjectService(ProjectStore(storage))
+    reports = ReportService(service.store)
+    service.add(form('a', client='acme'))
+    first = reports.by_client('acme')
+    assert reports.by_client('acme') is first
+    assert reports.result_cache.hits == 1
+
+    service.add(form('b', client='acme'))
+    assert [p['name'] for p in reports.by_client('acme')] == ['a', 'b']
+    service.delete('a')
+    assert [p['name'] for p in reports.by_client('acme')] == ['b']
+    assert [p['name'] for p in first] == ['a']
@@ -0,0 +1,66 @@
+import json
+
+from conftest import project
+from storage import JournalStorage
+
+
+def names(projects):
+    return [p['name'] for p in projects]
+
+
+def test_save_and_load_round_trip(backend):
+    storage = backend()
+    storage.save_projects([project('a'), project('b', income=5.0)])
+    storage.flush()
+    loaded = backend().load_projects()
+    assert names(loaded) == ['a', 'b']
+    assert loaded[1]['income'] == 5.0
+
+
+def test_apply_project_changes_round_trip(backend):
+    storage = backend()
+    projects = [project('a'), project('b'), project('c')]
+    storage.save_projects(projects)
+    renamed = project('b2', income=7.0)
+    projects = [projects[0], renamed, project('d')]
+    storage.apply_project_changes(projects, [(renamed, 'b'), (projects[2], None)], ['c'])
+    storage.flush()
+    loaded = backend().load_projects()
+    assert names(loaded) == ['a', 'b2', 'd']
+    assert loaded[1]['income'] == 7.0
+
+
+def test_companies_users_and_locks_round_trip(backend):
+    storage = backend()
+    storage.save_companies([{'name': 'x', 'phone': '1', 'address': '', 'created_at': 't'}])
+    storage.save_users({'u': {'password': 'h', 'created_at': 't'}})
+    locks = {'u': {'failed_attempts': 3, 'lock_time': 't'}, 'v': {'failed_attempts': 1, 'lock_time': None}}
+    storage.apply_account_lock_changes(locks, ['u', 'v'], [])
+    del locks['v']
+    storage.apply_account_lock_changes(locks, [], ['v'])
+    storage.flush()
+    reopened = backend()
+    assert [c['name'] for c in reopened.load_companies()] == ['x']
+    assert reopened.load_users()['u']['password'] == 'h'
+    assert reopened.load_account_locks() == {'u': {'failed_attempts': 3, 'lock_time': 't'}}
+
+
+def test_journal_replay_drops_stale_row_on_name_collision(tmp_path, committer):
+    storage = JournalStorage(projects_file=str(tmp_path / 'projects.json'), committer=committer)
+    storage.save_projects([project('a', income=1.0), project('c', income=3.0)])
+    # ژورنالی که تغییر نام به نامی که هنوز ردیف داره رو ثبت کرده
+    with open(storage.journal_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'upsert', 'project': project('c', income=9.0), 'old_name': 'a'}) + '\n')
+    loaded = JournalStorage(projects_file=str(tmp_path / 'projects.json'), committer=committer).load_projects()
+    assert [(p['name'], p['income']) for p in loaded] == [('c', 9.0)]
+
+
+def test_journal_compaction_keeps_data(tmp_path, committer):
+    path = str(tmp_path / 'projects.json')
+    storage = JournalStorage(projects_file=path, committer=committer, compact_bytes=200)
+    projects = []
+    for i in range(20):
+        projects.append(project(f'p{i}'))
+        storage.upsert_project(projects[-1], projects)
+    storage.wait_for_compaction()
+    assert names(JournalStorage(projects_file=path, committer=committer).load_projects()) == names(projects)
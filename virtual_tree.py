@@ -0,0 +1,350 @@
+import tkinter as tk
+from tkinter import ttk
+
+# تعداد ردیف‌هایی که بالا و پایین ناحیه دیده‌شده از قبل قالب‌بندی می‌شن
+ROW_BUFFER = 20
+
+
+class VirtualTreeview(tk.Frame):
+    """جدول با اسکرول مجازی: فقط ردیف‌های دیده‌شده در Treeview ساخته می‌شن
+
+    داده‌ها یه لیست معمولی (مثلاً پروژه‌ها) هستن و formatter هر کدوم رو به
+    مقدارهای ستون‌ها تبدیل می‌کنه. Treeview همیشه به اندازه ناحیه دیده‌شده
+    ردیف داره و با اسکرول فقط مقدارهای همون ردیف‌ها عوض می‌شن، پس حتی با
+    ده‌ها هزار ردیف هم ساخت جدول و مصرف حافظه Tk ثابت می‌مونه.
+
+    با selectmode='extended' چند ردیف انتخاب می‌شه (Ctrl و Shift با کلیک یا
+    کلیدهای جهت، Ctrl+A)؛ انتخاب بر اساس جایگاه داده‌ها نگه داشته می‌شه پس
+    با اسکرول از بین نمی‌ره.
+    """
+
+    def __init__(self, parent, column_names, widths, formatter, height=15,
+                 selectmode='browse', **kwargs):
+        super().__init__(parent, **kwargs)
+        self.formatter = formatter
+        self.selectmode = selectmode
+        self.items = []
+        self._offset = 0
+        self._rows = height
+        self._pool = []
+        # مقداری که الان در هر ردیف Treeview نشون داده می‌شه؛ فقط تفاوت‌ها نوشته می‌شن
+        self._shown = {}
+        self._shown_selection = ()
+        self._formatted = {}
+        self._selected = None
+        # جایگاه ردیف‌های انتخاب‌شده و ردیف شروع انتخاب با Shift
+        self._selection = set()
+        self._anchor = None
+        self._rendering = False
+        self._render_pending = None
+        self._activate_callback = None
+
+        columns = tuple(column_names)
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', height=height,
+                                 selectmode=selectmode)
+        for col, width in zip(columns, widths):
+            self.tree.heading(col, text=column_names[col])
+            self.tree.column(col, width=width, anchor=tk.CENTER)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Up>', lambda e: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self._move_selection(-self._rows))
+        self.tree.bind('<Next>', lambda e: self._move_selection(self._rows))
+        self.tree.bind('<Home>', lambda e: self._move_selection(-len(self.items)))
+        self.tree.bind('<End>', lambda e: self._move_selection(len(self.items)))
+        if selectmode == 'extended':
+            # انتخاب رو خودم مدیریت می‌کنم تا ردیف‌های بیرون از ناحیه دیده‌شده هم حساب بشن
+            self.tree.bind('<Button-1>', lambda e: self._on_click(e, 'single'))
+            self.tree.bind('<Control-Button-1>', lambda e: self._on_click(e, 'toggle'))
+            self.tree.bind('<Shift-Button-1>', lambda e: self._on_click(e, 'range'))
+            self.tree.bind('<Shift-Up>', lambda e: self._extend_selection(-1))
+            self.tree.bind('<Shift-Down>', lambda e: self._extend_selection(1))
+            self.tree.bind('<Control-a>', lambda e: self.select_all())
+
+    # --- داده‌ها ---
+
+    def set_items(self, items):
+        """کل لیست داده‌ها رو عوض می‌کنم و از بالای جدول نشون می‌دم"""
+        self.items = list(items)
+        self._formatted = {}
+        self._offset = 0
+        self._selected = None
+        self._selection = set()
+        self._anchor = None
+        self._render()
+
+    def clear(self):
+        self.set_items([])
+
+    def sync_items(self, items):
+        """لیست داده‌ها رو عوض می‌کنم ولی جای اسکرول و ردیف انتخاب‌شده رو نگه می‌دارم
+
+        فقط ردیف‌هایی از Treeview که مقدارشون واقعاً عوض شده دوباره نوشته
+        می‌شن؛ پس ویرایش یه پروژه فقط یه ردیف رو در Tk تغییر می‌ده.
+        """
+        selected = self.selected_item()
+        others = self.selected_items() if len(self._selection) > 1 else None
+        self.items = list(items)
+        self._formatted = {}
+        self._selected = None if selected is None else self._index_of(selected, self._selected)
+        if others:
+            # انتخاب چندتایی: یه گذر روی لیست جدید برای پیدا کردن جایگاه‌های تازه
+            wanted = {id(item) for item in others}
+            self._selection = {i for i, item in enumerate(self.items) if id(item) in wanted}
+        else:
+            self._selection = set() if self._selected is None else {self._selected}
+        self._anchor = self._selected
+        self._render()
+
+    def _index_of(self, item, hint):
+        # معمولاً ردیف انتخاب‌شده سر جاشه یا با حذف یه ردیف قبلی یکی جابه‌جا شده
+        for index in (hint, hint - 1, hint + 1):
+            if 0 <= index < len(self.items) and self.items[index] is item:
+                return index
+        try:
+            return self.items.index(item)
+        except ValueError:
+            return None
+
+    def append(self, item):
+        """یه ردیف به آخر لیست اضافه می‌کنم؛ نمایش با after_idle یک‌جا انجام می‌شه"""
+        self.items.append(item)
+        self._schedule_render()
+
+    def extend(self, items):
+        self.items.extend(items)
+        self._schedule_render()
+
+    def count(self):
+        """تعداد کل ردیف‌ها (نه فقط ردیف‌های دیده‌شده)"""
+        return len(self.items)
+
+    def row(self, index):
+        """مقدارهای قالب‌بندی‌شده یه ردیف"""
+        values = self._formatted.get(index)
+        if values is None:
+            values = self._formatted[index] = tuple(self.formatter(self.items[index]))
+        return values
+
+    def rows(self):
+        """مقدارهای همه ردیف‌ها به ترتیب (برای ذخیره گزارش)؛ چیزی کش نمی‌شه"""
+        for index, item in enumerate(self.items):
+            values = self._formatted.get(index)
+            yield values if values is not None else tuple(self.formatter(item))
+
+    def invalidate(self, index=None):
+        """مقدار قالب‌بندی‌شده یه ردیف (یا همه) رو دور می‌ریزم و دوباره نمایش می‌دم"""
+        if index is None:
+            self._formatted = {}
+        else:
+            self._formatted.pop(index, None)
+        self._schedule_render()
+
+    # --- انتخاب ---
+
+    def selected_index(self):
+        return self._selected
+
+    def selected_indexes(self):
+        """جایگاه همه ردیف‌های انتخاب‌شده، مرتب"""
+        return sorted(index for index in self._selection if index < len(self.items))
+
+    def selected_items(self):
+        """داده همه ردیف‌های انتخاب‌شده به ترتیب جدول"""
+        return [self.items[index] for index in self.selected_indexes()]
+
+    def select_all(self):
+        if self.selectmode == 'extended' and self.items:
+            self._selection = set(range(len(self.items)))
+            self._render()
+        return 'break'
+
+    def selected_item(self):
+        """داده ردیف انتخاب‌شده یا None"""
+        if self._selected is None or self._selected >= len(self.items):
+            return None
+        return self.items[self._selected]
+
+    def select(self, index):
+        """ردیف index رو انتخاب و در صورت نیاز به ناحیه دیده‌شده می‌برم"""
+        if not self.items:
+            return
+        index = min(max(index, 0), len(self.items) - 1)
+        self._selected = index
+        self._selection = {index}
+        self._anchor = index
+        self._scroll_to(index)
+        self._render()
+
+    def _scroll_to(self, index):
+        if index < self._offset:
+            self._offset = index
+        elif index >= self._offset + self._rows:
+            self._offset = index - self._rows + 1
+
+    def bind_activate(self, callback):
+        """callback(item) با دوبار کلیک یا Enter روی یه ردیف صدا زده می‌شه"""
+        self._activate_callback = callback
+        self.tree.bind('<Double-1>', self._on_double_click)
+        self.tree.bind('<Return>', lambda e: self._activate())
+
+    def _on_double_click(self, event):
+        iid = self.tree.identify_row(event.y)
+        if iid in self._pool:
+            index = self._offset + self._pool.index(iid)
+            if index not in self._selection:
+                self.select(index)
+            self._selected = index
+            self._activate()
+
+    def _on_click(self, event, mode):
+        iid = self.tree.identify_row(event.y)
+        if iid not in self._pool:
+            return None
+        index = self._offset + self._pool.index(iid)
+        self.tree.focus_set()
+        if mode == 'toggle':
+            self._selection ^= {index}
+            self._selected = index
+            self._anchor = index
+            self._render()
+        elif mode == 'range' and self._anchor is not None:
+            self._select_range(index)
+        else:
+            self.select(index)
+        return 'break'
+
+    def _select_range(self, index):
+        index = min(max(index, 0), len(self.items) - 1)
+        low, high = sorted((self._anchor, index))
+        self._selection = set(range(low, high + 1))
+        self._selected = index
+        self._scroll_to(index)
+        self._render()
+
+    def _extend_selection(self, delta):
+        if not self.items:
+            return 'break'
+        if self._anchor is None:
+            return self._move_selection(delta)
+        self._select_range((self._selected if self._selected is not None else self._anchor) + delta)
+        return 'break'
+
+    def _activate(self):
+        item = self.selected_item()
+        if item is not None and self._activate_callback is not None:
+            self._activate_callback(item)
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        self._shown_selection = tuple(selection)
+        # در حالت extended انتخاب فقط با کلیک‌ها و کلیدهای خودم عوض می‌شه؛
+        # رویدادی که selection_set خودم تولید کرده هم نباید انتخاب رو تک‌ردیفی کنه
+        if self._rendering or self.selectmode == 'extended':
+            return
+        if selection and selection[0] in self._pool:
+            self._selected = self._offset + self._pool.index(selection[0])
+            self._selection = {self._selected}
+            self._anchor = self._selected
+
+    def _move_selection(self, delta):
+        current = self._selected if self._selected is not None else self._offset - (1 if delta > 0 else 0)
+        self.select(current + delta)
+        return 'break'
+
+    # --- اسکرول و نمایش ---
+
+    def scroll(self, delta):
+        self._set_offset(self._offset + delta)
+
+    def _set_offset(self, offset):
+        offset = min(max(offset, 0), max(len(self.items) - self._rows, 0))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            self._set_offset(int(float(args[1]) * len(self.items)))
+        elif args[0] == 'scroll':
+            step = self._rows if args[2] == 'pages' else 1
+            self.scroll(int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return 'break'
+
+    def _on_configure(self, event):
+        self._measure()
+
+    def _measure(self):
+        """تعداد ردیف‌هایی که در ارتفاع واقعی جدول جا می‌شن رو حساب می‌کنم"""
+        if not self._pool:
+            return
+        bbox = self.tree.bbox(self._pool[0])
+        if not bbox:
+            return
+        rows = max(1, (self.tree.winfo_height() - bbox[1]) // bbox[3])
+        if rows != self._rows:
+            self._rows = rows
+            self._render()
+
+    def _schedule_render(self):
+        if self._render_pending is None:
+            self._render_pending = self.after_idle(self._render)
+
+    def _render(self):
+        """ردیف‌های Treeview رو با داده‌های ناحیه دیده‌شده پر می‌کنم"""
+        if self._render_pending is not None:
+            self.after_cancel(self._render_pending)
+            self._render_pending = None
+        self._rendering = True
+        try:
+            self._offset = min(self._offset, max(len(self.items) - self._rows, 0))
+            visible = min(self._rows, len(self.items) - self._offset)
+            while len(self._pool) > visible:
+                iid = self._pool.pop()
+                self._shown.pop(iid, None)
+                self.tree.delete(iid)
+            if visible and not self._pool:
+                # بعد از اولین نمایش، ارتفاع واقعی ردیف‌ها معلوم می‌شه
+                self.after_idle(self._measure)
+            while len(self._pool) < visible:
+                self._pool.append(self.tree.insert('', tk.END, values=()))
+            for i, iid in enumerate(self._pool):
+                values = self.row(self._offset + i)
+                if self._shown.get(iid) != values:
+                    self.tree.item(iid, values=values)
+                    self._shown[iid] = values
+            selection = tuple(iid for i, iid in enumerate(self._pool)
+                              if self._offset + i in self._selection)
+            if selection != self._shown_selection:
+                self.tree.selection_set(selection)
+                self._shown_selection = selection
+            self._trim_formatted()
+            if self.items:
+                first = self._offset / len(self.items)
+                last = (self._offset + visible) / len(self.items)
+                self.scrollbar.set(first, last)
+            else:
+                self.scrollbar.set(0, 1)
+        finally:
+            self._rendering = False
+
+    def _trim_formatted(self):
+        """فقط ردیف‌های نزدیک ناحیه دیده‌شده قالب‌بندی‌شده می‌مونن و بافر از قبل آماده می‌شه"""
+        low = max(self._offset - ROW_BUFFER, 0)
+        high = min(self._offset + self._rows + ROW_BUFFER, len(self.items))
+        if len(self._formatted) > 4 * (self._rows + 2 * ROW_BUFFER):
+            self._formatted = {i: v for i, v in self._formatted.items() if low <= i < high}
+        for index in range(low, high):
+            self.row(index)